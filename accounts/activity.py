@@ -0,0 +1,133 @@
+import asyncio
+import threading
+import time
+
+from asgiref.sync import sync_to_async
+
+from accounts.conf import get_setting
+from accounts.lru import LRUCache
+from accounts.membership import can_read
+from accounts.models import Note
+from accounts.pagination import encode_cursor, keyset_page
+from accounts.renderers import dumps
+
+DEFAULTS = {
+    # A stream re-checks the database this often even without a local
+    # publish, which picks up edits saved by other processes
+    'POLL_SECONDS': 5,
+    'BATCH_SIZE': 200,
+    # Streams end after this long; EventSource reconnects with Last-Event-ID
+    'MAX_SECONDS': 300,
+}
+
+FEED_KEYS = ['tmdate', 'id']
+# Cursor that sorts before every edit
+START_CURSOR = encode_cursor([-1, ''])
+
+
+def cursor_of(row):
+    return encode_cursor([row['tmdate'], row['id']])
+
+
+def _feed(domain):
+    return Note.objects.filter(domain=domain, tmdate__isnull=False).values('id', 'tmdate', 'payload')
+
+
+def latest(domain, size):
+    """The ``size`` most recent edits, newest first, and the cursor of the newest."""
+    rows = list(_feed(domain).order_by('-tmdate', '-id')[:size])
+    return rows, cursor_of(rows[0]) if rows else START_CURSOR
+
+
+def changes(domain, since, size):
+    """
+    Edits after the ``since`` cursor, oldest first: ``(rows, cursor,
+    has_more)``. ``cursor`` is where the next call should continue from.
+    """
+    rows, next_cursor = keyset_page(_feed(domain), FEED_KEYS, cursor=since, size=size)
+    return rows, cursor_of(rows[-1]) if rows else since, next_cursor is not None
+
+
+class ActivityBroadcaster:
+    """
+    Wakes the event streams of a domain when one of its notes is saved in
+    this process. Listeners are ``asyncio.Event`` objects on whatever loop
+    the stream runs in; ``publish`` may be called from any thread.
+
+    Streams woken together usually ask for the same page, so ``changes`` is
+    memoized per (domain, publish generation, cursor): one query serves
+    every client of a domain in this process.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._listeners = {}
+        self._generations = {}
+        self._pages = LRUCache(maxsize=4096, ttl=1)
+
+    def listen(self, domain):
+        listener = (asyncio.get_running_loop(), asyncio.Event())
+        with self._lock:
+            self._listeners.setdefault(domain, set()).add(listener)
+        return listener
+
+    def unlisten(self, domain, listener):
+        with self._lock:
+            listeners = self._listeners.get(domain, set())
+            listeners.discard(listener)
+            if not listeners:
+                self._listeners.pop(domain, None)
+
+    def publish(self, domain):
+        with self._lock:
+            self._generations[domain] = self._generations.get(domain, 0) + 1
+            listeners = list(self._listeners.get(domain, ()))
+        for loop, event in listeners:
+            if not loop.is_closed():
+                loop.call_soon_threadsafe(event.set)
+
+    def changes(self, domain, since, size):
+        key = (domain, self._generations.get(domain, 0), since, size)
+        page = self._pages.get(key)
+        if page is None:
+            page = changes(domain, since, size)
+            self._pages.set(key, page)
+        return page
+
+    def listeners(self):
+        with self._lock:
+            return sum(len(listeners) for listeners in self._listeners.values())
+
+
+broadcaster = ActivityBroadcaster()
+
+
+async def event_stream(domain, cursor, principals):
+    """
+    Server-Sent Events for ``domain`` after ``cursor``: one ``note`` event
+    per edit ``principals`` can read, with the edit's cursor as its id.
+    """
+    listener = broadcaster.listen(domain)
+    deadline = time.monotonic() + get_setting('ACTIVITY_STREAM', 'MAX_SECONDS', DEFAULTS)
+    try:
+        yield f"retry: {get_setting('ACTIVITY_STREAM', 'POLL_SECONDS', DEFAULTS) * 1000}\n\n"
+        while time.monotonic() < deadline:
+            listener[1].clear()
+            rows, cursor, has_more = await sync_to_async(broadcaster.changes)(
+                domain, cursor, get_setting('ACTIVITY_STREAM', 'BATCH_SIZE', DEFAULTS)
+            )
+            for row in rows:
+                if can_read(row['payload'].get('readers'), principals):
+                    data = dumps(row['payload']).decode()
+                    yield f'id: {cursor_of(row)}\nevent: note\ndata: {data}\n\n'
+            if has_more:
+                continue
+            try:
+                await asyncio.wait_for(
+                    listener[1].wait(), get_setting('ACTIVITY_STREAM', 'POLL_SECONDS', DEFAULTS)
+                )
+            except asyncio.TimeoutError:
+                # Keeps proxies from closing an idle connection
+                yield ': keepalive\n\n'
+    finally:
+        broadcaster.unlisten(domain, listener)
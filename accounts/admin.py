@@ -1,3 +1,34 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import Group, Invitation, Note, OutboxEmail, Profile
+
+
+@admin.register(Profile)
+class ProfileAdmin(admin.ModelAdmin):
+    list_display = ('user', 'affiliation')
+    search_fields = ('user__email', 'affiliation')
+
+
+@admin.register(Group)
+class GroupAdmin(admin.ModelAdmin):
+    list_display = ('id', 'domain', 'parent', 'tmdate')
+    search_fields = ('id',)
+
+
+@admin.register(Invitation)
+class InvitationAdmin(admin.ModelAdmin):
+    list_display = ('id', 'domain', 'duedate')
+    search_fields = ('id',)
+
+
+@admin.register(Note)
+class NoteAdmin(admin.ModelAdmin):
+    list_display = ('id', 'domain', 'invitation', 'number', 'tmdate')
+    search_fields = ('id',)
+    list_filter = ('domain',)
+
+
+@admin.register(OutboxEmail)
+class OutboxEmailAdmin(admin.ModelAdmin):
+    list_display = ('subject', 'status', 'attempts', 'next_attempt_at', 'created_at')
+    list_filter = ('status',)
@@ -0,0 +1,146 @@
+"""
+Reviewer-submission affinity scoring and capacity-constrained assignment.
+
+Submissions and reviewers (the notes they authored) become TF-IDF rows of
+dense float32 matrices; affinities are cosine similarities computed a
+block of submissions at a time with one matrix product, so memory stays
+at ``batch_size x reviewers`` scores. Requires NumPy.
+"""
+import math
+import re
+from collections import Counter
+
+import numpy as np
+
+TOKEN_RE = re.compile(r'[a-z][a-z0-9]+')
+STOPWORDS = frozenset(
+    'about above after again against also among an and any are as at be because been before being '
+    'between both but by can could did do does doing each for from further had has have having how '
+    'if in into is it its itself more most no nor not of on once only or other our out over own same '
+    'should so some such than that the their them then there these they this those through to too '
+    'under until up very was we were what when where which while who whom why will with would you your '
+    'paper propose proposed show results using use based approach method methods new'.split()
+)
+
+
+def tokenize(text):
+    return [token for token in TOKEN_RE.findall(text.lower()) if token not in STOPWORDS]
+
+
+class Vectorizer:
+    """
+    TF-IDF over a vocabulary of the ``max_features`` terms found in the most
+    documents (terms in more than ``max_df`` of them are dropped), with
+    sublinear term frequency and L2-normalised rows.
+    """
+
+    def __init__(self, max_features=4096, min_df=1, max_df=0.9):
+        self.max_features = max_features
+        self.min_df = min_df
+        self.max_df = max_df
+        self.vocabulary = {}
+        self.idf = None
+
+    def fit(self, documents):
+        df = Counter()
+        for tokens in documents:
+            df.update(set(tokens))
+        n = len(documents)
+        terms = [term for term, count in df.items() if self.min_df <= count <= max(1, self.max_df * n)]
+        terms.sort(key=lambda term: (-df[term], term))
+        terms = terms[:self.max_features]
+        self.vocabulary = {term: index for index, term in enumerate(terms)}
+        self.idf = np.array([math.log((1 + n) / (1 + df[term])) + 1 for term in terms], dtype=np.float32)
+        return self
+
+    def transform(self, documents):
+        rows, cols, counts = [], [], []
+        for row, tokens in enumerate(documents):
+            for term, count in Counter(t for t in tokens if t in self.vocabulary).items():
+                rows.append(row)
+                cols.append(self.vocabulary[term])
+                counts.append(count)
+        matrix = np.zeros((len(documents), len(self.vocabulary)), dtype=np.float32)
+        matrix[rows, cols] = np.log1p(np.array(counts, dtype=np.float32))
+        matrix *= self.idf
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1
+        matrix /= norms
+        return matrix
+
+
+def _score_block(submissions, reviewers, start, conflicts):
+    # Rows of ``submissions`` are submissions ``start``, ``start + 1``, ...
+    block = submissions @ reviewers.T
+    for offset in range(len(block)):
+        excluded = conflicts.get(start + offset)
+        if excluded:
+            block[offset, excluded] = -np.inf
+    return block
+
+
+def top_candidates(submissions, reviewers, conflicts, k=50, batch_size=1024):
+    """
+    The ``k`` best non-conflicted reviewers of every submission, as
+    ``(indices, scores)`` arrays of shape ``(submissions, k)``, best first.
+    ``conflicts`` maps a submission row to the reviewer rows it excludes;
+    those score ``-inf``.
+    """
+    n, m = len(submissions), len(reviewers)
+    k = min(k, m)
+    indices = np.empty((n, k), dtype=np.int64)
+    scores = np.empty((n, k), dtype=np.float32)
+    for start in range(0, n, batch_size):
+        block = _score_block(submissions[start:start + batch_size], reviewers, start, conflicts)
+        best = np.argpartition(-block, k - 1, axis=1)[:, :k]
+        best_scores = np.take_along_axis(block, best, axis=1)
+        order = np.argsort(-best_scores, axis=1, kind='stable')
+        indices[start:start + len(block)] = np.take_along_axis(best, order, axis=1)
+        scores[start:start + len(block)] = np.take_along_axis(best_scores, order, axis=1)
+    return indices, scores
+
+
+def assign(submissions, reviewers, conflicts, per_paper=3, capacity=None, k=50, batch_size=1024):
+    """
+    Give every submission up to ``per_paper`` reviewers, no reviewer more than
+    ``capacity`` submissions, never a conflicted pair.
+
+    Candidate pairs from ``top_candidates`` are taken greedily in order of
+    decreasing affinity. Submissions left short (their candidates all filled
+    up) are then completed from every reviewer with capacity left. Returns
+    ``[[(reviewer row, score), ...] per submission]``.
+    """
+    n, m = len(submissions), len(reviewers)
+    if capacity is None:
+        capacity = math.ceil(per_paper * n / m) if m else 0
+    assigned = [[] for _ in range(n)]
+    if not n or not m or not per_paper:
+        return assigned
+
+    load = [0] * m
+    indices, scores = top_candidates(submissions, reviewers, conflicts, k=max(k, per_paper), batch_size=batch_size)
+    width = indices.shape[1]
+    order = np.argsort(-scores, axis=None, kind='stable')
+    for flat, reviewer, score in zip(order.tolist(), indices.ravel()[order].tolist(), scores.ravel()[order].tolist()):
+        if score == -math.inf:
+            break
+        paper = flat // width
+        if len(assigned[paper]) < per_paper and load[reviewer] < capacity:
+            assigned[paper].append((reviewer, score))
+            load[reviewer] += 1
+
+    short = [paper for paper in range(n) if len(assigned[paper]) < per_paper]
+    for start in range(0, len(short), batch_size):
+        rows = short[start:start + batch_size]
+        block = submissions[rows] @ reviewers.T
+        for offset, paper in enumerate(rows):
+            row = block[offset]
+            row[conflicts.get(paper) or []] = -np.inf
+            row[[reviewer for reviewer, _ in assigned[paper]]] = -np.inf
+            for reviewer in np.argsort(-row, kind='stable').tolist():
+                if len(assigned[paper]) == per_paper or row[reviewer] == -np.inf:
+                    break
+                if load[reviewer] < capacity:
+                    assigned[paper].append((reviewer, float(row[reviewer])))
+                    load[reviewer] += 1
+    return assigned
@@ -0,0 +1,188 @@
+import json
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import alogin, get_backends
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.hashers import check_password, get_hasher, identify_hasher, make_password
+from django.contrib.auth.models import User
+from django.contrib.auth.signals import user_login_failed
+from django.db import IntegrityError
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_POST
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+
+from accounts import activity
+from accounts.emails import email_registered, users_with_email
+from accounts.hashing import PoolSaturated, password_pool
+from accounts.homepage import ahomepage
+from accounts.membership import reader_principals
+from accounts.models import Note
+from accounts.pagination import InvalidCursor, cursor_values
+from accounts.renderers import dumps
+from accounts.responses import encoded_json_response
+from accounts.usernames import create_user_with_email
+from accounts.views import EMAIL_TAKEN, login_payload, signup_validation_error
+
+# Async counterparts of signup_api/login_api for the ASGI entry point. The
+# PBKDF2 work runs in accounts.hashing.password_pool, so the event loop keeps
+# serving other requests while passwords are hashed.
+
+
+def _request_data(request):
+    if request.content_type == 'application/json':
+        try:
+            data = json.loads(request.body or b'{}')
+        except ValueError:
+            return {}
+        return data if isinstance(data, dict) else {}
+    return request.POST
+
+
+def _busy():
+    response = JsonResponse(
+        {'error': 'Server is busy, please retry shortly.'},
+        status=status.HTTP_503_SERVICE_UNAVAILABLE,
+    )
+    response['Retry-After'] = '1'
+    return response
+
+
+@csrf_exempt
+@require_POST
+async def signup_async_api(request):
+    data = _request_data(request)
+    email = data.get('email')
+    password = data.get('password')
+    full_name = data.get('fullname')
+
+    error = await sync_to_async(signup_validation_error)(email, password, full_name)
+    if error:
+        return JsonResponse({'error': error}, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        encoded = await password_pool.run(make_password, password)
+    except PoolSaturated:
+        return _busy()
+
+    try:
+        await sync_to_async(create_user_with_email)(email, password, full_name, encoded_password=encoded)
+    except IntegrityError:
+        if not await sync_to_async(email_registered)(email):
+            raise
+        return JsonResponse({'error': EMAIL_TAKEN}, status=status.HTTP_400_BAD_REQUEST)
+    return JsonResponse({'message': 'User created successfully.'}, status=status.HTTP_201_CREATED)
+
+
+def _must_update(encoded):
+    # What check_password's setter argument decides: rehash with the
+    # preferred hasher, or with its current work factor
+    try:
+        hasher = identify_hasher(encoded)
+    except ValueError:
+        return False
+    preferred = get_hasher('default')
+    return hasher.algorithm != preferred.algorithm or preferred.must_update(encoded)
+
+
+def _accepting_backend(user):
+    """
+    The path of the first configured ModelBackend that lets ``user`` sign
+    in, e.g. only active users; None if none does.
+    """
+    for backend in get_backends():
+        if isinstance(backend, ModelBackend) and backend.user_can_authenticate(user):
+            return f'{backend.__module__}.{type(backend).__qualname__}'
+    return None
+
+
+async def _login_failed(request, email):
+    await user_login_failed.asend(sender=__name__, credentials={'email': email}, request=request)
+    return JsonResponse({'error': 'Invalid credentials'}, status=status.HTTP_401_UNAUTHORIZED)
+
+
+@csrf_exempt
+@require_POST
+async def login_async_api(request):
+    """
+    ``login_api`` with the password hash checked in the process pool. The
+    rest of what ``authenticate()`` does is applied around it: the
+    backend's ``user_can_authenticate``, rehashing outdated hashes and the
+    ``user_login_failed`` signal.
+    """
+    data = _request_data(request)
+    email = data.get('email')
+    password = data.get('password')
+
+    if not email or not password:
+        return JsonResponse({'error': 'Email and password are required'}, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        user = await users_with_email(email).aget()
+    except User.DoesNotExist:
+        user = None
+
+    try:
+        if user is None:
+            # Hash anyway, as ModelBackend does, so unknown addresses take
+            # as long as wrong passwords
+            await password_pool.run(make_password, password)
+            return await _login_failed(request, email)
+        valid = await password_pool.run(check_password, password, user.password)
+        if valid and _must_update(user.password):
+            user.password = await password_pool.run(make_password, password)
+            await user.asave(update_fields=['password'])
+    except PoolSaturated:
+        return _busy()
+
+    backend = _accepting_backend(user) if valid else None
+    if backend is None:
+        return await _login_failed(request, email)
+
+    await alogin(request, user, backend=backend)
+    token, _ = await Token.objects.aget_or_create(user=user)
+    return JsonResponse(login_payload(user, token), status=status.HTTP_200_OK)
+
+
+@require_GET
+async def activity_stream_api(request):
+    """
+    Server-Sent Events of a venue's new edits (see accounts.activity). A
+    client resumes after ``Last-Event-ID`` or ``?since``; otherwise it gets
+    only edits made after it connected.
+    """
+    domain = request.GET.get('domain')
+    if not domain:
+        return JsonResponse({'error': 'domain is required'}, status=status.HTTP_400_BAD_REQUEST)
+    cursor = request.headers.get('Last-Event-ID') or request.GET.get('since')
+    if cursor:
+        try:
+            cursor_values(Note, activity.FEED_KEYS, cursor)
+        except InvalidCursor as exc:
+            return JsonResponse({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+    else:
+        _, cursor = await sync_to_async(activity.latest)(domain, 1)
+
+    principals = await sync_to_async(reader_principals)(request)
+    response = StreamingHttpResponse(
+        activity.event_stream(domain, cursor, principals), content_type='text/event-stream'
+    )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+@require_GET
+async def venue_homepage_async_api(request):
+    """``venue_homepage_api`` with the group, invitations and notes read concurrently."""
+    venue_id = request.GET.get('id')
+    if not venue_id:
+        return JsonResponse({'error': 'id is required'}, status=status.HTTP_400_BAD_REQUEST)
+    page = await ahomepage(venue_id)
+    if page.data['group'] is None:
+        return JsonResponse({'error': 'Venue not found'}, status=status.HTTP_404_NOT_FOUND)
+    if page.public:
+        return encoded_json_response(request, page.encoded())
+    principals = await sync_to_async(reader_principals)(request)
+    return HttpResponse(dumps(page.for_reader(principals)), content_type='application/json')
@@ -0,0 +1,63 @@
+import copy
+
+from django.core.cache import cache
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+from accounts.conf import get_setting, local_cache
+from accounts.versions import cache_is_shared
+
+DEFAULTS = {
+    # Entries held by this process. Another process that revokes a token can
+    # only clear the shared cache, so LOCAL_TTL bounds how long a revoked
+    # token may still be accepted here.
+    'LOCAL_MAXSIZE': 10000,
+    'LOCAL_TTL': 30,
+    # Lifetime of entries in the shared Django cache. The cache tier is
+    # skipped when the default cache is process-local: it would only be a
+    # second copy here that a revocation elsewhere cannot clear.
+    'TIMEOUT': 300,
+}
+
+
+_local = local_cache('TOKEN_AUTH_CACHE', DEFAULTS)
+
+
+def _cache_key(key):
+    return f'auth-token:{key}'
+
+
+def invalidate_token(key):
+    _local.delete(key)
+    cache.delete(_cache_key(key))
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    Token authentication that resolves ``Authorization: Token <key>`` through
+    an in-process LRU, then the shared Django cache, and only then the
+    database. See ``accounts.signals`` for invalidation on logout, password
+    change and user updates.
+    """
+
+    def authenticate_credentials(self, key):
+        entry = _local.get(key)
+        if entry is None:
+            shared = cache_is_shared()
+            entry = cache.get(_cache_key(key)) if shared else None
+            if entry is None:
+                try:
+                    token = Token.objects.select_related('user').get(key=key)
+                except Token.DoesNotExist:
+                    raise exceptions.AuthenticationFailed('Invalid token.')
+                entry = (token.user, token)
+                if shared:
+                    cache.set(_cache_key(key), entry, get_setting('TOKEN_AUTH_CACHE', 'TIMEOUT', DEFAULTS))
+            _local.set(key, entry)
+
+        user, token = entry
+        if not user.is_active:
+            raise exceptions.AuthenticationFailed('User inactive or deleted.')
+        # Views may modify request.user; never hand out the shared instance.
+        return copy.copy(user), token
@@ -0,0 +1,18 @@
+from django.conf import settings
+
+from accounts.lru import LRUCache
+
+# Each module reads its settings from one dict setting, e.g.
+# TOKEN_AUTH_CACHE = {'LOCAL_TTL': 10}; names left out fall back to the
+# module's DEFAULTS.
+
+
+def get_setting(group, name, defaults):
+    return getattr(settings, group, {}).get(name, defaults[name])
+
+
+def local_cache(group, defaults):
+    """The in-process LRU sized by the group's LOCAL_MAXSIZE and LOCAL_TTL."""
+    return LRUCache(
+        maxsize=get_setting(group, 'LOCAL_MAXSIZE', defaults), ttl=get_setting(group, 'LOCAL_TTL', defaults),
+    )
@@ -0,0 +1,55 @@
+import random
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+
+# Set once the current request has written (or asked to write) to the primary;
+# from then on its reads go to the primary too.
+_wrote = ContextVar('accounts_wrote_primary', default=False)
+# Set when the client wrote recently (see ReplicaStickinessMiddleware)
+_pinned = ContextVar('accounts_pinned_primary', default=False)
+
+PRIMARY = 'default'
+
+
+def replicas():
+    return getattr(settings, 'DATABASE_REPLICAS', [])
+
+
+class PrimaryReplicaRouter:
+    """
+    Writes go to the primary, reads to a random replica from
+    ``settings.DATABASE_REPLICAS``. Reads stay on the primary while a
+    transaction is open there, after the current request has written, and
+    for ``REPLICA_STICKY_SECONDS`` after the client's last write, so users
+    always read their own writes despite replication lag.
+    """
+
+    def db_for_read(self, model, **hints):
+        aliases = replicas()
+        if not aliases or _wrote.get() or _pinned.get() or connections[PRIMARY].in_atomic_block:
+            return PRIMARY
+        return random.choice(aliases)
+
+    def db_for_write(self, model, **hints):
+        _wrote.set(True)
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Every alias holds the same data
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return True
+
+
+def begin_request(pinned):
+    return _wrote.set(False), _pinned.set(pinned)
+
+
+def end_request(tokens):
+    wrote = _wrote.get()
+    _wrote.reset(tokens[0])
+    _pinned.reset(tokens[1])
+    return wrote
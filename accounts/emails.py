@@ -0,0 +1,36 @@
+from django.contrib.auth.models import User
+from django.db.models import Q
+from django.db.models.functions import Lower
+
+# Email addresses are unique without regard to case, enforced by the
+# accounts_user_email_lower_uniq index on lower(email) (migration 0007).
+# Lookups filter on the same expression so they are answered by that index
+# instead of scanning auth_user.
+
+
+def normalize_email(email):
+    """The stored form of an address: trimmed and lower-cased."""
+    return str(email).strip().lower()
+
+
+def with_email_lower(queryset):
+    return queryset.alias(email_lower=Lower('email'))
+
+
+def email_condition(emails):
+    """Matches any of ``emails``; for querysets from ``with_email_lower``."""
+    # Repeats the index's WHERE clause, which the planner needs to see
+    # before it will use a partial index
+    return Q(email_lower__in=sorted({normalize_email(email) for email in emails if email}), email__gt='')
+
+
+def users_with_emails(emails):
+    return with_email_lower(User.objects.all()).filter(email_condition(emails))
+
+
+def users_with_email(email):
+    return users_with_emails([email])
+
+
+def email_registered(email):
+    return users_with_email(email).exists()
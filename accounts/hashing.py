@@ -0,0 +1,91 @@
+import asyncio
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from accounts.conf import get_setting
+
+DEFAULTS = {
+    'WORKERS': 2,
+    # Requests allowed to wait for a worker; beyond WORKERS + QUEUE_SIZE
+    # in-flight hashes new requests are rejected instead of queued.
+    'QUEUE_SIZE': 32,
+}
+
+
+class PoolSaturated(Exception):
+    pass
+
+
+class HashingPool:
+    """
+    Process pool for PBKDF2 work (``make_password``/``check_password``) with
+    a hard bound on in-flight jobs, so a login spike is shed with 503s
+    instead of piling up behind the event loop.
+    """
+
+    def __init__(self, workers, queue_size):
+        self.workers = workers
+        self.capacity = workers + queue_size
+        self._executor = None
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+
+    @classmethod
+    def from_settings(cls):
+        return cls(
+            get_setting('PASSWORD_HASHING_POOL', 'WORKERS', DEFAULTS),
+            get_setting('PASSWORD_HASHING_POOL', 'QUEUE_SIZE', DEFAULTS),
+        )
+
+    def start(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        return self._executor
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    async def run(self, func, *args):
+        with self._lock:
+            if self.in_flight >= self.capacity:
+                self.rejected += 1
+                raise PoolSaturated
+            self.in_flight += 1
+            self.submitted += 1
+        try:
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(self.start(), func, *args)
+        except BaseException:
+            with self._lock:
+                self.failed += 1
+            raise
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+        with self._lock:
+            self.completed += 1
+        return result
+
+    def metrics(self):
+        with self._lock:
+            return {
+                'workers': self.workers,
+                'capacity': self.capacity,
+                'in_flight': self.in_flight,
+                'occupancy': self.in_flight / self.capacity if self.capacity else 1.0,
+                'submitted': self.submitted,
+                'completed': self.completed,
+                'failed': self.failed,
+                'rejected': self.rejected,
+            }
+
+
+password_pool = HashingPool.from_settings()
@@ -0,0 +1,141 @@
+import asyncio
+import math
+
+from asgiref.sync import sync_to_async
+from django.db import close_old_connections
+from django.db.models import Q
+
+from accounts.invitation_index import now_ms
+from accounts.lru import LRUCache
+from accounts.membership import can_read
+from accounts.models import Group, Invitation, Note
+from accounts.pagination import DEFAULT_PAGE_SIZE, keyset_page
+from accounts.responses import EncodedPayload
+from accounts.versions import bump_version, current_version
+
+# Everything a venue homepage (the VenueHomepage webfield) needs in one
+# response: the venue group, its open invitations and the first page of its
+# notes. The combined payload is built once per venue and version and shared
+# by every reader who may see all of its notes.
+
+NOTE_KEYS = ['number', 'id']
+
+_homepages = LRUCache(maxsize=256)
+
+
+def _version_name(venue_id):
+    return f'homepage:{venue_id}'
+
+
+def group_part(venue_id):
+    return Group.objects.filter(id=venue_id).values_list('payload', flat=True).first()
+
+
+def invitations_part(venue_id, now):
+    return list(
+        Invitation.objects.filter(domain=venue_id)
+        .filter(Q(duedate__isnull=True) | Q(duedate__gt=now))
+        .order_by('duedate', 'id').values_list('duedate', 'payload')
+    )
+
+
+def notes_part(venue_id, size=DEFAULT_PAGE_SIZE):
+    notes = Note.objects.filter(domain=venue_id).values('number', 'id', 'payload')
+    return keyset_page(notes, NOTE_KEYS, size=size)
+
+
+class Homepage:
+    """
+    One venue's combined payload. ``expires`` is the first ``duedate`` among
+    its invitations (ms), after which the invitation list is stale.
+    """
+
+    __slots__ = ('version', 'expires', 'data', 'public', '_encoded')
+
+    def __init__(self, version, now, group, invitations, notes):
+        rows, next_cursor = notes
+        self.version = version
+        self.expires = min((duedate for duedate, _ in invitations if duedate is not None), default=math.inf)
+        self.data = {
+            'group': group,
+            'invitations': [payload for _, payload in invitations],
+            'notes': [row['payload'] for row in rows],
+            'next_cursor': next_cursor,
+        }
+        # Whether everyone may read every note, i.e. the cached body can be
+        # served as is
+        self.public = all(can_read(note.get('readers'), {'everyone'}) for note in self.data['notes'])
+        self._encoded = None
+
+    def current(self, version, now):
+        return self.version == version and now < self.expires
+
+    def encoded(self):
+        if self._encoded is None:
+            self._encoded = EncodedPayload(self.data)
+        return self._encoded
+
+    def for_reader(self, principals):
+        """The payload as ``principals`` may see it."""
+        if self.public:
+            return self.data
+        return dict(self.data, notes=[
+            note for note in self.data['notes'] if can_read(note.get('readers'), principals)
+        ])
+
+
+def _cached(venue_id, now):
+    version = current_version(_version_name(venue_id))
+    homepage = _homepages.get(venue_id)
+    if homepage is not None and homepage.current(version, now):
+        return version, homepage
+    return version, None
+
+
+def _store(venue_id, homepage):
+    if homepage.data['group'] is not None:
+        _homepages.set(venue_id, homepage)
+    return homepage
+
+
+def homepage(venue_id):
+    """The ``Homepage`` of ``venue_id``, looked up one part after another."""
+    now = now_ms()
+    version, cached = _cached(venue_id, now)
+    if cached is not None:
+        return cached
+    return _store(venue_id, Homepage(
+        version, now, group_part(venue_id), invitations_part(venue_id, now), notes_part(venue_id),
+    ))
+
+
+def _in_worker(function, *args):
+    # Worker threads are outside the request cycle that would otherwise
+    # release their connections
+    try:
+        return function(*args)
+    finally:
+        close_old_connections()
+
+
+async def ahomepage(venue_id):
+    """
+    ``homepage`` for async views. The three parts are read concurrently,
+    each on its own worker thread and database connection.
+    """
+    now = now_ms()
+    version, cached = await sync_to_async(_cached)(venue_id, now)
+    if cached is not None:
+        return cached
+    in_worker = sync_to_async(_in_worker, thread_sensitive=False)
+    parts = await asyncio.gather(
+        in_worker(group_part, venue_id),
+        in_worker(invitations_part, venue_id, now),
+        in_worker(notes_part, venue_id),
+    )
+    return _store(venue_id, Homepage(version, now, *parts))
+
+
+def invalidate_homepage(venue_id):
+    _homepages.delete(venue_id)
+    bump_version(_version_name(venue_id))
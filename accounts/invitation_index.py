@@ -0,0 +1,117 @@
+import bisect
+import math
+import threading
+import time
+
+from django.db.models import BooleanField, Q
+from django.db.models.expressions import RawSQL
+
+from accounts.models import GroupMembership, Invitation
+from accounts.versions import bump_version, current_version
+
+VERSION_NAME = 'active-invitations'
+# Principals that are not group ids
+PUBLIC_INVITEES = frozenset(['everyone', '~'])
+
+
+def now_ms():
+    return int(time.time() * 1000)
+
+
+def invitee_principals(invitee, member_of):
+    """
+    The set of invitee values that admit ``invitee``: itself, the public
+    principals it qualifies for, and the groups it is a member of.
+    """
+    principals = {'everyone', invitee}
+    if invitee.startswith('~'):
+        principals.add('~')
+    principals |= member_of.get(invitee, frozenset())
+    return principals
+
+
+def invited(queryset, principals):
+    """
+    ``queryset`` narrowed, in SQL, to invitations whose invitees admit one of
+    ``principals`` (see ``invitee_principals``). No invitees means everyone.
+    """
+    principals = sorted(principals)
+    admitted = RawSQL(
+        f"(json_array_length({Invitation._meta.db_table}.invitees) = 0 OR EXISTS ("
+        f"SELECT 1 FROM json_each({Invitation._meta.db_table}.invitees) i "
+        f"WHERE i.value IN ({', '.join(['%s'] * len(principals))})))",
+        principals, output_field=BooleanField(),
+    )
+    return queryset.alias(admitted=admitted).filter(admitted=True)
+
+
+class ActiveInvitationIndex:
+    """
+    Invitations that have not passed their ``duedate``, sorted by it.
+
+    The index is loaded from the ``duedate`` index once per version (see
+    ``invalidate``) and afterwards never touches the database: expired
+    entries are cut off the front with a binary search as the clock moves,
+    so the cost of a lookup depends only on the number of open invitations.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = None
+        self._duedates = []
+        self._entries = []
+        self._member_of = {}
+
+    def _load(self, now):
+        rows = (
+            Invitation.objects
+            .filter(Q(duedate__isnull=True) | Q(duedate__gt=now))
+            .order_by('duedate', 'id')
+            .values_list('duedate', 'invitees', 'payload')
+        )
+        duedates, entries, invitee_groups = [], [], set()
+        for duedate, invitees, payload in rows:
+            invitees = frozenset(invitees or ['everyone'])
+            invitee_groups |= invitees - PUBLIC_INVITEES
+            # No duedate means the invitation never expires
+            duedates.append(math.inf if duedate is None else duedate)
+            entries.append((invitees, payload))
+
+        # Reverse (transitive) membership for the groups invitations are
+        # addressed to, so invitee filtering is a set intersection per invitation.
+        member_of = {}
+        memberships = GroupMembership.objects.filter(group__in=invitee_groups).values_list('member', 'group')
+        for member, group_id in memberships:
+            member_of.setdefault(member, set()).add(group_id)
+
+        # NULL duedates sort first in SQL but belong at the end here
+        order = sorted(range(len(duedates)), key=duedates.__getitem__)
+        self._duedates = [duedates[i] for i in order]
+        self._entries = [entries[i] for i in order]
+        self._member_of = {member: frozenset(groups) for member, groups in member_of.items()}
+
+    def active(self, invitee=None, now=None):
+        """Payloads of open invitations, soonest ``duedate`` first."""
+        now = now_ms() if now is None else now
+        version = current_version(VERSION_NAME)
+        with self._lock:
+            if version != self._version:
+                self._load(now)
+                self._version = version
+            expired = bisect.bisect_right(self._duedates, now)
+            if expired:
+                # New lists, so callers still iterating the old ones are safe
+                self._duedates = self._duedates[expired:]
+                self._entries = self._entries[expired:]
+            entries = self._entries
+            principals = invitee_principals(invitee, self._member_of) if invitee else None
+
+        if principals is None:
+            return [payload for _, payload in entries]
+        return [payload for invitees, payload in entries if not invitees.isdisjoint(principals)]
+
+    def invalidate(self):
+        bump_version(VERSION_NAME)
+
+
+active_invitations = ActiveInvitationIndex()
@@ -0,0 +1,177 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from accounts.models import Group, GroupMembership, Note, Profile
+from accounts.search import document
+
+
+def _content_value(content, name, default=None):
+    field = content.get(name)
+    if isinstance(field, dict):
+        return field.get('value', default)
+    return default if field is None else field
+
+
+def _authorids(payload):
+    authorids = _content_value(payload.get('content') or {}, 'authorids', [])
+    return authorids if isinstance(authorids, list) else []
+
+
+class Command(BaseCommand):
+    help = (
+        "Score every reviewer of a venue against every submission (TF-IDF of the "
+        "reviewer's authored notes vs. the submission) and compute a "
+        "capacity-constrained assignment without conflicts. Needs NumPy."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('venue', help='Venue group id, e.g. ICML.cc/2025/Workshop/AI4MATH')
+        parser.add_argument('--reviewers-per-paper', type=int, default=3)
+        parser.add_argument(
+            '--max-papers', type=int,
+            help='Most submissions per reviewer (default: the fewest that covers every submission).',
+        )
+        parser.add_argument('--top-k', type=int, default=50, help='Candidate reviewers kept per submission.')
+        parser.add_argument('--max-features', type=int, default=4096, help='TF-IDF vocabulary size.')
+        parser.add_argument('--batch-size', type=int, default=1024, help='Submissions scored per matrix product.')
+        parser.add_argument(
+            '--save', action='store_true',
+            help='Write <venue>/Submission<number>/Reviewers groups with the assigned reviewers.',
+        )
+        parser.add_argument('--output', help='Write the JSON report here instead of stdout.')
+
+    def handle(self, *args, **options):
+        try:
+            from accounts import affinity
+        except ImportError:
+            raise CommandError('assign_reviewers needs NumPy (pip install numpy).')
+
+        started = time.perf_counter()
+        venue = self.load_venue(options['venue'])
+        submissions = list(
+            Note.objects.filter(invitation=venue['submission_id'])
+            .order_by('number', 'id').values_list('id', 'number', 'payload')
+        )
+        reviewers = sorted(
+            GroupMembership.objects.filter(group__in=venue['reviewer_groups'], member__startswith='~')
+            .values_list('member', flat=True).distinct()
+        )
+        if not submissions or not reviewers:
+            raise CommandError(f'{len(submissions)} submissions and {len(reviewers)} reviewers; nothing to assign.')
+
+        submission_docs = [affinity.tokenize(' '.join(document(payload)[:2])) for _, _, payload in submissions]
+        reviewer_docs = self.reviewer_documents(reviewers, venue['submission_id'], affinity.tokenize)
+        conflicts = self.conflicts(submissions, reviewers)
+        loaded = time.perf_counter()
+
+        vectorizer = affinity.Vectorizer(max_features=options['max_features'])
+        vectorizer.fit(submission_docs + reviewer_docs)
+        assigned = affinity.assign(
+            vectorizer.transform(submission_docs), vectorizer.transform(reviewer_docs), conflicts,
+            per_paper=options['reviewers_per_paper'], capacity=options['max_papers'],
+            k=options['top_k'], batch_size=options['batch_size'],
+        )
+        scored = time.perf_counter()
+
+        if options['save']:
+            self.save(options['venue'], submissions, reviewers, assigned)
+
+        report = {
+            'venue': options['venue'],
+            'submissions': len(submissions),
+            'reviewers': len(reviewers),
+            'conflicts': sum(len(rows) for rows in conflicts.values()),
+            'assignments': {
+                note_id: [{'reviewer': reviewers[r], 'score': round(score, 4)} for r, score in rows]
+                for (note_id, _, _), rows in zip(submissions, assigned)
+            },
+            'unfilled': [
+                note_id for (note_id, _, _), rows in zip(submissions, assigned)
+                if len(rows) < options['reviewers_per_paper']
+            ],
+            'timings_s': {
+                'load': round(loaded - started, 3),
+                'score_and_assign': round(scored - loaded, 3),
+                'total': round(time.perf_counter() - started, 3),
+            },
+        }
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                f.write(output + '\n')
+        else:
+            self.stdout.write(output)
+
+    def load_venue(self, venue_id):
+        try:
+            group = Group.objects.get(id=venue_id)
+        except Group.DoesNotExist:
+            raise CommandError(f'Venue group {venue_id} not found.')
+        content = group.payload.get('content') or {}
+        if not _content_value(content, 'automatic_reviewer_assignment', False):
+            self.stderr.write(f'{venue_id} does not enable automatic_reviewer_assignment; assigning anyway.')
+        roles = _content_value(content, 'reviewer_roles') or ['Reviewers']
+        return {
+            'submission_id': _content_value(content, 'submission_id') or f'{venue_id}/-/Submission',
+            'reviewer_groups': [f'{venue_id}/{role}' for role in roles],
+        }
+
+    def reviewer_documents(self, reviewers, submission_id, tokenize):
+        # One pass over the other notes: a reviewer's expertise is everything
+        # they authored outside this venue's submissions
+        index = {reviewer: i for i, reviewer in enumerate(reviewers)}
+        docs = [[] for _ in reviewers]
+        notes = Note.objects.exclude(invitation=submission_id).values_list('payload', flat=True)
+        for payload in notes.iterator(chunk_size=2000):
+            rows = [index[a] for a in _authorids(payload) if a in index]
+            if rows:
+                tokens = tokenize(' '.join(document(payload)[:2]))
+                for row in rows:
+                    docs[row] += tokens
+        return docs
+
+    def conflicts(self, submissions, reviewers):
+        """``{submission row: [reviewer rows]}`` for authors and shared affiliations."""
+        index = {reviewer: i for i, reviewer in enumerate(reviewers)}
+        usernames = {reviewer[1:] for reviewer in reviewers}
+        for _, _, payload in submissions:
+            usernames.update(a[1:] for a in _authorids(payload) if a.startswith('~'))
+        affiliations = {
+            '~' + username: affiliation.strip().lower()
+            for username, affiliation in Profile.objects.filter(user__username__in=usernames)
+            .values_list('user__username', 'affiliation')
+            if affiliation.strip()
+        }
+        by_affiliation = {}
+        for reviewer in reviewers:
+            if reviewer in affiliations:
+                by_affiliation.setdefault(affiliations[reviewer], []).append(index[reviewer])
+
+        conflicts = {}
+        for row, (_, _, payload) in enumerate(submissions):
+            excluded = set()
+            for author in _authorids(payload):
+                if author in index:
+                    excluded.add(index[author])
+                excluded.update(by_affiliation.get(affiliations.get(author), ()))
+            if excluded:
+                conflicts[row] = sorted(excluded)
+        return conflicts
+
+    def save(self, venue_id, submissions, reviewers, assigned):
+        with transaction.atomic():
+            for (note_id, number, _), rows in zip(submissions, assigned):
+                paper_group = f'{venue_id}/Submission{number if number is not None else note_id}'
+                Group.from_payload({
+                    'id': f'{paper_group}/Reviewers',
+                    'domain': venue_id,
+                    'parent': paper_group,
+                    'members': [reviewers[r] for r, _ in rows],
+                    'readers': [venue_id],
+                    'writers': [venue_id],
+                    'signatories': [venue_id],
+                }).save()
+        self.stderr.write(f'Saved reviewer groups for {len(submissions)} submissions.')
@@ -0,0 +1,291 @@
+import json
+import os
+import statistics
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, setup_test_environment, teardown_test_environment
+from rest_framework.renderers import JSONRenderer
+
+from accounts.invitation_index import active_invitations, now_ms
+from accounts.models import Group, Invitation, Note, Profile
+from accounts.renderers import FastJSONRenderer
+from accounts.search import index_notes
+from accounts.serializer import UserProfileSerializer, fast_profile_serializer
+
+BENCH_PASSWORD = 'benchmark-password'
+ENDPOINTS = ['signup', 'login', 'profiles', 'groups', 'invitations', 'notes']
+# Password hashing dominates these two; they get their own request count
+AUTH_ENDPOINTS = {'signup', 'login'}
+
+
+def venue_id(index):
+    return f'Bench{index}.cc/2026/Conference'
+
+
+def percentile(ordered, p):
+    if not ordered:
+        return None
+    rank = max(0, min(len(ordered) - 1, round(p / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+class Command(BaseCommand):
+    help = (
+        'Seed a synthetic dataset and report latency percentiles, throughput and '
+        'queries per request for the accounts endpoints as JSON.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--venues', type=int, default=5)
+        parser.add_argument('--notes-per-venue', type=int, default=200)
+        parser.add_argument('--invitations-per-venue', type=int, default=3)
+        parser.add_argument('--requests', type=int, default=200, help='Requests per endpoint.')
+        parser.add_argument(
+            '--auth-requests', type=int, default=20,
+            help='Requests for signup and login, which hash passwords.',
+        )
+        parser.add_argument('--concurrency', type=int, default=1)
+        parser.add_argument('--endpoints', nargs='+', choices=ENDPOINTS, default=ENDPOINTS)
+        parser.add_argument(
+            '--url',
+            help='Drive a running server at this base URL instead of the in-process '
+                 'test client. Seed its database first with --seed-only.',
+        )
+        parser.add_argument(
+            '--seed-only', action='store_true',
+            help='Seed the configured database and exit (for use with --url).',
+        )
+        parser.add_argument(
+            '--compare-serializers', action='store_true',
+            help='Also time serializing and rendering every seeded profile with '
+                 'UserProfileSerializer + JSONRenderer against the fast path.',
+        )
+        parser.add_argument('--output', help='Write the JSON report here instead of stdout.')
+
+    def handle(self, *args, **options):
+        if options['concurrency'] < 1:
+            raise CommandError('--concurrency must be positive.')
+
+        if options['seed_only']:
+            self.seed(options)
+            self.stderr.write('Seeded the configured database.')
+            return
+
+        if options['url']:
+            report = self.run(options, self.http_request(options['url'].rstrip('/')))
+        else:
+            report = self.run_in_process(options)
+
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                f.write(output + '\n')
+        else:
+            self.stdout.write(output)
+
+    def run_in_process(self, options):
+        # Never touch the real database: seed a throwaway test database
+        setup_test_environment()
+        old_name = connection.settings_dict['NAME']
+        if connection.vendor == 'sqlite':
+            # A file rather than the shared in-memory database, so concurrent
+            # writers wait on the lock instead of failing immediately
+            tmpdir = tempfile.TemporaryDirectory()
+            connection.settings_dict['TEST']['NAME'] = os.path.join(tmpdir.name, 'benchmark.sqlite3')
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            self.seed(options)
+            report = self.run(options, self.client_request)
+            if options['compare_serializers']:
+                report['serializers'] = self.compare_serializers()
+            return report
+        finally:
+            connections.close_all()
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+    def seed(self, options):
+        started = time.perf_counter()
+        encoded = make_password(BENCH_PASSWORD)
+        now = now_ms()
+        with transaction.atomic():
+            users = User.objects.bulk_create([
+                User(username=f'bench{i}', email=f'bench{i}@example.com', password=encoded,
+                     first_name='Bench', last_name=f'User {i}')
+                for i in range(options['users'])
+            ], batch_size=1000)
+            Profile.objects.bulk_create([
+                Profile(user=user, affiliation=f'University {i % 50}', homepage=f'https://example.com/{i}')
+                for i, user in enumerate(users)
+            ], batch_size=1000)
+
+            for v in range(options['venues']):
+                venue = venue_id(v)
+                Group.from_payload({
+                    'id': venue, 'domain': venue, 'parent': venue.rsplit('/', 1)[0],
+                    'readers': ['everyone'], 'members': [],
+                    'content': {'title': {'value': f'Benchmark Conference {v}'}},
+                }).save()
+                Invitation.objects.bulk_create([
+                    Invitation.from_payload({
+                        'id': f'{venue}/-/Stage_{i}', 'invitees': ['~'],
+                        'duedate': now + (i + 1) * 86400000,
+                    })
+                    for i in range(options['invitations_per_venue'])
+                ])
+                notes = Note.objects.bulk_create([
+                    Note.from_payload({
+                        'id': f'{venue}/paper{n}', 'number': n, 'tmdate': now + n,
+                        'invitation': f'{venue}/-/Submission', 'readers': ['everyone'],
+                        'content': {
+                            'title': f'Benchmark paper {n} on theorem proving',
+                            'abstract': 'Synthetic abstract ' * 20,
+                            'authors': ['Bench User', 'Other Author'],
+                            'authorids': [f'~Bench_User{n}'],
+                        },
+                    })
+                    for n in range(1, options['notes_per_venue'] + 1)
+                ], batch_size=1000)
+                index_notes((note.id, note.payload) for note in notes)
+        active_invitations.invalidate()
+        self.stderr.write(f'Seeded in {time.perf_counter() - started:.1f}s')
+
+    def scenarios(self, options):
+        run = uuid.uuid4().hex[:8]
+        venues = max(1, options['venues'])
+        users = max(1, options['users'])
+        return {
+            'signup': ('POST', '/api/signup/', lambda i: {
+                'email': f'signup-{run}-{i}@example.com', 'password': BENCH_PASSWORD,
+                'fullname': 'Signup Bench',
+            }),
+            'login': ('POST', '/api/login/', lambda i: {
+                'email': f'bench{i % users}@example.com', 'password': BENCH_PASSWORD,
+            }),
+            'profiles': ('GET', '/api/profiles/', lambda i: {'limit': 50}),
+            'groups': ('GET', '/api/groups', lambda i: {'id': venue_id(i % venues)}),
+            'invitations': ('GET', '/api/invitations', lambda i: {
+                'invitee': '~', 'pastdue': 'false', 'type': 'all',
+            }),
+            'notes': ('GET', '/api/notes/edits', lambda i: {'domain': venue_id(i % venues)}),
+        }
+
+    def client_request(self):
+        local = threading.local()
+
+        def request(method, path, params):
+            if not hasattr(local, 'client'):
+                local.client = Client()
+            # Each thread has its own connection, so this counts only our queries
+            with CaptureQueriesContext(connection) as queries:
+                if method == 'GET':
+                    response = local.client.get(path, params)
+                else:
+                    response = local.client.post(path, params)
+                if response.streaming:
+                    b''.join(response.streaming_content)
+            return response.status_code, len(queries)
+
+        return request
+
+    def http_request(self, base_url):
+        def request(method, path, params):
+            url = base_url + path
+            data = None
+            headers = {'Accept': 'application/json'}
+            if method == 'GET':
+                url += '?' + urllib.parse.urlencode(params)
+            else:
+                data = json.dumps(params).encode()
+                headers['Content-Type'] = 'application/json'
+            try:
+                with urllib.request.urlopen(urllib.request.Request(url, data, headers, method=method)) as response:
+                    response.read()
+                    return response.status, None
+            except urllib.error.HTTPError as exc:
+                return exc.code, None
+
+        return lambda: request
+
+    def run(self, options, request_factory):
+        request = request_factory()
+        results = {}
+        for name, (method, path, make_params) in self.scenarios(options).items():
+            if name not in options['endpoints']:
+                continue
+            count = options['auth_requests'] if name in AUTH_ENDPOINTS else options['requests']
+            results[name] = self.measure(request, method, path, make_params, count, options['concurrency'])
+            if not options['url']:
+                connections.close_all()
+
+        return {
+            'config': {
+                key: options[key] for key in (
+                    'users', 'venues', 'notes_per_venue', 'invitations_per_venue',
+                    'requests', 'auth_requests', 'concurrency', 'url',
+                )
+            },
+            'endpoints': results,
+        }
+
+    def compare_serializers(self, rounds=5):
+        def best_of(serialize):
+            timings = []
+            for _ in range(rounds):
+                started = time.perf_counter()
+                body = serialize()
+                timings.append(time.perf_counter() - started)
+            return min(timings) * 1000, len(body)
+
+        # Fetch, serialize and render, as a list endpoint does
+        drf_ms, drf_bytes = best_of(lambda: JSONRenderer().render(
+            UserProfileSerializer(User.objects.select_related('profile').order_by('id'), many=True).data
+        ))
+        fast_ms, fast_bytes = best_of(lambda: FastJSONRenderer().render(
+            fast_profile_serializer.many(fast_profile_serializer.values(User.objects.order_by('id')))
+        ))
+        return {
+            'rows': User.objects.count(),
+            'drf_ms': drf_ms,
+            'fast_ms': fast_ms,
+            'speedup': drf_ms / fast_ms if fast_ms else None,
+            'drf_bytes': drf_bytes,
+            'fast_bytes': fast_bytes,
+        }
+
+    def measure(self, request, method, path, make_params, count, concurrency):
+        def one(i):
+            started = time.perf_counter()
+            status, queries = request(method, path, make_params(i))
+            return time.perf_counter() - started, status, queries
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            samples = list(pool.map(one, range(count)))
+        elapsed = time.perf_counter() - started
+
+        latencies = sorted(latency * 1000 for latency, _, _ in samples)
+        queries = [q for _, _, q in samples if q is not None]
+        return {
+            'requests': count,
+            'errors': sum(1 for _, status, _ in samples if status >= 400),
+            'p50_ms': percentile(latencies, 50),
+            'p95_ms': percentile(latencies, 95),
+            'p99_ms': percentile(latencies, 99),
+            'mean_ms': statistics.fmean(latencies) if latencies else None,
+            'throughput_rps': count / elapsed if elapsed else None,
+            'queries_per_request': statistics.fmean(queries) if queries else None,
+        }
@@ -0,0 +1,141 @@
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.core.validators import validate_email
+from django.db import IntegrityError, transaction
+
+from accounts.emails import normalize_email, users_with_emails
+from accounts.usernames import allocate_usernames, split_full_name
+
+MAX_BATCH_ATTEMPTS = 3
+
+
+class Command(BaseCommand):
+    help = (
+        'Create accounts from a JSONL file with one {"email", "password", "fullname"} '
+        'object per line, in batched transactions.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='JSONL file, or - for stdin')
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument(
+            '--jobs', type=int, default=os.cpu_count() or 1,
+            help='Processes used to hash passwords (default: CPU count).',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        if batch_size < 1:
+            raise CommandError('--batch-size must be positive.')
+
+        self.created = self.skipped = 0
+        self.seen_emails = set()
+        with ProcessPoolExecutor(max_workers=options['jobs']) as pool:
+            self.pool = pool
+            batch = []
+            for line_no, record in self.read_records(options['path']):
+                entry = self.validate(line_no, record)
+                if entry is None:
+                    continue
+                batch.append(entry)
+                if len(batch) >= batch_size:
+                    self.create_batch(batch)
+                    batch = []
+            if batch:
+                self.create_batch(batch)
+
+        self.stdout.write(self.style.SUCCESS(f'Created {self.created} users, skipped {self.skipped}.'))
+
+    def read_records(self, path):
+        stream = sys.stdin if path == '-' else open(path, encoding='utf-8')
+        try:
+            for line_no, line in enumerate(stream, 1):
+                if not line.strip():
+                    continue
+                try:
+                    yield line_no, json.loads(line)
+                except ValueError:
+                    self.skip(line_no, 'invalid JSON')
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+
+    def skip(self, line_no, reason):
+        self.skipped += 1
+        self.stderr.write(f'line {line_no}: skipped ({reason})')
+
+    def validate(self, line_no, record):
+        if not isinstance(record, dict):
+            return self.skip(line_no, 'not an object')
+        email = record.get('email')
+        password = record.get('password')
+        full_name = record.get('fullname')
+        if not all(isinstance(value, str) and value for value in (email, password, full_name)):
+            return self.skip(line_no, 'email, fullname and password are required')
+        try:
+            validate_email(email)
+        except ValidationError:
+            return self.skip(line_no, 'invalid email address')
+
+        email = normalize_email(email)
+        if email in self.seen_emails:
+            return self.skip(line_no, 'duplicate email in input')
+        self.seen_emails.add(email)
+        return line_no, email, password, full_name
+
+    def registered(self, emails):
+        return {normalize_email(email) for email in users_with_emails(emails).values_list('email', flat=True)}
+
+    def create_batch(self, batch):
+        existing = self.registered([email for _, email, _, _ in batch])
+        entries = []
+        for line_no, email, password, full_name in batch:
+            if email in existing:
+                self.skip(line_no, 'email is already registered')
+            else:
+                entries.append((line_no, email, password, full_name))
+        if not entries:
+            return
+
+        hashes = list(self.pool.map(make_password, [password for _, _, password, _ in entries], chunksize=16))
+        entries = [entry + (encoded,) for entry, encoded in zip(entries, hashes)]
+
+        for attempt in range(MAX_BATCH_ATTEMPTS):
+            # Usernames are re-allocated on retry in case a concurrent signup
+            # claimed one of them between our prefix query and the insert.
+            usernames = allocate_usernames([email for _, email, _, _, _ in entries])
+            users = []
+            for (_, email, _, full_name, encoded), username in zip(entries, usernames):
+                first_name, last_name = split_full_name(full_name)
+                users.append(User(
+                    username=username,
+                    email=email,
+                    password=encoded,
+                    first_name=first_name,
+                    last_name=last_name,
+                ))
+            try:
+                with transaction.atomic():
+                    User.objects.bulk_create(users)
+            except IntegrityError:
+                if attempt == MAX_BATCH_ATTEMPTS - 1:
+                    raise
+                # Or one of the addresses was registered meanwhile
+                existing = self.registered([email for _, email, _, _, _ in entries])
+                for line_no, email, _, _, _ in entries:
+                    if email in existing:
+                        self.skip(line_no, 'email is already registered')
+                entries = [entry for entry in entries if entry[1] not in existing]
+                if not entries:
+                    return
+                continue
+            self.created += len(users)
+            self.stdout.write(f'{self.created} users created')
+            return
@@ -0,0 +1,179 @@
+import json
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from accounts import membership
+from accounts.homepage import invalidate_homepage
+from accounts.invitation_index import active_invitations
+from accounts.models import Group, Invitation, Note
+from accounts.responses import invalidate_payload
+from accounts.search import index_notes
+
+KINDS = ['group', 'invitation', 'note']
+MODELS = {'group': Group, 'invitation': Invitation, 'note': Note}
+# Columns refreshed when a record is imported again
+UPDATE_FIELDS = {
+    'group': ['domain', 'parent', 'members', 'tmdate', 'payload'],
+    'invitation': ['domain', 'duedate', 'invitees', 'tmdate', 'payload'],
+    'note': ['invitation', 'domain', 'forum', 'number', 'tmdate', 'payload'],
+}
+# Seconds between progress lines
+PROGRESS_INTERVAL = 5
+
+
+def detect_kind(record):
+    if 'invitation' in record:
+        return 'note'
+    if '/-/' in record['id']:
+        return 'invitation'
+    return 'group'
+
+
+class Command(BaseCommand):
+    help = (
+        'Stream an OpenReview JSONL export of groups, invitations and notes into the '
+        'database in batched upserts. Resumes from a checkpoint file after a crash.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='JSONL file with one group, invitation or note per line')
+        parser.add_argument(
+            '--kind', choices=KINDS,
+            help='Type of every record (default: detect per record; notes have an "invitation", '
+                 'invitation ids contain "/-/").',
+        )
+        parser.add_argument('--batch-size', type=int, default=1000, help='Records per transaction.')
+        parser.add_argument('--checkpoint', help='Checkpoint file (default: <path>.checkpoint).')
+        parser.add_argument('--restart', action='store_true', help='Ignore an existing checkpoint.')
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be positive.')
+        path = options['path']
+        if not os.path.isfile(path):
+            raise CommandError(f'{path} is not a file.')
+        self.checkpoint_path = options['checkpoint'] or path + '.checkpoint'
+        self.kind = options['kind']
+
+        state = {'offset': 0, 'line': 0, 'imported': dict.fromkeys(KINDS, 0), 'skipped': 0}
+        if not options['restart'] and os.path.exists(self.checkpoint_path):
+            with open(self.checkpoint_path) as f:
+                state = json.load(f)
+            self.stderr.write(f"Resuming at line {state['line'] + 1} (byte {state['offset']}).")
+        self.state = state
+        self.total_bytes = os.path.getsize(path)
+        self.started = self.last_progress = time.monotonic()
+        self.start_offset = state['offset']
+        self.start_records = sum(state['imported'].values())
+
+        batch = {kind: {} for kind in KINDS}
+        size = 0
+        with open(path, 'rb') as stream:
+            stream.seek(state['offset'])
+            offset, line_no = state['offset'], state['line']
+            for line in stream:
+                offset += len(line)
+                line_no += 1
+                entry = self.parse(line_no, line)
+                if entry is not None:
+                    kind, record = entry
+                    # Last copy wins; an upsert cannot touch a row twice
+                    batch[kind][record['id']] = record
+                    size += 1
+                if size >= options['batch_size']:
+                    self.write_batch(batch, offset, line_no)
+                    batch = {kind: {} for kind in KINDS}
+                    size = 0
+            self.write_batch(batch, offset, line_no)
+
+        self.progress(final=True)
+        os.remove(self.checkpoint_path)
+        imported = ', '.join(f'{count} {kind}s' for kind, count in self.state['imported'].items())
+        self.stdout.write(self.style.SUCCESS(f"Imported {imported}; skipped {self.state['skipped']}."))
+
+    def skip(self, line_no, reason):
+        self.state['skipped'] += 1
+        self.stderr.write(f'line {line_no}: skipped ({reason})')
+
+    def parse(self, line_no, line):
+        if not line.strip():
+            return None
+        try:
+            record = json.loads(line)
+        except ValueError:
+            return self.skip(line_no, 'invalid JSON')
+        if not isinstance(record, dict):
+            return self.skip(line_no, 'not an object')
+        if not isinstance(record.get('id'), str) or not 0 < len(record['id']) <= 255:
+            return self.skip(line_no, 'id must be a string of at most 255 characters')
+
+        kind = self.kind or detect_kind(record)
+        if kind == 'note' and not isinstance(record.get('invitation'), str):
+            return self.skip(line_no, 'notes need an invitation')
+        if kind == 'group' and not isinstance(record.get('members', []), list):
+            return self.skip(line_no, 'members must be a list')
+        if kind == 'invitation' and not isinstance(record.get('invitees', []), list):
+            return self.skip(line_no, 'invitees must be a list')
+        for field in ('tmdate', 'duedate', 'number'):
+            if record.get(field) is not None and not isinstance(record[field], int):
+                return self.skip(line_no, f'{field} must be an integer')
+        return kind, record
+
+    def write_batch(self, batch, offset, line_no):
+        # Venues whose homepage shows something in this batch
+        domains = set(batch['group'])
+        with transaction.atomic():
+            for kind in KINDS:
+                records = batch[kind]
+                if not records:
+                    continue
+                objects = [MODELS[kind].from_payload(record) for record in records.values()]
+                if kind != 'group':
+                    domains.update(obj.domain for obj in objects)
+                MODELS[kind].objects.bulk_create(
+                    objects,
+                    update_conflicts=True,
+                    unique_fields=['id'],
+                    update_fields=UPDATE_FIELDS[kind],
+                )
+                self.state['imported'][kind] += len(records)
+            # bulk_create sends no signals; keep the derived indexes in step
+            if batch['note']:
+                index_notes((note_id, record) for note_id, record in batch['note'].items())
+            if batch['group']:
+                membership.refresh(batch['group'])
+
+        if batch['group'] or batch['invitation']:
+            active_invitations.invalidate()
+        for group_id in batch['group']:
+            invalidate_payload(f'groups:{group_id}')
+        for domain in domains:
+            invalidate_homepage(domain)
+
+        self.state['offset'], self.state['line'] = offset, line_no
+        self.save_checkpoint()
+        if time.monotonic() - self.last_progress >= PROGRESS_INTERVAL:
+            self.progress()
+
+    def save_checkpoint(self):
+        # Written after the transaction commits; a crash in between only
+        # means the last batch is upserted again on resume
+        temporary = self.checkpoint_path + '.tmp'
+        with open(temporary, 'w') as f:
+            json.dump(self.state, f)
+        os.replace(temporary, self.checkpoint_path)
+
+    def progress(self, final=False):
+        self.last_progress = time.monotonic()
+        elapsed = max(self.last_progress - self.started, 1e-9)
+        records = sum(self.state['imported'].values()) - self.start_records
+        megabytes = (self.state['offset'] - self.start_offset) / 1e6
+        percent = 100 * self.state['offset'] / self.total_bytes if self.total_bytes else 100
+        self.stderr.write(
+            f"{'Done' if final else 'Progress'}: {percent:.1f}% ({self.state['line']} lines), "
+            f"{records} records this run, {megabytes / elapsed:.1f} MB/s, "
+            f"{records / elapsed:.0f} records/s"
+        )
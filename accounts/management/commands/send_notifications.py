@@ -0,0 +1,42 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.notifications import send_batch
+
+
+class Command(BaseCommand):
+    help = (
+        'Deliver queued notification emails in batches over one reused '
+        'connection per batch, retrying failures with exponential backoff.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, help='Messages per batch (default: NOTIFICATIONS["BATCH_SIZE"]).')
+        parser.add_argument('--loop', action='store_true', help='Keep polling the outbox instead of exiting when it is empty.')
+        parser.add_argument('--interval', type=float, default=5.0, help='Seconds between polls of an empty outbox with --loop.')
+
+    def handle(self, *args, **options):
+        if options['batch_size'] is not None and options['batch_size'] < 1:
+            raise CommandError('--batch-size must be positive.')
+
+        totals = [0, 0, 0]
+        while True:
+            try:
+                counts = send_batch(options['batch_size'])
+            except Exception as exc:
+                if not options['loop']:
+                    raise
+                # e.g. the database is briefly unavailable; a worker keeps going
+                self.stderr.write(f'batch failed: {exc!r}')
+                time.sleep(options['interval'])
+                continue
+            totals = [total + count for total, count in zip(totals, counts)]
+            if any(counts):
+                self.stderr.write('sent {}, retrying {}, failed {}'.format(*counts))
+                continue
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+
+        self.stdout.write(self.style.SUCCESS('Sent {}, retrying {}, failed {}.'.format(*totals)))
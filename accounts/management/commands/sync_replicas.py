@@ -0,0 +1,30 @@
+import sqlite3
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+
+class Command(BaseCommand):
+    help = 'Copy the primary SQLite database into every alias in DATABASE_REPLICAS.'
+
+    def handle(self, *args, **options):
+        primary = connections['default']
+        if primary.vendor != 'sqlite':
+            raise CommandError('sync_replicas only supports SQLite databases.')
+        if not settings.DATABASE_REPLICAS:
+            raise CommandError('No replicas configured; set OPENREVIEW_DB_REPLICAS.')
+
+        source = sqlite3.connect(primary.settings_dict['NAME'])
+        try:
+            for alias in settings.DATABASE_REPLICAS:
+                connections[alias].close()
+                target = sqlite3.connect(connections[alias].settings_dict['NAME'])
+                try:
+                    # Online backup: consistent even while the primary is being written
+                    source.backup(target)
+                finally:
+                    target.close()
+                self.stdout.write(f'{alias} synced')
+        finally:
+            source.close()
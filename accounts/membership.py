@@ -0,0 +1,123 @@
+from django.db import transaction
+
+from accounts.lru import LRUCache
+from accounts.models import Group, GroupMembership
+from accounts.versions import bump_version, current_version
+
+VERSION_NAME = 'group-membership'
+
+# Effective group sets by (membership version, user ids)
+_effective = LRUCache(maxsize=10000)
+
+
+def user_ids(user):
+    """
+    The principals that name ``user`` directly: its tilde id. Signup emails
+    are never verified, so an address listed in a group grants nothing.
+    """
+    return {'~' + user.username}
+
+
+def is_group_id(value):
+    # Profiles are "~First_Last1", emails contain "@"; anything else is a group
+    return not value.startswith('~') and '@' not in value
+
+
+def closure(direct, known=None):
+    """
+    ``{group: every principal it contains}`` for the groups in ``direct``
+    (``{group: direct members}``). ``known`` holds already computed closures
+    of member groups outside ``direct``. Cycles are fine.
+    """
+    known = known or {}
+    result = {}
+    for group, members in direct.items():
+        members = set(members)
+        for member in list(members):
+            members.update(known.get(member, ()))
+        result[group] = members
+
+    changed = True
+    while changed:
+        changed = False
+        for group, members in result.items():
+            size = len(members)
+            for member in direct[group]:
+                if member != group and member in result:
+                    members |= result[member]
+            changed |= len(members) != size
+    return result
+
+
+def refresh(group_ids):
+    """
+    Recompute the closure rows of ``group_ids`` and of every group that
+    contains one of them, after their members changed or they were deleted.
+    Rows of unrelated groups are left alone.
+    """
+    group_ids = set(group_ids)
+    affected = group_ids | set(
+        GroupMembership.objects.filter(member__in=group_ids).values_list('group', flat=True)
+    )
+    direct = dict(Group.objects.filter(id__in=affected).values_list('id', 'members'))
+    children = {m for members in direct.values() for m in members if is_group_id(m)} - affected
+    known = {}
+    for group, member in GroupMembership.objects.filter(group__in=children).values_list('group', 'member'):
+        known.setdefault(group, set()).add(member)
+
+    rows = [
+        GroupMembership(group=group, member=member)
+        for group, members in closure(direct, known).items()
+        for member in members
+    ]
+    with transaction.atomic():
+        GroupMembership.objects.filter(group__in=affected).delete()
+        GroupMembership.objects.bulk_create(rows, batch_size=1000)
+    bump_version(VERSION_NAME)
+
+
+def rebuild():
+    """Recompute the whole closure table, e.g. after bulk imports of groups."""
+    direct = dict(Group.objects.values_list('id', 'members'))
+    rows = [
+        GroupMembership(group=group, member=member)
+        for group, members in closure(direct).items()
+        for member in members
+    ]
+    with transaction.atomic():
+        GroupMembership.objects.all().delete()
+        GroupMembership.objects.bulk_create(rows, batch_size=1000)
+    bump_version(VERSION_NAME)
+
+
+def effective_groups(ids):
+    """Every group that contains one of ``ids``, directly or transitively."""
+    key = (current_version(VERSION_NAME), frozenset(ids))
+    groups = _effective.get(key)
+    if groups is None:
+        groups = frozenset(
+            GroupMembership.objects.filter(member__in=key[1]).values_list('group', flat=True).distinct()
+        )
+        _effective.set(key, groups)
+    return groups
+
+
+def reader_principals(request):
+    """
+    The reader values that admit the requesting user, computed once per
+    request: "everyone", and for signed-in users "~", their own ids and
+    their effective groups.
+    """
+    principals = getattr(request, '_reader_principals', None)
+    if principals is None:
+        principals = {'everyone'}
+        if request.user.is_authenticated:
+            ids = user_ids(request.user)
+            principals |= {'~'} | ids | effective_groups(ids)
+        principals = frozenset(principals)
+        request._reader_principals = principals
+    return principals
+
+
+def can_read(readers, principals):
+    return not principals.isdisjoint(readers or ['everyone'])
@@ -0,0 +1,226 @@
+import json
+import logging
+import threading
+import time
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+
+from accounts import db_router
+from accounts.conf import get_setting
+
+logger = logging.getLogger('accounts.performance')
+
+DEFAULTS = {
+    'SLOW_REQUEST_MS': 500,
+    'SERVER_TIMING': True,
+    # Statements attached to a slow request log entry, slowest first
+    'SLOW_SQL_LIMIT': 20,
+}
+
+# Upper bounds (ms) of the latency histogram buckets; the last is +Inf
+BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, float('inf'))
+
+
+class QueryRecorder:
+    """``execute_wrapper`` that times every statement run on a connection."""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.statements = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - started
+            self.count += 1
+            self.total += duration
+            self.statements.append((duration, sql))
+
+
+class RouteHistograms:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._routes = {}
+
+    def observe(self, route, record):
+        with self._lock:
+            stats = self._routes.get(route)
+            if stats is None:
+                stats = self._routes[route] = {
+                    'count': 0, 'total_ms': 0.0, 'db_count': 0, 'db_ms': 0.0, 'db_queries': 0,
+                    'response_bytes': 0, 'buckets': [0] * len(BUCKETS_MS),
+                }
+            stats['count'] += 1
+            stats['total_ms'] += record['total_ms']
+            # Only requests whose queries were measured; see PerformanceMiddleware
+            if record['db_queries'] is not None:
+                stats['db_count'] += 1
+                stats['db_ms'] += record['db_ms']
+                stats['db_queries'] += record['db_queries']
+            stats['response_bytes'] += record['response_bytes'] or 0
+            for i, bound in enumerate(BUCKETS_MS):
+                if record['total_ms'] <= bound:
+                    stats['buckets'][i] += 1
+                    break
+
+    def snapshot(self):
+        with self._lock:
+            routes = {route: dict(stats, buckets=list(stats['buckets'])) for route, stats in self._routes.items()}
+        labels = [str(bound) if bound != float('inf') else '+Inf' for bound in BUCKETS_MS]
+        for stats in routes.values():
+            stats['buckets'] = dict(zip(labels, stats['buckets']))
+            stats['mean_ms'] = stats['total_ms'] / stats['count']
+        return routes
+
+    def reset(self):
+        with self._lock:
+            self._routes.clear()
+
+
+route_histograms = RouteHistograms()
+
+
+class PerformanceMiddleware:
+    """
+    Records view, database and render time plus response size for every
+    request. Adds a ``Server-Timing`` header, logs slow requests with their
+    SQL to the ``accounts.performance`` logger, and aggregates per-route
+    histograms served by ``metrics_api``.
+
+    Database statistics are collected for the request thread only. Under
+    ASGI the views' queries run on other threads, so those requests carry no
+    database statistics at all rather than a count of zero.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        started = time.perf_counter()
+        recorder = QueryRecorder()
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(recorder))
+            response = self.get_response(request)
+        return self._finish(request, response, started, recorder)
+
+    async def __acall__(self, request):
+        started = time.perf_counter()
+        response = await self.get_response(request)
+        return self._finish(request, response, started, None)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request._perf_view_started = time.perf_counter()
+
+    def process_template_response(self, request, response):
+        # DRF responses render after this hook; time the render step
+        request._perf_render_started = time.perf_counter()
+
+        def rendered(response):
+            request._perf_render_finished = time.perf_counter()
+
+        response.add_post_render_callback(rendered)
+        return response
+
+    def _finish(self, request, response, started, recorder):
+        finished = time.perf_counter()
+        view_started = getattr(request, '_perf_view_started', started)
+        render_started = getattr(request, '_perf_render_started', None)
+        render_ms = 0.0
+        view_finished = finished
+        if render_started is not None:
+            view_finished = render_started
+            render_ms = (getattr(request, '_perf_render_finished', finished) - render_started) * 1000
+
+        record = {
+            'method': request.method,
+            'path': request.path,
+            'route': _route(request),
+            'status': response.status_code,
+            'total_ms': (finished - started) * 1000,
+            'view_ms': (view_finished - view_started) * 1000,
+            'render_ms': render_ms,
+            'db_ms': None if recorder is None else recorder.total * 1000,
+            'db_queries': None if recorder is None else recorder.count,
+            'response_bytes': None if response.streaming else len(response.content),
+        }
+        route_histograms.observe(f"{record['method']} {record['route']}", record)
+
+        if get_setting('PERFORMANCE', 'SERVER_TIMING', DEFAULTS):
+            timings = [f"total;dur={record['total_ms']:.1f}", f"view;dur={record['view_ms']:.1f}"]
+            if recorder is not None:
+                timings.append(f"db;dur={record['db_ms']:.1f};desc=\"{record['db_queries']} queries\"")
+            timings.append(f"render;dur={record['render_ms']:.1f}")
+            response['Server-Timing'] = ', '.join(timings)
+
+        if record['total_ms'] >= get_setting('PERFORMANCE', 'SLOW_REQUEST_MS', DEFAULTS):
+            if recorder is not None:
+                limit = get_setting('PERFORMANCE', 'SLOW_SQL_LIMIT', DEFAULTS)
+                slowest = sorted(recorder.statements, key=lambda s: s[0], reverse=True)[:limit]
+                record['sql'] = [{'ms': round(duration * 1000, 3), 'sql': sql} for duration, sql in slowest]
+            logger.warning(json.dumps(record))
+        return response
+
+
+def _route(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'unresolved'
+    return '/' + match.route if match.route else match.view_name
+
+
+class ReplicaStickinessMiddleware:
+    """
+    Pins a client to the primary database for ``REPLICA_STICKY_SECONDS``
+    after a request that wrote, using a cookie, so follow-up reads do not hit
+    a replica that has not caught up yet. See ``accounts.db_router``.
+    """
+
+    cookie_name = 'pin_primary'
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        tokens = db_router.begin_request(self.cookie_name in request.COOKIES)
+        try:
+            response = self.get_response(request)
+        finally:
+            wrote = db_router.end_request(tokens)
+        return self._finish(response, wrote)
+
+    async def __acall__(self, request):
+        tokens = db_router.begin_request(self.cookie_name in request.COOKIES)
+        try:
+            response = await self.get_response(request)
+        finally:
+            wrote = db_router.end_request(tokens)
+        return self._finish(response, wrote)
+
+    def _finish(self, response, wrote):
+        if wrote and db_router.replicas():
+            response.set_cookie(
+                self.cookie_name, '1',
+                max_age=getattr(settings, 'REPLICA_STICKY_SECONDS', 10),
+                httponly=True, samesite='Lax',
+            )
+        return response
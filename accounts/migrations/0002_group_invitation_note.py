@@ -0,0 +1,53 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Group',
+            fields=[
+                ('id', models.CharField(max_length=255, primary_key=True, serialize=False)),
+                ('domain', models.CharField(blank=True, db_index=True, max_length=255)),
+                ('parent', models.CharField(blank=True, db_index=True, max_length=255)),
+                ('members', models.JSONField(blank=True, default=list)),
+                ('tmdate', models.BigIntegerField(blank=True, null=True)),
+                ('payload', models.JSONField()),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Invitation',
+            fields=[
+                ('id', models.CharField(max_length=255, primary_key=True, serialize=False)),
+                ('domain', models.CharField(db_index=True, max_length=255)),
+                ('duedate', models.BigIntegerField(blank=True, db_index=True, null=True)),
+                ('invitees', models.JSONField(blank=True, default=list)),
+                ('tmdate', models.BigIntegerField(blank=True, null=True)),
+                ('payload', models.JSONField()),
+            ],
+            options={
+                'indexes': [models.Index(fields=['domain', 'duedate'], name='accounts_in_domain_94dc6b_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='Note',
+            fields=[
+                ('id', models.CharField(max_length=255, primary_key=True, serialize=False)),
+                ('invitation', models.CharField(max_length=255)),
+                ('domain', models.CharField(max_length=255)),
+                ('forum', models.CharField(blank=True, max_length=255)),
+                ('number', models.IntegerField(blank=True, null=True)),
+                ('tmdate', models.BigIntegerField(blank=True, null=True)),
+                ('payload', models.JSONField()),
+            ],
+            options={
+                'indexes': [models.Index(fields=['domain', 'number', 'id'], name='accounts_no_domain_fd9b96_idx'), models.Index(fields=['invitation', 'number'], name='accounts_no_invitat_628b4e_idx'), models.Index(fields=['domain', 'tmdate'], name='accounts_no_domain_832ab3_idx')],
+            },
+        ),
+    ]
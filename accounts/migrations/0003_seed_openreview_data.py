@@ -0,0 +1,306 @@
+from django.db import migrations
+
+# The data is kept here rather than imported from the app so this migration
+# keeps doing what it did when it was first applied.
+
+ACTIVE_VENUES = {
+    "groups": [
+        {
+            "id": "active_venues",
+            "cdate": 1595932124826,
+            "ddate": None,
+            "tcdate": None,
+            "tmdate": 1750450706275,
+            "tddate": None,
+            "web": None,
+            "signatures": ["OpenReview.net/Support"],
+            "signatories": ["OpenReview.net"],
+            "readers": ["everyone"],
+            "nonreaders": [],
+            "writers": ["OpenReview.net/Support"],
+            "members": [
+                "TMLR",
+                "Computo",
+                "DMLR",
+                "YouthLACIGF.lat/2024/Edition",
+                "ISAPh/2024/Symposium",
+                "MSLD/2024/Meeting",
+                "icaps-conference.org/ICAPS/2024/Demo_Track",
+                "sfb1102.uni-saarland.de/RAILS/2025/Conference",
+                "jpmorganchase.com/2025/ML/Conference"
+            ]
+        }
+    ]
+}
+
+HOST_GROUP = {
+    "groups": [
+        {
+            "id": "host",
+            "cdate": 1495570582864,
+            "ddate": None,
+            "tcdate": None,
+            "tmdate": 1750269735058,
+            "tddate": None,
+            "tauthor": "OpenReview.net",
+            "web": None,
+            "signatures": ["~Super_User1"],
+            "signatories": ["OpenReview.net"],
+            "readers": ["everyone"],
+            "nonreaders": [],
+            "writers": ["OpenReview.net"],
+            "members": [
+                "ICLR.cc",
+                "auai.org/UAI",
+                "ICML.cc",
+                "ACM.org",
+                "AKBC.ws",
+                "learningtheory.org/COLT",
+                "eswc-conferences.org/ESWC",
+                "IEEE.org",
+                "ISMIR.net",
+                "swsa.semanticweb.org/ISWC",
+                "machineintelligence.cc/MIC",
+                "MIDL.io",
+                "roboticsfoundation.org/RSS"
+            ]
+        }
+    ]
+}
+
+INVITATIONS = {
+    "invitations": [
+        {
+            "reply": {
+                "readers": {
+                    "values-copied": [
+                        "microsoft.com/AI4Science/2022/Internal/PBS",
+                        "{content.authorids}",
+                        "{signatures}"
+                    ]
+                },
+                "writers": {
+                    "values-copied": [
+                        "microsoft.com/AI4Science/2022/Internal/PBS",
+                        "{content.authorids}",
+                        "{signatures}"
+                    ]
+                },
+                "signatures": {
+                    "values-regex": "~.*"
+                },
+                "content": {
+                    "title": {
+                        "description": "Title of paper. Add TeX formulas using the following formats: $In-line Formula$ or $$Block Formula$$",
+                        "order": 1,
+                        "value-regex": "(?!^ +$)^.{1,250}$",
+                        "required": True
+                    },
+                    "authors": {
+                        "description": "List of author names",
+                        "order": 2,
+                        "values-regex": "^.{1,5000}$",
+                        "required": True
+                    }
+                }
+            }
+        }
+    ]
+}
+
+WEBFIELD = """// Webfield component
+return {
+  component: 'VenueHomepage',
+  properties: {
+    header: {
+      title: '2nd AI for Math Workshop @ ICML 2025',
+      subtitle: 'AI4MATH',
+      website: 'https://sites.google.com/view/ai4mathworkshopicml2025',
+      contact: 'ai4mathicml@gmail.com',
+      location: 'Vienna, Austria',
+      instructions: 'Please see the venue website for more information.',
+      date: 'Jul 18 2025',
+      deadline: 'Submission Start: Mar 18 2025 11:59PM UTC-0, Submission Deadline: Jun 21 2025 11:59AM UTC-0'
+    },
+     submission_id: 'ICML.cc/2025/Workshop/AI4MATH/-/Submission',
+    parentGroupId: 'ICML.cc/2025/Workshop',
+    "submission_id": "ICML.cc/2025/Workshop/AI4MATH/-/Submission",
+    "tabs": [
+        {"name": "Recent Activity", "type": "activity"}
+    ],
+
+
+  }
+}"""
+
+
+AI4MATH_GROUP_ID = 'ICML.cc/2025/Workshop/AI4MATH'
+
+
+def ai4math_group(group_id=AI4MATH_GROUP_ID):
+    return {
+        "groups": [{
+            "id": group_id,
+            "signatures": ["~Super_User1"],
+            "signatories": [group_id],
+            "readers": ["everyone"],
+            "writers": [group_id],
+            "invitations": [
+                "OpenReview.net/-/Edit",
+                f"{group_id}/-/Edit"
+            ],
+            "domain": group_id,
+            "parent": "ICML.cc/2025/Workshop",
+            "details": {
+                "writable": True
+            },
+            "content": {
+                "title": {"value": "2nd AI for Math Workshop @ ICML 2025"},
+                "subtitle": {"value": "AI4MATH"},
+                "website": {"value": "https://sites.google.com/view/ai4mathworkshopicml2025"},
+                "contact": {"value": "ai4mathicml@gmail.com"},
+                "location": {"value": "Vienna, Austria"},
+                "instructions": {"value": "Please see the venue website for more information."},
+                "date": {"value": "Jul 18 2025"},
+                "deadline": {"value": "Submission Start: Mar 18 2025 11:59PM UTC-0, Submission Deadline: Jun 21 2025 11:59AM UTC-0"},
+                "submission_id": {"value": f"{group_id}/-/Submission"},
+                "parentGroupId": {"value": "ICML.cc/2025/Workshop"},
+                "meta_invitation_id": {"value": f"{group_id}/-/Edit"},
+                "submission_name": {"value": "Submission"},
+                "submission_venue_id": {"value": f"{group_id}/Submission"},
+                "withdrawn_venue_id": {"value": f"{group_id}/Withdrawn_Submission"},
+                "desk_rejected_venue_id": {"value": f"{group_id}/Desk_Rejected_Submission"},
+                "rejected_venue_id": {"value": f"{group_id}/Rejected_Submission"},
+                "public_submissions": {"value": False},
+                "submission_email_template": {
+                    "value": "Your submission to AI4MATH has been {{action}}.\n\nSubmission Number: {{note_number}} \n\nTitle: {{note_title}} \n\nTo view your submission, click here: https://openreview.net/forum?id={{note_forum}}"
+                },
+                "submission_email_pcs": {"value": False},
+                "program_chairs_id": {"value": f"{group_id}/Program_Chairs"},
+                "reviewers_id": {"value": f"{group_id}/Reviewers"},
+                "authors_id": {"value": f"{group_id}/Authors"},
+                "authors_name": {"value": "Authors"},
+                "withdraw_expiration_id": {"value": f"{group_id}/-/Withdraw_Expiration"},
+                "desk_reject_expiration_id": {"value": f"{group_id}/-/Desk_Reject_Expiration"},
+                "automatic_reviewer_assignment": {"value": True},
+                "review_name": {"value": "Official_Review"},
+                "review_email_pcs": {"value": False},
+                "comment_mandatory_readers": {"value": [f"{group_id}/Program_Chairs"]},
+                "comment_email_pcs": {"value": False},
+                "rebuttal_name": {"value": "Rebuttal"},
+                "reviewer_roles": {"value": ["Reviewers"]}
+            },
+            "submission_id": "ICML.cc/2025/Workshop/AI4MATH/-/Submission",
+            "tabs": [
+                {"name": "Recent Activity", "type": "activity"}
+            ],
+
+
+            "web": WEBFIELD
+        }]
+    }
+
+
+SEED_GROUPS = [
+    ACTIVE_VENUES["groups"][0],
+    HOST_GROUP["groups"][0],
+    ai4math_group()["groups"][0],
+]
+
+SEED_INVITATIONS = [
+    {
+        "id": "ICML.cc/2025/Workshop/AI4MATH/-/Submission",
+        "signatures": ["ICML.cc/2025/Workshop/AI4MATH"],
+        "readers": ["everyone"],
+        "writers": ["ICML.cc/2025/Workshop/AI4MATH"],
+        "invitees": ["everyone"],
+        "multiReply": False,
+        "duedate": 1760000000000,
+        "details": {
+            "writable": True
+        },
+        "reply": {
+            "readers": {"values": ["everyone"]},
+            "writers": {"values-copied": ["authors"]},
+            "signatures": {"values-regex": "~.*"},
+            "content": {
+                "title": {"order": 1, "value": "string"},
+                "abstract": {"order": 2, "value": "string"},
+                "authors": {"order": 3, "value": ["string"]}
+            }
+        }
+    },
+    {
+        "id": "GSCL.cc/2025/Workshop/CPSS/-/Submission",
+        "duedate": 1750200000000,
+        "details": {"writable": True}
+    },
+    {
+        "id": "IEEE.org/ISWC/2025/-/Submission",
+        "duedate": 1750400000000,
+        "details": {"writable": True}
+    }
+]
+
+SEED_NOTES = [
+    {
+        "id": "AI4MATH-paper1",
+        "invitation": "ICML.cc/2025/Workshop/AI4MATH/-/Submission",
+        "signatures": ["ICML.cc/2025/Workshop/AI4MATH/Authors"],
+        "readers": ["everyone"],
+        "writers": ["ICML.cc/2025/Workshop/AI4MATH/Authors"],
+        "content": {
+            "title": "An Amazing Math AI Paper",
+            "abstract": "This paper explores mathematical reasoning in AI.",
+            "authors": ["Alice", "Bob"],
+            "authorids": ["~Alice1", "~Bob1"]
+        }
+    }
+]
+
+
+def load_seed(apps, schema_editor):
+    Group = apps.get_model('accounts', 'Group')
+    Invitation = apps.get_model('accounts', 'Invitation')
+    Note = apps.get_model('accounts', 'Note')
+
+    for data in SEED_GROUPS:
+        Group.objects.update_or_create(id=data['id'], defaults={
+            'domain': data.get('domain') or '',
+            'parent': data.get('parent') or '',
+            'members': data.get('members') or [],
+            'tmdate': data.get('tmdate'),
+            'payload': data,
+        })
+    for data in SEED_INVITATIONS:
+        Invitation.objects.update_or_create(id=data['id'], defaults={
+            'domain': data['id'].split('/-/')[0],
+            'duedate': data.get('duedate'),
+            'invitees': data.get('invitees') or [],
+            'tmdate': data.get('tmdate'),
+            'payload': data,
+        })
+    for data in SEED_NOTES:
+        Note.objects.update_or_create(id=data['id'], defaults={
+            'invitation': data['invitation'],
+            'domain': data['invitation'].split('/-/')[0],
+            'forum': data['id'],
+            'payload': data,
+        })
+
+
+def unload_seed(apps, schema_editor):
+    apps.get_model('accounts', 'Note').objects.filter(id__in=[n['id'] for n in SEED_NOTES]).delete()
+    apps.get_model('accounts', 'Invitation').objects.filter(id__in=[i['id'] for i in SEED_INVITATIONS]).delete()
+    apps.get_model('accounts', 'Group').objects.filter(id__in=[g['id'] for g in SEED_GROUPS]).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_group_invitation_note'),
+    ]
+
+    operations = [
+        migrations.RunPython(load_seed, unload_seed),
+    ]
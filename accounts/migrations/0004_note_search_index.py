@@ -0,0 +1,69 @@
+from django.db import migrations
+
+# A snapshot of accounts.search as of this migration, so later changes to the
+# app module do not change what applying it does.
+FTS_TABLE = 'accounts_note_fts'
+DOCID_TABLE = 'accounts_note_search'
+
+CREATE_SQL = [
+    f'CREATE TABLE IF NOT EXISTS {DOCID_TABLE} ('
+    'docid INTEGER PRIMARY KEY, note_id TEXT NOT NULL UNIQUE)',
+    f'CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5('
+    "title, abstract, authors, tokenize = 'porter unicode61 remove_diacritics 2')",
+]
+DROP_SQL = [
+    f'DROP TABLE IF EXISTS {FTS_TABLE}',
+    f'DROP TABLE IF EXISTS {DOCID_TABLE}',
+]
+
+
+def _value(field):
+    if isinstance(field, dict):
+        field = field.get('value')
+    if isinstance(field, (list, tuple)):
+        return ' '.join(str(item) for item in field)
+    return '' if field is None else str(field)
+
+
+def _document(payload):
+    content = payload.get('content') or {}
+    return _value(content.get('title')), _value(content.get('abstract')), _value(content.get('authors'))
+
+
+def create_index(apps, schema_editor):
+    conn = schema_editor.connection
+    if conn.vendor != 'sqlite':
+        return
+    Note = apps.get_model('accounts', 'Note')
+    with conn.cursor() as cursor:
+        for statement in CREATE_SQL:
+            cursor.execute(statement)
+        for note_id, payload in Note.objects.values_list('id', 'payload').iterator():
+            cursor.execute(f'INSERT OR IGNORE INTO {DOCID_TABLE} (note_id) VALUES (%s)', [note_id])
+            cursor.execute(f'SELECT docid FROM {DOCID_TABLE} WHERE note_id = %s', [note_id])
+            docid = cursor.fetchone()[0]
+            cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [docid])
+            cursor.execute(
+                f'INSERT INTO {FTS_TABLE} (rowid, title, abstract, authors) VALUES (%s, %s, %s, %s)',
+                [docid, *_document(payload)],
+            )
+
+
+def drop_index(apps, schema_editor):
+    conn = schema_editor.connection
+    if conn.vendor != 'sqlite':
+        return
+    with conn.cursor() as cursor:
+        for statement in DROP_SQL:
+            cursor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_seed_openreview_data'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:09
+
+from django.db import migrations, models
+
+
+def closure(direct):
+    """
+    ``{group: every principal it contains}`` for ``{group: direct members}``;
+    a copy of accounts.membership.closure as of this migration.
+    """
+    result = {group: set(members) for group, members in direct.items()}
+    changed = True
+    while changed:
+        changed = False
+        for group, members in result.items():
+            size = len(members)
+            for member in direct[group]:
+                if member != group and member in result:
+                    members |= result[member]
+            changed |= len(members) != size
+    return result
+
+
+def build_closure(apps, schema_editor):
+    Group = apps.get_model('accounts', 'Group')
+    GroupMembership = apps.get_model('accounts', 'GroupMembership')
+    direct = dict(Group.objects.values_list('id', 'members'))
+    GroupMembership.objects.bulk_create([
+        GroupMembership(group=group, member=member)
+        for group, members in closure(direct).items()
+        for member in members
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0004_note_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GroupMembership',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('group', models.CharField(max_length=255)),
+                ('member', models.CharField(max_length=255)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['member', 'group'], name='accounts_gr_member_a00182_idx')],
+                'constraints': [models.UniqueConstraint(fields=('group', 'member'), name='accounts_groupmembership_unique')],
+            },
+        ),
+        migrations.RunPython(build_closure, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,70 @@
+import logging
+
+from django.db import migrations
+from django.db.models import Min
+
+BATCH_SIZE = 1000
+
+logger = logging.getLogger('accounts.migrations')
+
+
+def normalize_emails(apps, schema_editor):
+    User = apps.get_model('auth', 'User')
+    # Trim and lower-case every address, a batch of ids at a time
+    last_id = 0
+    while True:
+        users = list(User.objects.filter(id__gt=last_id).order_by('id').only('id', 'email')[:BATCH_SIZE])
+        if not users:
+            break
+        last_id = users[-1].id
+        changed = []
+        for user in users:
+            email = user.email.strip().lower()
+            if email != user.email:
+                user.email = email
+                changed.append(user)
+        User.objects.bulk_update(changed, ['email'])
+
+    # Addresses registered more than once stay with the oldest account; the
+    # others lose theirs and can no longer sign in with it. Each one is logged
+    # so support can give the address back. Checked a batch of ids at a time,
+    # each batch finding the oldest account per address through a temporary
+    # index on email.
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute('CREATE INDEX accounts_user_email_dedup ON auth_user (email)')
+    last_id = 0
+    while True:
+        users = list(
+            User.objects.filter(id__gt=last_id).exclude(email='').order_by('id')
+            .values_list('id', 'email')[:BATCH_SIZE]
+        )
+        if not users:
+            break
+        last_id = users[-1][0]
+        oldest = dict(
+            User.objects.filter(email__in={email for _, email in users}).order_by()
+            .values('email').annotate(keep=Min('id')).values_list('email', 'keep')
+        )
+        cleared = [(user_id, email) for user_id, email in users if oldest[email] != user_id]
+        for user_id, email in cleared:
+            logger.warning('cleared duplicate email %s from user %d (kept by user %d)', email, user_id, oldest[email])
+        User.objects.filter(id__in=[user_id for user_id, _ in cleared]).update(email='')
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute('DROP INDEX accounts_user_email_dedup')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0006_outbox_email'),
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.RunPython(normalize_emails, migrations.RunPython.noop),
+        # Partial, so accounts without an address do not collide
+        migrations.RunSQL(
+            "CREATE UNIQUE INDEX accounts_user_email_lower_uniq ON auth_user (lower(email)) WHERE email > ''",
+            'DROP INDEX accounts_user_email_lower_uniq',
+        ),
+    ]
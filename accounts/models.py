@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils import timezone
 from django.contrib.auth.models import User
 
 class Profile(models.Model):
@@ -10,3 +11,149 @@ class Profile(models.Model):
 
     def __str__(self):
         return f"{self.user.get_full_name()} Profile"
+
+
+def _domain_of(entity_id):
+    # "ICML.cc/2025/Workshop/AI4MATH/-/Submission" -> "ICML.cc/2025/Workshop/AI4MATH"
+    return entity_id.split('/-/')[0]
+
+
+class Group(models.Model):
+    """
+    An OpenReview group. ``payload`` is the object exactly as the API returns
+    it; the other columns are copied out of it so they can be indexed.
+    """
+    id = models.CharField(max_length=255, primary_key=True)
+    domain = models.CharField(max_length=255, blank=True, db_index=True)
+    parent = models.CharField(max_length=255, blank=True, db_index=True)
+    members = models.JSONField(default=list, blank=True)
+    tmdate = models.BigIntegerField(null=True, blank=True)
+    payload = models.JSONField()
+
+    def __str__(self):
+        return self.id
+
+    @classmethod
+    def from_payload(cls, data):
+        return cls(
+            id=data['id'],
+            domain=data.get('domain') or '',
+            parent=data.get('parent') or '',
+            members=data.get('members') or [],
+            tmdate=data.get('tmdate'),
+            payload=data,
+        )
+
+
+class GroupMembership(models.Model):
+    """
+    Transitive closure of ``Group.members``: one row for every principal a
+    group contains, directly or through nested groups. Maintained by
+    ``accounts.membership``.
+    """
+    group = models.CharField(max_length=255)
+    member = models.CharField(max_length=255)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['group', 'member'], name='accounts_groupmembership_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['member', 'group']),
+        ]
+
+    def __str__(self):
+        return f'{self.member} in {self.group}'
+
+
+class Invitation(models.Model):
+    id = models.CharField(max_length=255, primary_key=True)
+    domain = models.CharField(max_length=255, db_index=True)
+    duedate = models.BigIntegerField(null=True, blank=True, db_index=True)
+    invitees = models.JSONField(default=list, blank=True)
+    tmdate = models.BigIntegerField(null=True, blank=True)
+    payload = models.JSONField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['domain', 'duedate']),
+        ]
+
+    def __str__(self):
+        return self.id
+
+    @classmethod
+    def from_payload(cls, data):
+        return cls(
+            id=data['id'],
+            domain=data.get('domain') or _domain_of(data['id']),
+            duedate=data.get('duedate'),
+            invitees=data.get('invitees') or [],
+            tmdate=data.get('tmdate'),
+            payload=data,
+        )
+
+
+class Note(models.Model):
+    id = models.CharField(max_length=255, primary_key=True)
+    invitation = models.CharField(max_length=255)
+    domain = models.CharField(max_length=255)
+    forum = models.CharField(max_length=255, blank=True)
+    number = models.IntegerField(null=True, blank=True)
+    tmdate = models.BigIntegerField(null=True, blank=True)
+    payload = models.JSONField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['domain', 'number', 'id']),
+            models.Index(fields=['invitation', 'number']),
+            models.Index(fields=['domain', 'tmdate']),
+        ]
+
+    def __str__(self):
+        return self.id
+
+    @classmethod
+    def from_payload(cls, data):
+        return cls(
+            id=data['id'],
+            invitation=data['invitation'],
+            domain=data.get('domain') or _domain_of(data['invitation']),
+            forum=data.get('forum') or data['id'],
+            number=data.get('number'),
+            tmdate=data.get('tmdate'),
+            payload=data,
+        )
+
+
+class OutboxEmail(models.Model):
+    """
+    A notification email waiting to be sent. Written in the same transaction
+    as the note that triggers it and delivered by ``manage.py
+    send_notifications``; see ``accounts.notifications``.
+    """
+    PENDING = 'pending'
+    SENT = 'sent'
+    FAILED = 'failed'
+    STATUS_CHOICES = [(PENDING, 'Pending'), (SENT, 'Sent'), (FAILED, 'Failed')]
+
+    # Principals: profile ids, emails or group ids, resolved when sending
+    recipients = models.JSONField()
+    subject = models.CharField(max_length=255)
+    # The template as it was when queued, and the values for its {{placeholders}}
+    template = models.TextField()
+    context = models.JSONField(default=dict)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at', 'id']),
+        ]
+
+    def __str__(self):
+        return f'{self.subject} ({self.status})'
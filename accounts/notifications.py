@@ -0,0 +1,200 @@
+import re
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from accounts.conf import get_setting
+from accounts.lru import LRUCache
+from accounts.membership import is_group_id
+from accounts.models import GroupMembership, OutboxEmail
+
+DEFAULTS = {
+    'BATCH_SIZE': 100,
+    'MAX_ATTEMPTS': 5,
+    # Retry n waits BACKOFF_SECONDS * 2 ** (n - 1)
+    'BACKOFF_SECONDS': 30,
+    # A claimed message is sent again after this long if its worker died
+    'LEASE_SECONDS': 300,
+}
+
+DEFAULT_TEMPLATES = {
+    'submission': 'Your submission to {{venue}} has been {{action}}.\n\nSubmission Number: {{note_number}}\n\n'
+                  'Title: {{note_title}}\n\nTo view your submission, click here: '
+                  'https://openreview.net/forum?id={{note_forum}}',
+    'review': 'A review has been {{action}} on submission {{note_number}} to {{venue}}.\n\n'
+              'To view it, click here: https://openreview.net/forum?id={{note_forum}}',
+    'comment': 'A comment has been {{action}} on submission {{note_number}} to {{venue}}.\n\n'
+               'To view it, click here: https://openreview.net/forum?id={{note_forum}}',
+}
+
+PLACEHOLDER_RE = re.compile(r'\{\{\s*([\w.]+)\s*\}\}')
+
+_templates = LRUCache(maxsize=256)
+
+
+class CompiledTemplate:
+    """
+    A ``{{placeholder}}`` template split once into literal text and names;
+    rendering is a join, with no parsing per message.
+    """
+
+    def __init__(self, text):
+        self.parts = PLACEHOLDER_RE.split(text)
+
+    def render(self, context):
+        parts = list(self.parts)
+        parts[1::2] = ['' if context.get(name) is None else str(context[name]) for name in parts[1::2]]
+        return ''.join(parts)
+
+
+def compile_template(text):
+    template = _templates.get(text)
+    if template is None:
+        template = CompiledTemplate(text)
+        _templates.set(text, template)
+    return template
+
+
+def _content_value(content, name, default=None):
+    value = content.get(name)
+    if isinstance(value, dict):
+        value = value.get('value')
+    return default if value is None else value
+
+
+def queue_note_emails(venue, note, action):
+    """
+    Queue the notifications a note triggers under ``venue``'s settings (its
+    group payload). Call inside the transaction that saves the note, so the
+    emails exist if and only if the note does.
+    """
+    content = venue.get('content') or {}
+    invitation = note.get('invitation', '')
+    chairs = _content_value(content, 'program_chairs_id') or f"{venue['id']}/Program_Chairs"
+    short_name = _content_value(content, 'subtitle') or venue['id']
+    note_content = note.get('content') or {}
+    context = {
+        'venue': short_name,
+        'action': action,
+        'note_id': note['id'],
+        'note_number': note.get('number'),
+        'note_title': _content_value(note_content, 'title', ''),
+        'note_forum': note.get('forum') or note['id'],
+    }
+
+    emails = []
+    if invitation == _content_value(content, 'submission_id', f"{venue['id']}/-/Submission"):
+        template = _content_value(content, 'submission_email_template') or DEFAULT_TEMPLATES['submission']
+        authorids = _content_value(note_content, 'authorids', [])
+        authors = (authorids if isinstance(authorids, list) else []) + list(note.get('signatures') or [])
+        emails.append((authors, f'{short_name} submission {action}', template))
+        if _content_value(content, 'submission_email_pcs', False):
+            emails.append(([chairs], f'{short_name} submission {action}', template))
+    else:
+        kind = invitation.rsplit('/-/', 1)[-1]
+        review_name = _content_value(content, 'review_name', 'Official_Review')
+        if kind == review_name and _content_value(content, 'review_email_pcs', False):
+            emails.append(([chairs], f'{short_name} review {action}', DEFAULT_TEMPLATES['review']))
+        elif 'Comment' in kind and _content_value(content, 'comment_email_pcs', False):
+            emails.append(([chairs], f'{short_name} comment {action}', DEFAULT_TEMPLATES['comment']))
+
+    OutboxEmail.objects.bulk_create([
+        OutboxEmail(recipients=list(dict.fromkeys(recipients)), subject=subject, template=template, context=context)
+        for recipients, subject, template in emails if recipients
+    ])
+
+
+def resolve_recipients(principals):
+    """``{principal: [email addresses]}``, with groups expanded transitively."""
+    expanded = {p: [p] for p in principals if not is_group_id(p)}
+    groups = [p for p in principals if is_group_id(p)]
+    for group, member in GroupMembership.objects.filter(group__in=groups).values_list('group', 'member'):
+        if not is_group_id(member):
+            expanded.setdefault(group, []).append(member)
+
+    usernames = {m[1:] for members in expanded.values() for m in members if m.startswith('~')}
+    emails = dict(User.objects.filter(username__in=usernames).exclude(email='').values_list('username', 'email'))
+    return {
+        principal: sorted({emails.get(m[1:]) if m.startswith('~') else m for m in members} - {None})
+        for principal, members in expanded.items()
+    }
+
+
+def claim_batch(size):
+    """Lease up to ``size`` due messages to this worker."""
+    now = timezone.now()
+    with transaction.atomic():
+        due = (
+            OutboxEmail.objects.select_for_update(skip_locked=True)
+            .filter(status=OutboxEmail.PENDING, next_attempt_at__lte=now)
+            .order_by('next_attempt_at', 'id')[:size]
+        )
+        messages = list(due)
+        OutboxEmail.objects.filter(id__in=[m.id for m in messages]).update(
+            next_attempt_at=now + timedelta(seconds=get_setting('NOTIFICATIONS', 'LEASE_SECONDS', DEFAULTS))
+        )
+    return messages
+
+
+def send_batch(size=None, connection=None):
+    """
+    Send one batch of due messages over one connection. Returns
+    ``(sent, retried, failed)``.
+    """
+    messages = claim_batch(size or get_setting('NOTIFICATIONS', 'BATCH_SIZE', DEFAULTS))
+    if not messages:
+        return 0, 0, 0
+
+    addresses = resolve_recipients({p for message in messages for p in message.recipients})
+    sent = retried = failed = 0
+    connection = connection or get_connection()
+    try:
+        connection.open()
+    except Exception as exc:
+        # Server unreachable, login refused, ...: the whole batch backs off
+        # like any other failed attempt instead of waiting out its lease
+        outcomes = [_record_failure(message, exc) for message in messages]
+        return 0, outcomes.count(OutboxEmail.PENDING), outcomes.count(OutboxEmail.FAILED)
+
+    try:
+        for message in messages:
+            to = sorted({a for p in message.recipients for a in addresses.get(p, ())})
+            try:
+                if to:
+                    email = EmailMessage(
+                        subject=message.subject,
+                        body=compile_template(message.template).render(message.context),
+                        to=to,
+                        connection=connection,
+                    )
+                    connection.send_messages([email])
+            except Exception as exc:
+                if _record_failure(message, exc) == OutboxEmail.FAILED:
+                    failed += 1
+                else:
+                    retried += 1
+                continue
+            message.status = OutboxEmail.SENT
+            message.sent_at = timezone.now()
+            message.attempts += 1
+            message.save(update_fields=['status', 'sent_at', 'attempts'])
+            sent += 1
+    finally:
+        connection.close()
+    return sent, retried, failed
+
+
+def _record_failure(message, exc):
+    """Count a failed attempt: back off, or give up after MAX_ATTEMPTS. Returns the new status."""
+    message.attempts += 1
+    message.last_error = repr(exc)
+    if message.attempts >= get_setting('NOTIFICATIONS', 'MAX_ATTEMPTS', DEFAULTS):
+        message.status = OutboxEmail.FAILED
+    else:
+        delay = get_setting('NOTIFICATIONS', 'BACKOFF_SECONDS', DEFAULTS) * 2 ** (message.attempts - 1)
+        message.next_attempt_at = timezone.now() + timedelta(seconds=delay)
+    message.save(update_fields=['attempts', 'last_error', 'status', 'next_attempt_at'])
+    return message.status
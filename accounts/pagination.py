@@ -0,0 +1,93 @@
+import base64
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(values):
+    raw = json.dumps(list(values), separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(token, size):
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        values = json.loads(raw)
+    except (ValueError, TypeError):
+        raise InvalidCursor('Invalid cursor.')
+    if not isinstance(values, list) or len(values) != size:
+        raise InvalidCursor('Invalid cursor.')
+    return values
+
+
+def cursor_values(model, keys, token):
+    """
+    Decode ``token`` into one value per key, each checked against the type of
+    its ``model`` field, so a forged cursor is an ``InvalidCursor`` and never
+    an error inside the query.
+    """
+    values = decode_cursor(token, len(keys))
+    checked = []
+    for key, value in zip(keys, values):
+        if isinstance(value, bool) or not isinstance(value, (str, int, float)):
+            raise InvalidCursor('Invalid cursor.')
+        field = model._meta.get_field(key)
+        try:
+            value = field.to_python(value)
+            # Integer fields carry the database's range as validators
+            field.run_validators(value)
+        except ValidationError:
+            raise InvalidCursor('Invalid cursor.')
+        checked.append(value)
+    return checked
+
+
+def page_size_from(request, default=DEFAULT_PAGE_SIZE, maximum=MAX_PAGE_SIZE):
+    try:
+        size = int(request.GET.get('limit', default))
+    except (TypeError, ValueError):
+        size = default
+    return max(1, min(size, maximum))
+
+
+def keyset_page(queryset, keys, cursor=None, size=DEFAULT_PAGE_SIZE, key_of=None):
+    """
+    Return ``(rows, next_cursor)`` for one page of ``queryset`` ordered by ``keys``.
+
+    The cursor carries the key values of the last row, so every page is an
+    index range scan (``WHERE key > last ORDER BY key LIMIT size + 1``)
+    instead of an OFFSET that grows with the table.
+    """
+    queryset = queryset.order_by(*keys)
+    if cursor:
+        last = cursor_values(queryset.model, keys, cursor)
+        # (a, b) > (x, y)  ==  a > x OR (a = x AND b > y)
+        condition = Q()
+        for i, key in enumerate(keys):
+            step = Q(**{f'{key}__gt': last[i]})
+            for prev, value in zip(keys[:i], last[:i]):
+                step &= Q(**{prev: value})
+            condition |= step
+        queryset = queryset.filter(condition)
+
+    rows = list(queryset[:size + 1])
+    if len(rows) <= size:
+        return rows, None
+
+    rows = rows[:size]
+    last = rows[-1]
+    if key_of is not None:
+        values = key_of(last)
+    elif isinstance(last, dict):
+        values = [last[key] for key in keys]
+    else:
+        values = [getattr(last, key) for key in keys]
+    return rows, encode_cursor(values)
@@ -0,0 +1,158 @@
+import csv
+import json
+
+from asgiref.sync import sync_to_async
+from django.http import StreamingHttpResponse
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+_fallback_encoder = JSONEncoder()
+
+
+def _orjson_default(obj):
+    # Types orjson does not know (Decimal, lazy strings, querysets, ...) go
+    # through DRF's encoder, as with the stock renderer
+    return _fallback_encoder.default(obj)
+
+
+def dumps(data):
+    """Compact UTF-8 JSON bytes, with orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(data, default=_orjson_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, cls=JSONEncoder, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    ``JSONRenderer`` on orjson (stdlib ``json`` if it is missing). Requests
+    for indented output, e.g. ``Accept: application/json; indent=2``, use
+    the stock implementation.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if self.get_indent(accepted_media_type or '', renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        return dumps(data)
+
+
+def _encode_line(item):
+    return dumps(item) + b'\n'
+
+
+class NDJSONRenderer(BaseRenderer):
+    """
+    Newline-delimited JSON. Views that support it check
+    ``request.accepted_renderer.format == 'ndjson'`` and return
+    ``ndjson_response(rows)``; ``render`` only handles ordinary
+    ``Response`` objects such as errors.
+    """
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        items = data if isinstance(data, list) else [data]
+        return b''.join(_encode_line(item) for item in items)
+
+
+# Lines read from the sync iterator per hop to the sync thread under ASGI
+ASYNC_CHUNK_LINES = 500
+
+
+def _take(iterator, count):
+    return b''.join(part for _, part in zip(range(count), iterator))
+
+
+class SyncStreamingHttpResponse(StreamingHttpResponse):
+    """
+    A ``StreamingHttpResponse`` over a sync iterator that also streams under
+    ASGI. Django's own ``__aiter__`` reads a sync iterator into one list
+    before sending anything; this one reads ``ASYNC_CHUNK_LINES`` parts at
+    a time on the sync thread (where database cursors behind the iterator
+    live) and sends each batch as it is read.
+    """
+
+    async def __aiter__(self):
+        if self.is_async:
+            async for part in super().__aiter__():
+                yield part
+            return
+        iterator = iter(self.streaming_content)
+        while True:
+            chunk = await sync_to_async(_take)(iterator, ASYNC_CHUNK_LINES)
+            if not chunk:
+                return
+            yield chunk
+
+
+def ndjson_response(rows):
+    """Stream ``rows`` (any iterable of JSON-serializable objects) one line each."""
+    return SyncStreamingHttpResponse(
+        (_encode_line(row) for row in rows), content_type=NDJSONRenderer.media_type
+    )
+
+
+class _Echo:
+    # csv.writer wants a file; hand each formatted line straight back instead
+    def write(self, value):
+        return value
+
+
+# Spreadsheets evaluate cells starting with these as formulas
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+def _cell(value):
+    if value is None:
+        return ''
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        # Submitter-controlled text is shown as typed, never run
+        return "'" + value
+    return value
+
+
+def _encode_csv(rows):
+    writer = csv.writer(_Echo())
+    for row in rows:
+        yield writer.writerow([_cell(value) for value in row]).encode('utf-8')
+
+
+class CSVRenderer(BaseRenderer):
+    """
+    CSV. Like ``NDJSONRenderer``, views stream with ``csv_response``;
+    ``render`` covers ordinary responses (a dict or a list of dicts).
+    """
+    media_type = 'text/csv'
+    format = 'csv'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        items = data if isinstance(data, list) else [data]
+        header = list(items[0]) if items else []
+        return b''.join(_encode_csv([header] + [[item.get(key) for key in header] for item in items]))
+
+
+def csv_response(header, rows, filename=None):
+    """Stream a header line, then one line per row of ``rows``."""
+    response = SyncStreamingHttpResponse(
+        _encode_csv(_prepend(header, rows)), content_type=f'{CSVRenderer.media_type}; charset=utf-8'
+    )
+    if filename:
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
+def _prepend(first, rest):
+    yield first
+    yield from rest
@@ -0,0 +1,106 @@
+import gzip
+import hashlib
+
+from django.http import HttpResponse, HttpResponseNotModified
+
+from accounts.lru import LRUCache
+from accounts.renderers import dumps
+from accounts.versions import bump_version, current_version, peek_version
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+
+class EncodedPayload:
+    """JSON body encoded once, with compressed variants and a strong ETag."""
+
+    __slots__ = ('body', 'gzip', 'br', 'etag')
+
+    def __init__(self, data):
+        # Same bytes FastJSONRenderer would produce
+        self.body = dumps(data)
+        self.gzip = gzip.compress(self.body, compresslevel=9, mtime=0)
+        self.br = brotli.compress(self.body) if brotli is not None else None
+        self.etag = '"%s"' % hashlib.sha256(self.body).hexdigest()[:32]
+
+
+_payloads = LRUCache(maxsize=512)
+
+
+def get_payload(key, build, cacheable=None):
+    # Each process keeps its own encoded copy; the shared version token makes
+    # an invalidation in one process reach all of them.
+    name = f'payload:{key}'
+    entry = _payloads.get(key)
+    if entry is not None and entry[0] == peek_version(name):
+        return entry[1]
+    if cacheable is not None and not cacheable():
+        # Neither a version token nor a slot in _payloads for keys that name
+        # nothing, such as arbitrary ids from the query string
+        return EncodedPayload(build())
+    version = current_version(name)
+    payload = EncodedPayload(build())
+    _payloads.set(key, (version, payload))
+    return payload
+
+
+def invalidate_payload(key):
+    _payloads.delete(key)
+    bump_version(f'payload:{key}')
+
+
+def _etag_matches(header, etag):
+    if not header:
+        return False
+    if header.strip() == '*':
+        return True
+    candidates = [tag.strip() for tag in header.split(',')]
+    # If-None-Match uses weak comparison
+    return etag in candidates or f'W/{etag}' in candidates
+
+
+def _accepted_encodings(header):
+    accepted = set()
+    for part in (header or '').split(','):
+        coding, _, params = part.strip().partition(';')
+        params = params.replace(' ', '')
+        if coding and params not in ('q=0', 'q=0.0', 'q=0.00', 'q=0.000'):
+            accepted.add(coding.lower())
+    return accepted
+
+
+def cached_json_response(request, key, build, cacheable=None):
+    """
+    Serve the JSON for ``key`` from the encoded payload cache, building it
+    with ``build()`` on first use. When ``cacheable()`` is false the body is
+    built for this request only. Answers ``If-None-Match`` with 304 and
+    picks a precompressed body from ``Accept-Encoding``.
+    """
+    return encoded_json_response(request, get_payload(key, build, cacheable))
+
+
+def encoded_json_response(request, payload):
+    """Respond with an ``EncodedPayload``, honouring ETags and encodings."""
+    if _etag_matches(request.META.get('HTTP_IF_NONE_MATCH'), payload.etag):
+        response = HttpResponseNotModified()
+        response['ETag'] = payload.etag
+        response['Vary'] = 'Accept-Encoding'
+        return response
+
+    accepted = _accepted_encodings(request.META.get('HTTP_ACCEPT_ENCODING'))
+    if payload.br is not None and 'br' in accepted:
+        body, encoding = payload.br, 'br'
+    elif 'gzip' in accepted:
+        body, encoding = payload.gzip, 'gzip'
+    else:
+        body, encoding = payload.body, None
+
+    response = HttpResponse(body, content_type='application/json')
+    if encoding:
+        response['Content-Encoding'] = encoding
+    response['Content-Length'] = str(len(body))
+    response['ETag'] = payload.etag
+    response['Vary'] = 'Accept-Encoding'
+    return response
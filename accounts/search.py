@@ -0,0 +1,123 @@
+import json
+
+from django.db import connection, connections, router
+
+from accounts.models import Note
+
+# Full-text index over note title/abstract/authors, stored in an SQLite FTS5
+# table next to accounts_note. accounts_note_search gives every note a stable
+# integer docid, which is the FTS rowid; the note rowid itself can change on
+# VACUUM because accounts_note has a text primary key.
+FTS_TABLE = 'accounts_note_fts'
+DOCID_TABLE = 'accounts_note_search'
+
+CREATE_SQL = [
+    f'CREATE TABLE IF NOT EXISTS {DOCID_TABLE} ('
+    'docid INTEGER PRIMARY KEY, note_id TEXT NOT NULL UNIQUE)',
+    f'CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5('
+    "title, abstract, authors, tokenize = 'porter unicode61 remove_diacritics 2')",
+]
+DROP_SQL = [
+    f'DROP TABLE IF EXISTS {FTS_TABLE}',
+    f'DROP TABLE IF EXISTS {DOCID_TABLE}',
+]
+
+# bm25 column weights: a title match outranks an abstract match
+RANK = f'bm25({FTS_TABLE}, 10.0, 2.0, 5.0)'
+
+
+def search_available(conn=None):
+    return (conn or connection).vendor == 'sqlite'
+
+
+def _value(field):
+    if isinstance(field, dict):
+        field = field.get('value')
+    if isinstance(field, (list, tuple)):
+        return ' '.join(str(item) for item in field)
+    return '' if field is None else str(field)
+
+
+def document(payload):
+    content = payload.get('content') or {}
+    return _value(content.get('title')), _value(content.get('abstract')), _value(content.get('authors'))
+
+
+def index_notes(notes, conn=None):
+    """Add or refresh the index entries of ``(note_id, payload)`` pairs."""
+    conn = conn or connection
+    if not search_available(conn):
+        return
+    with conn.cursor() as cursor:
+        for note_id, payload in notes:
+            cursor.execute(f'INSERT OR IGNORE INTO {DOCID_TABLE} (note_id) VALUES (%s)', [note_id])
+            cursor.execute(f'SELECT docid FROM {DOCID_TABLE} WHERE note_id = %s', [note_id])
+            docid = cursor.fetchone()[0]
+            cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [docid])
+            cursor.execute(
+                f'INSERT INTO {FTS_TABLE} (rowid, title, abstract, authors) VALUES (%s, %s, %s, %s)',
+                [docid, *document(payload)],
+            )
+
+
+def unindex_note(note_id, conn=None):
+    conn = conn or connection
+    if not search_available(conn):
+        return
+    with conn.cursor() as cursor:
+        cursor.execute(f'SELECT docid FROM {DOCID_TABLE} WHERE note_id = %s', [note_id])
+        row = cursor.fetchone()
+        if row:
+            cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [row[0]])
+            cursor.execute(f'DELETE FROM {DOCID_TABLE} WHERE docid = %s', [row[0]])
+
+
+def match_expression(term):
+    """
+    Turn user input into an FTS5 query: every word must match, the last one
+    as a prefix so results update while typing. Quoting each word keeps FTS5
+    operators and punctuation in the input from being interpreted.
+    """
+    words = [word.replace('"', '""') for word in term.split()]
+    if not words:
+        return None
+    quoted = [f'"{word}"' for word in words]
+    quoted[-1] += '*'
+    return ' '.join(quoted)
+
+
+def search_notes(term, domain=None, readers=None, limit=25, offset=0):
+    """
+    Return note payloads matching ``term``, best match first. With
+    ``readers``, only notes readable by one of those principals.
+    """
+    expression = match_expression(term)
+    if expression is None:
+        return []
+
+    sql = (
+        f'SELECT n.payload FROM {FTS_TABLE} f '
+        f'JOIN {DOCID_TABLE} s ON s.docid = f.rowid '
+        'JOIN accounts_note n ON n.id = s.note_id '
+        f'WHERE {FTS_TABLE} MATCH %s'
+    )
+    params = [expression]
+    if domain:
+        sql += ' AND n.domain = %s'
+        params.append(domain)
+    if readers is not None:
+        readers = list(readers)
+        # Notes without readers, or with none listed, are public, as in
+        # accounts.membership.can_read
+        sql += (
+            " AND (COALESCE(json_array_length(n.payload, '$.readers'), 0) = 0"
+            " OR EXISTS (SELECT 1 FROM json_each(n.payload, '$.readers') r "
+            f"WHERE r.value IN ({', '.join(['%s'] * len(readers))})))"
+        )
+        params += readers
+    sql += f' ORDER BY {RANK} LIMIT %s OFFSET %s'
+    params += [limit, offset]
+
+    with connections[router.db_for_read(Note)].cursor() as cursor:
+        cursor.execute(sql, params)
+        return [json.loads(row[0]) for row in cursor.fetchall()]
@@ -0,0 +1,264 @@
+"""
+Tiered session engine: ``SESSION_ENGINE = 'accounts.session_backend'``.
+
+Reads are served from an in-process LRU, then the shared Django cache (when
+it is shared between processes), then the database. A new or rotated session key (login, ``cycle_key``) is
+written through to the database in the request that creates it, so every
+process can load it at once, whatever the cache backend. Later saves of an
+existing session update both cache tiers and queue the database write;
+queued writes are flushed in one batch when a request finishes and
+``SESSION_WRITE_BEHIND['INTERVAL']`` seconds have passed since the last
+flush (or ``BATCH_SIZE`` writes are waiting), and at interpreter exit. Each
+flush also deletes at most ``EXPIRED_BATCH`` expired rows, so expired
+sessions are removed a little at a time rather than by a full-table sweep.
+
+Deletes (logout, key rotation) go to all tiers and the database immediately.
+"""
+import atexit
+import copy
+import threading
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.sessions.backends.base import CreateError
+from django.contrib.sessions.backends.db import SessionStore as DBStore
+from django.core.cache import caches
+from django.core.signals import request_finished
+from django.db import connections, router, transaction
+from django.utils import timezone
+
+from accounts.conf import get_setting, local_cache
+from accounts.versions import cache_is_shared
+
+KEY_PREFIX = 'accounts.session_backend'
+
+DEFAULTS = {
+    'INTERVAL': 2.0,
+    'BATCH_SIZE': 500,
+    'EXPIRED_BATCH': 1000,
+    'LOCAL_MAXSIZE': 10000,
+    # A session deleted by another process stays readable here for at most
+    # this many seconds
+    'LOCAL_TTL': 5,
+}
+
+
+_local = local_cache('SESSION_WRITE_BEHIND', DEFAULTS)
+
+
+class _NoCache:
+    # Stands in for a process-local session cache, which would keep a session
+    # another process deleted readable here until it expires
+    def get(self, key):
+        return None
+
+    def set(self, key, value, timeout):
+        pass
+
+    def has_key(self, key):
+        return False
+
+    def delete(self, key):
+        pass
+
+
+def _cache():
+    if not cache_is_shared(settings.SESSION_CACHE_ALIAS):
+        return _NoCache()
+    return caches[settings.SESSION_CACHE_ALIAS]
+
+
+def _database_name():
+    return connections[router.db_for_write(DBStore.get_model_class())].settings_dict['NAME']
+
+
+class WriteBehindQueue:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._database = None
+        self._last_flush = time.monotonic()
+
+    def put(self, session_key, session_data, expire_date):
+        with self._lock:
+            if not self._pending:
+                self._database = _database_name()
+            self._pending[session_key] = (session_data, expire_date)
+
+    def discard(self, session_key):
+        with self._lock:
+            self._pending.pop(session_key, None)
+
+    def __contains__(self, session_key):
+        return session_key in self._pending
+
+    def get(self, session_key):
+        entry = self._pending.get(session_key)
+        return entry[0] if entry else None
+
+    def __len__(self):
+        return len(self._pending)
+
+    def due(self):
+        return bool(self._pending) and (
+            len(self._pending) >= get_setting('SESSION_WRITE_BEHIND', 'BATCH_SIZE', DEFAULTS)
+            or time.monotonic() - self._last_flush >= get_setting('SESSION_WRITE_BEHIND', 'INTERVAL', DEFAULTS)
+        )
+
+    def flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._last_flush = time.monotonic()
+
+        model = DBStore.get_model_class()
+        if pending and self._database != _database_name():
+            # Queued against a database that is no longer configured, e.g. a
+            # test database that has been torn down
+            pending = {}
+        if not pending:
+            return
+        rows = [
+            model(session_key=key, session_data=data, expire_date=expire_date)
+            for key, (data, expire_date) in pending.items()
+        ]
+        using = router.db_for_write(model)
+        try:
+            with transaction.atomic(using=using):
+                model.objects.using(using).bulk_create(
+                    rows,
+                    batch_size=get_setting('SESSION_WRITE_BEHIND', 'BATCH_SIZE', DEFAULTS),
+                    update_conflicts=True,
+                    unique_fields=['session_key'],
+                    update_fields=['session_data', 'expire_date'],
+                )
+        except Exception:
+            # Keep the writes for the next flush unless newer ones replaced them
+            with self._lock:
+                for key, value in pending.items():
+                    self._pending.setdefault(key, value)
+            raise
+        SessionStore.delete_expired_batch()
+
+
+write_behind = WriteBehindQueue()
+
+
+def flush_if_due(**kwargs):
+    # Never piggyback on a transaction that is still open on this thread;
+    # if it rolled back it would take the session writes with it
+    using = router.db_for_write(DBStore.get_model_class())
+    if write_behind.due() and not connections[using].in_atomic_block:
+        write_behind.flush()
+
+
+request_finished.connect(flush_if_due, dispatch_uid='accounts.session_backend.flush')
+atexit.register(lambda: write_behind.flush() if len(write_behind) else None)
+
+
+class SessionStore(DBStore):
+    cache_key_prefix = KEY_PREFIX
+
+    def __init__(self, session_key=None):
+        super().__init__(session_key)
+        # Whether this store created its key; such sessions are not in the
+        # database until written through
+        self._created = False
+
+    @property
+    def cache_key(self):
+        return self.cache_key_prefix + self._get_or_create_session_key()
+
+    def load(self):
+        key = self.session_key
+        entry = _local.get(key) if key else None
+        if entry is not None:
+            data, expires = entry
+            if expires > time.time():
+                return copy.copy(data)
+            _local.delete(key)
+
+        data = _cache().get(self.cache_key) if key else None
+        if data is None and key:
+            # Saved, evicted from the cache and not flushed yet
+            pending = write_behind.get(key)
+            if pending is not None:
+                data = self.decode(pending)
+        if data is None:
+            data = super().load()
+            if self.session_key is None:
+                return {}
+            _cache().set(self.cache_key, data, self.get_expiry_age(expiry=data.get('_session_expiry')))
+        self._remember(data)
+        return copy.copy(data)
+
+    def _remember(self, data):
+        expires = time.time() + self.get_expiry_age(expiry=data.get('_session_expiry'))
+        _local.set(self.session_key, (copy.copy(data), expires))
+
+    def exists(self, session_key):
+        return (
+            _local.get(session_key) is not None
+            or session_key in write_behind
+            or _cache().has_key(self.cache_key_prefix + session_key)
+            or super().exists(session_key)
+        )
+
+    def save(self, must_create=False):
+        if self.session_key is None:
+            return self.create()
+        if must_create and self.exists(self.session_key):
+            raise CreateError
+        data = self._get_session(no_load=must_create)
+        if must_create or self._created:
+            # A queued write is lost with this process, and another process
+            # might not see the cache it went to; new sessions go straight
+            # to the database
+            write_behind.discard(self.session_key)
+            super().save(must_create=must_create)
+            self._created = True
+        else:
+            write_behind.put(self.session_key, self.encode(data), self.get_expiry_date())
+        _cache().set(self.cache_key, data, self.get_expiry_age())
+        self._remember(data)
+
+    def delete(self, session_key=None):
+        if session_key is None:
+            if self.session_key is None:
+                return
+            session_key = self.session_key
+        _local.delete(session_key)
+        write_behind.discard(session_key)
+        _cache().delete(self.cache_key_prefix + session_key)
+        super().delete(session_key)
+
+    async def aload(self):
+        return await sync_to_async(self.load)()
+
+    async def aexists(self, session_key):
+        return await sync_to_async(self.exists)(session_key)
+
+    async def asave(self, must_create=False):
+        return await sync_to_async(self.save)(must_create)
+
+    async def adelete(self, session_key=None):
+        return await sync_to_async(self.delete)(session_key)
+
+    @classmethod
+    def delete_expired_batch(cls):
+        """Delete up to EXPIRED_BATCH expired sessions; return how many."""
+        model = cls.get_model_class()
+        size = get_setting('SESSION_WRITE_BEHIND', 'EXPIRED_BATCH', DEFAULTS)
+        keys = list(
+            model.objects.filter(expire_date__lt=timezone.now()).values_list('session_key', flat=True)[:size]
+        )
+        if keys:
+            model.objects.filter(session_key__in=keys).delete()
+        return len(keys)
+
+    @classmethod
+    def clear_expired(cls):
+        # `manage.py clearsessions`: same batches, repeated until none are left
+        write_behind.flush()
+        while cls.delete_expired_batch() == get_setting('SESSION_WRITE_BEHIND', 'EXPIRED_BATCH', DEFAULTS):
+            pass
@@ -0,0 +1,63 @@
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from accounts.authentication import invalidate_token
+from accounts import membership
+from accounts.activity import broadcaster
+from accounts.homepage import invalidate_homepage
+from accounts.invitation_index import active_invitations
+from accounts.models import Group, Invitation, Note
+from accounts.responses import invalidate_payload
+from accounts.search import index_notes, unindex_note
+
+
+@receiver(post_delete, sender=Token)
+def token_deleted(sender, instance, **kwargs):
+    invalidate_token(instance.key)
+
+
+@receiver(pre_save, sender=User)
+def revoke_tokens_on_password_change(sender, instance, **kwargs):
+    # set_password() keeps the raw password in _password until the next save.
+    if instance.pk and not instance._state.adding and instance._password is not None:
+        Token.objects.filter(user_id=instance.pk).delete()
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, created, **kwargs):
+    if not created:
+        for key in Token.objects.filter(user_id=instance.pk).values_list('key', flat=True):
+            invalidate_token(key)
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def group_changed(sender, instance, **kwargs):
+    invalidate_payload(f'groups:{instance.id}')
+    invalidate_homepage(instance.id)
+    membership.refresh([instance.id])
+    # Group members decide who an invitation is open to
+    active_invitations.invalidate()
+
+
+@receiver(post_save, sender=Invitation)
+@receiver(post_delete, sender=Invitation)
+def invitation_changed(sender, instance, **kwargs):
+    active_invitations.invalidate()
+    invalidate_homepage(instance.domain)
+
+
+@receiver(post_save, sender=Note)
+def note_saved(sender, instance, **kwargs):
+    index_notes([(instance.id, instance.payload)])
+    invalidate_homepage(instance.domain)
+    transaction.on_commit(lambda: broadcaster.publish(instance.domain))
+
+
+@receiver(post_delete, sender=Note)
+def note_deleted(sender, instance, **kwargs):
+    unindex_note(instance.id)
+    invalidate_homepage(instance.domain)
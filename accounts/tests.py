@@ -1,3 +1,1223 @@
-from django.test import TestCase
+import asyncio
+import difflib
+import gzip
+import io
+import json
+import os
+import tempfile
+import time
+import unittest
+from datetime import timedelta
+from importlib import import_module
+from importlib.util import find_spec
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.apps import apps as django_apps
+from django.contrib.auth.hashers import PBKDF2PasswordHasher, identify_hasher, make_password
+from django.contrib.auth.models import User
+from django.contrib.auth.signals import user_login_failed
+from django.contrib.sessions.models import Session
+from django.core import mail
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import IntegrityError, connection, connections, transaction
+from django.test import AsyncClient, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+
+from . import db_router, membership, responses
+from .db_router import PrimaryReplicaRouter
+from .hashing import password_pool
+from .invitation_index import active_invitations, now_ms
+from .middleware import route_histograms
+from .membership import effective_groups
+from .models import Group, GroupMembership, Invitation, Note, OutboxEmail, Profile
+from .notifications import compile_template, send_batch
+from .pagination import encode_cursor
+from .renderers import ASYNC_CHUNK_LINES, FastJSONRenderer, ndjson_response
+from .search import index_notes
+from .serializer import UserProfileSerializer, fast_profile_serializer
+from .session_backend import SessionStore, write_behind
+from .usernames import allocate_usernames
+from .validation import ReplySchema, reply_schema
+
+
+class ProfileListTests(TestCase):
+    def setUp(self):
+        for i in range(5):
+            user = User.objects.create(username=f'user{i}', email=f'user{i}@example.com')
+            Profile.objects.create(user=user, affiliation=f'Org {i}')
+
+    def test_pages_follow_next_cursor(self):
+        seen = []
+        cursor = None
+        while True:
+            params = {'limit': 2}
+            if cursor:
+                params['cursor'] = cursor
+            with self.assertNumQueries(1):
+                response = self.client.get('/api/profiles/', params)
+            self.assertEqual(response.status_code, 200)
+            seen += [p['username'] for p in response.data['profiles']]
+            cursor = response.data['next_cursor']
+            if cursor is None:
+                break
+        self.assertEqual(seen, [f'user{i}' for i in range(5)])
+
+    def test_profile_fields_are_joined(self):
+        response = self.client.get('/api/profiles/', {'email': 'user3@example.com'})
+        self.assertEqual(response.data['profiles'][0]['affiliation'], 'Org 3')
+
+    def test_invalid_cursor(self):
+        response = self.client.get('/api/profiles/', {'cursor': '!!'})
+        self.assertEqual(response.status_code, 400)
+        # Well-formed cursors holding values of the wrong type or range
+        for values in (['abc'], [None], [{'a': 1}], [True], [10 ** 30]):
+            response = self.client.get('/api/profiles/', {'cursor': encode_cursor(values)})
+            self.assertEqual(response.status_code, 400, values)
+        response = self.client.get('/api/activity', {'domain': 'V', 'since': encode_cursor([[1], 'x'])})
+        self.assertEqual(response.status_code, 400)
+
+    def test_fast_serializer_matches_model_serializer(self):
+        User.objects.create(username='noprofile', email='noprofile@example.com', first_name='No')
+        Profile.objects.filter(user__username='user1').update(homepage='https://example.com/~u1')
+        expected = UserProfileSerializer(User.objects.select_related('profile').order_by('id'), many=True).data
+        rows = fast_profile_serializer.many(fast_profile_serializer.values(User.objects.order_by('id')))
+        self.assertEqual(rows, [dict(row) for row in expected])
+        self.assertEqual((rows[-1]['full_name'], rows[-1]['affiliation']), ('No', None))
+
+    def test_renderer_output(self):
+        data = {'name': 'Zoë', 'ids': [1, 2]}
+        self.assertEqual(json.loads(FastJSONRenderer().render(data)), data)
+        self.assertEqual(FastJSONRenderer().render(data, 'application/json; indent=2'),
+                         json.dumps(data, indent=2, ensure_ascii=False).encode())
+        response = self.client.get('/api/profiles/', {'email': 'user0@example.com'})
+        self.assertEqual(json.loads(response.content)['profiles'][0]['username'], 'user0')
+
+
+FAST_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+
+
+class QuickPBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    iterations = 1000
+
+
+@override_settings(PASSWORD_HASHERS=FAST_HASHERS)
+class SignupTests(TestCase):
+    def signup(self, email):
+        return self.client.post('/api/signup/', {'email': email, 'password': 'pw-123456', 'fullname': 'John Smith'})
+
+    def test_username_suffix_allocation(self):
+        for email in ['john@a.org', 'john@b.org', 'john@c.org']:
+            self.assertEqual(self.signup(email).status_code, 201)
+        self.assertEqual(
+            sorted(User.objects.values_list('username', flat=True)), ['john', 'john1', 'john2']
+        )
+        user = User.objects.get(username='john2')
+        self.assertEqual((user.first_name, user.last_name), ('John', 'Smith'))
+
+    def test_allocation_does_not_scale_with_collisions(self):
+        User.objects.bulk_create(
+            [User(username='john')] + [User(username=f'john{i}') for i in range(1, 50)]
+        )
+        with self.assertNumQueries(1):
+            self.assertEqual(allocate_usernames(['john@x.org', 'john@y.org']), ['john50', 'john51'])
+
+    def test_bulk_signup_command(self):
+        User.objects.create(username='ann', email='ann@example.com')
+        lines = [
+            {'email': 'ann@example.com', 'password': 'x', 'fullname': 'Ann A'},
+            {'email': 'ann@other.org', 'password': 'x', 'fullname': 'Ann B'},
+            {'email': 'bob@example.com', 'password': 'x', 'fullname': 'Bob'},
+            {'email': 'not-an-email', 'password': 'x', 'fullname': 'Nobody'},
+        ]
+        with tempfile.NamedTemporaryFile('w', suffix='.jsonl', delete=False) as f:
+            f.write('\n'.join(json.dumps(line) for line in lines))
+        self.addCleanup(os.unlink, f.name)
+
+        call_command('bulk_signup', f.name, batch_size=2, jobs=1, stdout=io.StringIO(), stderr=io.StringIO())
+        self.assertEqual(
+            sorted(User.objects.values_list('username', flat=True)), ['ann', 'ann1', 'bob']
+        )
+        self.assertTrue(User.objects.get(username='bob').check_password('x'))
+
+    def test_emails_are_case_insensitive(self):
+        self.assertEqual(self.signup('John.Smith@Example.com').status_code, 201)
+        self.assertEqual(User.objects.get().email, 'john.smith@example.com')
+        response = self.signup('JOHN.SMITH@example.com')
+        self.assertEqual((response.status_code, response.data['error']), (400, 'Email is already registered.'))
+
+        # Rows written around the signup path still collide in the index
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            User.objects.create(username='other', email='John.Smith@EXAMPLE.com')
+        response = self.client.post('/api/login/', {'email': 'John.Smith@EXAMPLE.COM', 'password': 'pw-123456'})
+        self.assertEqual(response.status_code, 200)
+
+    def test_migration_keeps_each_address_with_the_oldest_account(self):
+        migration = import_module('accounts.migrations.0007_user_email_lower_unique')
+        # Batches smaller than the duplicates, so they span batches
+        self.enterContext(mock.patch.object(migration, 'BATCH_SIZE', 2))
+        with connection.cursor() as cursor:
+            cursor.execute('DROP INDEX accounts_user_email_lower_uniq')
+        for username, email in [('first', 'Ann@Example.com'), ('other', 'bob@example.com'), ('none', ''),
+                                ('second', ' ann@example.com'), ('third', 'ANN@EXAMPLE.COM')]:
+            User.objects.create(username=username, email=email)
+
+        with self.assertLogs('accounts.migrations', 'WARNING') as logs:
+            migration.normalize_emails(django_apps, mock.Mock(connection=connection))
+        self.assertEqual(dict(User.objects.values_list('username', 'email')), {
+            'first': 'ann@example.com', 'other': 'bob@example.com', 'none': '', 'second': '', 'third': '',
+        })
+        ids = dict(User.objects.values_list('username', 'id'))
+        self.assertEqual([record.getMessage() for record in logs.records], [
+            f"cleared duplicate email ann@example.com from user {ids['second']} (kept by user {ids['first']})",
+            f"cleared duplicate email ann@example.com from user {ids['third']} (kept by user {ids['first']})",
+        ])
+
+    def test_concurrent_signup_with_same_email(self):
+        # Another request registered the address between our check and insert
+        User.objects.create(username='taken', email='race@example.com')
+        with mock.patch('accounts.views.email_registered', side_effect=[False, True]):
+            response = self.signup('Race@example.com')
+        self.assertEqual((response.status_code, response.data['error']), (400, 'Email is already registered.'))
+
+
+@override_settings(PASSWORD_HASHERS=FAST_HASHERS)
+class TokenAuthenticationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('ann', 'ann@example.com', 'secret')
+        response = self.client.post('/api/login/', {'email': 'ann@example.com', 'password': 'secret'})
+        self.token = response.data['token']
+        self.client.logout()
+
+    def get_user(self):
+        return self.client.get('/api/user/', HTTP_AUTHORIZATION=f'Token {self.token}')
+
+    def test_cached_token_skips_database(self):
+        self.assertEqual(self.get_user().status_code, 200)
+        with self.assertNumQueries(0):
+            response = self.get_user()
+        self.assertEqual(response.data['email'], 'ann@example.com')
+
+    def test_logout_revokes_token(self):
+        self.get_user()
+        response = self.client.post('/api/logout/', HTTP_AUTHORIZATION=f'Token {self.token}')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.get_user().status_code, 403)
+
+    def test_password_change_revokes_token(self):
+        self.get_user()
+        self.user.set_password('changed')
+        self.user.save()
+        self.assertEqual(self.get_user().status_code, 403)
+
+    def test_revocation_elsewhere_bounded_by_local_ttl(self):
+        self.get_user()
+        # Deleted by another worker: no signal reaches this process
+        Token.objects.filter(key=self.token)._raw_delete(connection.alias)
+        self.assertEqual(self.get_user().status_code, 200)
+        with mock.patch('time.monotonic', return_value=time.monotonic() + 31):
+            self.assertEqual(self.get_user().status_code, 403)
+
+    def test_user_update_refreshes_cached_user(self):
+        self.get_user()
+        self.user.first_name = 'Annie'
+        self.user.save()
+        self.assertEqual(self.get_user().data['first_name'], 'Annie')
+
+
+@override_settings(PASSWORD_HASHERS=FAST_HASHERS)
+class AsyncAuthTests(TransactionTestCase):
+    def tearDown(self):
+        password_pool.capacity = password_pool.workers + 32
+
+    async def test_signup_and_login(self):
+        client = AsyncClient()
+        response = await client.post(
+            '/api/signup/async/',
+            {'email': 'amy@example.com', 'password': 'secret', 'fullname': 'Amy Lee'},
+            content_type='application/json',
+        )
+        self.assertEqual(response.status_code, 201)
+
+        response = await client.post(
+            '/api/login/async/', {'email': 'amy@example.com', 'password': 'secret'},
+            content_type='application/json',
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['user']['username'], 'amy')
+
+        response = await client.post(
+            '/api/login/async/', {'email': 'amy@example.com', 'password': 'wrong'},
+            content_type='application/json',
+        )
+        self.assertEqual(response.status_code, 401)
+
+    @override_settings(PASSWORD_HASHERS=['accounts.tests.QuickPBKDF2PasswordHasher'] + FAST_HASHERS)
+    async def test_backend_checks_apply(self):
+        # Workers forked under these settings
+        password_pool.shutdown()
+        self.addCleanup(password_pool.shutdown)
+        outdated = make_password('secret', hasher='md5')
+        user = await User.objects.acreate(username='cy', email='cy@example.com', password=outdated)
+        await User.objects.acreate(username='di', email='di@example.com', password=outdated, is_active=False)
+        failed = []
+
+        def receiver(credentials, **kwargs):
+            failed.append(credentials)
+
+        user_login_failed.connect(receiver)
+        self.addCleanup(user_login_failed.disconnect, receiver)
+        client = AsyncClient()
+        for email, expected in [('cy@example.com', 200), ('di@example.com', 401), ('nobody@example.com', 401)]:
+            response = await client.post(
+                '/api/login/async/', {'email': email, 'password': 'secret'}, content_type='application/json',
+            )
+            self.assertEqual(response.status_code, expected, email)
+        self.assertEqual(failed, [{'email': 'di@example.com'}, {'email': 'nobody@example.com'}])
+
+        await user.arefresh_from_db()
+        self.assertEqual(identify_hasher(user.password).algorithm, 'pbkdf2_sha256')
+        self.assertTrue(await sync_to_async(user.check_password)('secret'))
+
+    async def test_saturated_pool_returns_503(self):
+        await sync_to_async(User.objects.create_user)('bo', 'bo@example.com', 'secret')
+        password_pool.capacity = 0
+        response = await AsyncClient().post(
+            '/api/login/async/', {'email': 'bo@example.com', 'password': 'secret'},
+            content_type='application/json',
+        )
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response['Retry-After'], '1')
+        self.assertGreaterEqual(password_pool.metrics()['rejected'], 1)
+
+
+class GroupResponseCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_etag_and_not_modified(self):
+        response = self.client.get('/api/groups', {'id': 'host'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.content)['groups'][0]['id'], 'host')
+        etag = response['ETag']
+
+        response = self.client.get('/api/groups', {'id': 'host'}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+
+    def test_gzip_variant(self):
+        plain = self.client.get('/api/groups', {'id': 'ICML.cc/2025/Workshop/AI4MATH'})
+        compressed = self.client.get(
+            '/api/groups', {'id': 'ICML.cc/2025/Workshop/AI4MATH'}, HTTP_ACCEPT_ENCODING='gzip, br;q=0'
+        )
+        self.assertEqual(compressed['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(compressed.content), plain.content)
+        self.assertEqual(compressed['ETag'], plain['ETag'])
+
+    def test_unknown_group(self):
+        response = self.client.get('/api/groups', {'id': 'nope'})
+        self.assertEqual(json.loads(response.content), {'groups': []})
+        self.assertIsNone(cache.get('version:payload:groups:nope'))
+        self.assertIsNone(responses._payloads.get('groups:nope'))
+
+        Group.from_payload({'id': 'nope'}).save()
+        response = self.client.get('/api/groups', {'id': 'nope'})
+        self.assertEqual(json.loads(response.content)['groups'][0]['id'], 'nope')
+        self.assertIsNotNone(responses._payloads.get('groups:nope'))
+
+
+class VenueStoreTests(TestCase):
+    venue = 'ICML.cc/2025/Workshop/AI4MATH'
+
+    def setUp(self):
+        cache.clear()
+
+    def test_seeded_payloads_keep_response_format(self):
+        group = json.loads(self.client.get('/api/groups', {'id': self.venue}).content)['groups'][0]
+        self.assertEqual(group['parent'], 'ICML.cc/2025/Workshop')
+        self.assertTrue(group['web'].startswith('// Webfield component'))
+
+        notes = self.client.get('/api/notes/edits', {'domain': self.venue}).data['notes']
+        self.assertEqual([note['id'] for note in notes], ['AI4MATH-paper1'])
+
+        invitation = self.client.get('/api/invitations', {'id': f'{self.venue}/-/Submission'}).data
+        self.assertEqual(invitation['invitations'][0]['duedate'], 1760000000000)
+
+    def test_lookup_by_parent_and_prefix(self):
+        Group.from_payload({'id': f'{self.venue}/Reviewers', 'parent': self.venue, 'domain': self.venue}).save()
+        by_parent = self.client.get('/api/groups', {'parent': self.venue}).data['groups']
+        by_prefix = self.client.get('/api/groups', {'prefix': f'{self.venue}/'}).data['groups']
+        self.assertEqual([g['id'] for g in by_parent], [f'{self.venue}/Reviewers'])
+        self.assertEqual(by_prefix, by_parent)
+
+    def test_saving_group_invalidates_cached_payload(self):
+        first = self.client.get('/api/groups', {'id': 'host'})
+        group = Group.objects.get(id='host')
+        group.payload = {**group.payload, 'members': ['ICLR.cc']}
+        group.save()
+        second = self.client.get('/api/groups', {'id': 'host'}, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(json.loads(second.content)['groups'][0]['members'], ['ICLR.cc'])
+
+
+class NotesStreamingTests(TestCase):
+    venue = 'ICML.cc/2025/Workshop/AI4MATH'
+
+    def test_ndjson_streams_one_note_per_line(self):
+        for number in range(2, 5):
+            Note.from_payload({
+                'id': f'paper{number}', 'number': number,
+                'invitation': f'{self.venue}/-/Submission', 'content': {'title': f'Paper {number}'},
+            }).save()
+
+        response = self.client.get('/api/notes/edits', {'domain': self.venue, 'format': 'ndjson'})
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(
+            [json.loads(line)['id'] for line in lines], ['AI4MATH-paper1', 'paper2', 'paper3', 'paper4']
+        )
+
+    def test_json_stays_default(self):
+        response = self.client.get('/api/notes/edits', {'domain': self.venue})
+        self.assertEqual(len(response.data['notes']), 1)
+
+
+class ActiveInvitationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.now = now_ms()
+        hour = 3600 * 1000
+        for name, due, invitees in [
+            ('A/-/Late', self.now + 3 * hour, ['everyone']),
+            ('A/-/Soon', self.now + hour, ['~']),
+            ('A/-/Review', self.now + 2 * hour, ['A/Reviewers']),
+            ('A/-/Old', self.now - hour, ['everyone']),
+        ]:
+            Invitation.from_payload({'id': name, 'duedate': due, 'invitees': invitees}).save()
+        Group.from_payload({'id': 'A/Reviewers', 'members': ['~Rev1']}).save()
+
+    def active_ids(self, invitee, now=None):
+        return [i['id'] for i in active_invitations.active(invitee, now=now)]
+
+    def test_active_listing_skips_past_due(self):
+        response = self.client.get('/api/invitations', {'invitee': '~', 'pastdue': 'false', 'type': 'all'})
+        ids = [i['id'] for i in response.data['invitations']]
+        self.assertEqual(ids, ['A/-/Soon', 'A/-/Late'])
+
+    def test_all_invitations_are_filtered_and_paged_in_sql(self):
+        Invitation.from_payload({'id': 'A/-/Open', 'invitees': []}).save()
+        Invitation.from_payload({'id': 'B/-/Other', 'invitees': ['B/Reviewers']}).save()
+        ids, cursor = [], None
+        while True:
+            params = {'invitee': '~Rev1', 'limit': 2}
+            if cursor:
+                params['cursor'] = cursor
+            with CaptureQueriesContext(connection) as context:
+                response = self.client.get('/api/invitations', params)
+            self.assertIn('LIMIT 3', context.captured_queries[-1]['sql'])
+            ids += [i['id'] for i in response.data['invitations']]
+            cursor = response.data['next_cursor']
+            if cursor is None:
+                break
+        # Besides the seeded, public ones
+        self.assertEqual([i for i in ids if i.startswith('A/')],
+                         ['A/-/Late', 'A/-/Old', 'A/-/Open', 'A/-/Review', 'A/-/Soon'])
+        self.assertNotIn('B/-/Other', ids)
+        response = self.client.get('/api/invitations', {'invitee': '~Rev1', 'cursor': '!!'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_membership_and_expiry(self):
+        self.assertEqual(self.active_ids('~Rev1'), ['A/-/Soon', 'A/-/Review', 'A/-/Late'])
+        later = self.now + int(2.5 * 3600 * 1000)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.active_ids('~Rev1', now=later), ['A/-/Late'])
+
+    def test_index_reloads_after_write(self):
+        self.active_ids('~')
+        Invitation.from_payload({'id': 'A/-/New', 'duedate': self.now + 60000, 'invitees': ['~']}).save()
+        self.assertEqual(self.active_ids('~')[0], 'A/-/New')
+
+
+PBS_REPLY = {
+    'signatures': {'values-regex': '~.*'},
+    'readers': {'values-copied': ['PBS', '{content.authors}', '{signatures}']},
+    'writers': {'values-copied': ['PBS', '{signatures}']},
+    'content': {
+        'title': {'order': 1, 'value-regex': '(?!^ +$)^.{1,250}$', 'required': True},
+        'authors': {'order': 2, 'values-regex': '^.{1,5000}$', 'required': True},
+    },
+}
+
+
+class NoteSubmissionTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username='alice', email='alice@example.com')
+        self.client.force_login(self.user)
+        Invitation.from_payload({
+            'id': 'PBS/-/Submission', 'invitees': ['~'], 'tmdate': 1,
+            'duedate': now_ms() + 3600 * 1000, 'reply': PBS_REPLY,
+        }).save()
+
+    def submit(self, content, signatures=('~alice',), **note):
+        return self.client.post('/api/notes/edits', {
+            'invitation': 'PBS/-/Submission', 'signatures': list(signatures),
+            'note': dict(note, content=content),
+        }, content_type='application/json')
+
+    def test_schema_is_compiled_once_per_version(self):
+        invitation = Invitation.objects.get(id='PBS/-/Submission')
+        self.assertIs(reply_schema(invitation), reply_schema(invitation))
+        self.assertIs(reply_schema(Invitation(id=invitation.id, tmdate=2, payload=invitation.payload)),
+                      reply_schema(invitation))
+        # Edited without a tmdate bump, e.g. in the admin
+        reply = dict(PBS_REPLY, content={'title': {'value-regex': '.{1,10}', 'required': True}})
+        edited = Invitation(id=invitation.id, tmdate=invitation.tmdate, payload=dict(invitation.payload, reply=reply))
+        self.assertEqual([rule.name for rule in reply_schema(edited).fields], ['title'])
+
+    def test_malformed_signatures(self):
+        response = self.submit({'title': 'T', 'authors': ['A']}, signatures=[{'a': 1}])
+        self.assertEqual(response.status_code, 400)
+        for body in ([], 'x', {'invitation': ['PBS/-/Submission'], 'note': {}},
+                     {'invitation': 'PBS/-/Submission', 'note': []},
+                     {'invitation': 'PBS/-/Submission', 'note': {'content': {}}, 'signatures': '~alice'},
+                     {'invitation': 'PBS/-/Submission', 'note': {'id': {'a': 1}, 'content': {}}}):
+            response = self.client.post('/api/notes/edits', body, content_type='application/json')
+            self.assertEqual(response.status_code, 400, body)
+
+    def test_validation_errors(self):
+        schema = ReplySchema(PBS_REPLY)
+        self.assertEqual([rule.name for rule in schema.fields], ['title', 'authors'])
+        errors = schema.errors({'title': '   ', 'extra': 'x'}, ['Alice'])
+        self.assertEqual(set(errors), {'title', 'authors', 'extra', 'signatures'})
+        self.assertEqual(schema.errors({'title': 'T', 'authors': ['A']}, ['~alice']), {})
+
+    def test_submit_and_edit(self):
+        response = self.submit({'title': 'First', 'authors': ['Alice']})
+        self.assertEqual(response.status_code, 201)
+        note = response.data['note']
+        self.assertEqual(note['number'], 1)
+        self.assertEqual(note['readers'], ['PBS', 'Alice', '~alice'])
+        self.assertEqual(self.submit({'title': 'Second', 'authors': ['Alice']}).data['note']['number'], 2)
+
+        response = self.submit({'title': 'Renamed'}, id=note['id'])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Note.objects.get(id=note['id']).payload['content'], {'title': 'Renamed', 'authors': ['Alice']})
+
+    def test_rejections(self):
+        self.assertEqual(self.submit({'title': 'x' * 251, 'authors': ['A']}).status_code, 400)
+        self.assertEqual(self.submit({'title': 'T', 'authors': ['A']}, signatures=['~bob']).status_code, 403)
+        Invitation.objects.filter(id='PBS/-/Submission').update(duedate=now_ms() - 1)
+        self.assertEqual(self.submit({'title': 'T', 'authors': ['A']}).status_code, 400)
+        self.client.logout()
+        self.assertEqual(self.submit({'title': 'T', 'authors': ['A']}).status_code, 403)
+        self.assertFalse(Note.objects.filter(invitation='PBS/-/Submission').exists())
+
+
+class NotificationTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username='alice', email='alice@example.com')
+        User.objects.create(username='pc', email='pc@example.com')
+        Group.from_payload({'id': 'PBS', 'content': {
+            'subtitle': {'value': 'PBS'},
+            'submission_email_template': {'value': 'Your submission {{ note_title }} was {{action}} (#{{note_number}}).'},
+            'submission_email_pcs': {'value': True},
+        }}).save()
+        Group.from_payload({'id': 'PBS/Program_Chairs', 'members': ['~pc']}).save()
+        Invitation.from_payload({'id': 'PBS/-/Submission', 'invitees': ['~'], 'reply': PBS_REPLY}).save()
+        self.client.force_login(self.user)
+
+    def submit(self):
+        return self.client.post('/api/notes/edits', {
+            'invitation': 'PBS/-/Submission', 'signatures': ['~alice'],
+            'note': {'content': {'title': 'Sheaves', 'authors': ['Alice']}},
+        }, content_type='application/json')
+
+    def test_submission_queues_and_worker_sends(self):
+        self.submit()
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(OutboxEmail.objects.filter(status=OutboxEmail.PENDING).count(), 2)
+
+        self.assertEqual(send_batch(), (2, 0, 0))
+        self.assertEqual(sorted(m.to[0] for m in mail.outbox), ['alice@example.com', 'pc@example.com'])
+        self.assertEqual(mail.outbox[0].body, 'Your submission Sheaves was posted (#1).')
+        self.assertEqual(send_batch(), (0, 0, 0))
+
+    @override_settings(NOTIFICATIONS={'MAX_ATTEMPTS': 2, 'BACKOFF_SECONDS': 0})
+    def test_failures_back_off_then_give_up(self):
+        self.submit()
+        connection = mock.MagicMock()
+        connection.send_messages.side_effect = OSError('smtp down')
+        self.assertEqual(send_batch(connection=connection), (0, 2, 0))
+        self.assertEqual(send_batch(connection=connection), (0, 0, 2))
+        self.assertEqual(connection.open.call_count, 2)
+        self.assertEqual(OutboxEmail.objects.filter(status=OutboxEmail.FAILED).count(), 2)
+
+    @override_settings(NOTIFICATIONS={'BACKOFF_SECONDS': 60})
+    def test_connection_failure_backs_off_the_batch(self):
+        self.submit()
+        connection = mock.MagicMock()
+        connection.open.side_effect = ConnectionRefusedError('smtp down')
+        self.assertEqual(send_batch(connection=connection), (0, 2, 0))
+        message = OutboxEmail.objects.first()
+        self.assertEqual((message.attempts, message.status), (1, OutboxEmail.PENDING))
+        self.assertIn('ConnectionRefusedError', message.last_error)
+        self.assertGreater(message.next_attempt_at, timezone.now() + timedelta(seconds=30))
+
+    def test_template_is_compiled_once(self):
+        template = compile_template('Hi {{name}}, {{ missing }}!')
+        self.assertIs(compile_template('Hi {{name}}, {{ missing }}!'), template)
+        self.assertEqual(template.render({'name': 'Ada'}), 'Hi Ada, !')
+
+
+class GroupMembershipTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        Group.from_payload({'id': 'V/Program_Committee', 'members': ['V/Reviewers', 'V/Area_Chairs']}).save()
+        Group.from_payload({'id': 'V/Reviewers', 'members': ['~rev']}).save()
+        Group.from_payload({'id': 'V/Area_Chairs', 'members': ['~ac']}).save()
+        for number, readers in [(1, ['everyone']), (2, ['V/Program_Committee']), (3, ['V/Area_Chairs'])]:
+            Note.from_payload({
+                'id': f'V/paper{number}', 'invitation': 'V/-/Submission', 'number': number,
+                'readers': readers, 'content': {'title': f'Paper {number} on lemmas'},
+            }).save()
+
+    def test_closure_is_transitive_and_incremental(self):
+        self.assertEqual(effective_groups(['~rev']), {'V/Reviewers', 'V/Program_Committee'})
+        Group.from_payload({'id': 'V/Reviewers', 'members': ['~rev', 'V/Emergency']}).save()
+        Group.from_payload({'id': 'V/Emergency', 'members': ['~late']}).save()
+        self.assertEqual(effective_groups(['~late']), {'V/Emergency', 'V/Reviewers', 'V/Program_Committee'})
+        Group.objects.get(id='V/Reviewers').delete()
+        self.assertEqual(effective_groups(['~rev']), set())
+        self.assertFalse(GroupMembership.objects.filter(member='~late', group='V/Program_Committee').exists())
+
+    def test_removal_elsewhere_reaches_this_process(self):
+        self.assertEqual(effective_groups(['~ac']), {'V/Area_Chairs', 'V/Program_Committee'})
+        # Written by another worker, whose version bump this process's
+        # local cache never sees
+        GroupMembership.objects.filter(member='~ac').delete()
+        self.assertEqual(effective_groups(['~ac']), {'V/Area_Chairs', 'V/Program_Committee'})
+        with mock.patch('time.time', return_value=time.time() + 11):
+            self.assertEqual(effective_groups(['~ac']), set())
+
+    def test_notes_are_filtered_by_readers(self):
+        def visible(path='/api/notes/edits', **params):
+            response = self.client.get(path, dict(params, domain='V'))
+            return [note['number'] for note in response.data['notes']]
+
+        self.assertEqual(visible(), [1])
+        self.client.force_login(User.objects.create(username='rev'))
+        self.assertEqual(visible(), [1, 2])
+        self.client.force_login(User.objects.create(username='ac'))
+        self.assertEqual(visible(), [1, 2, 3])
+        self.assertEqual(sorted(visible('/api/notes/search', term='lemmas')), [1, 2, 3])
+        self.client.logout()
+        self.assertEqual(visible('/api/notes/search', term='lemmas'), [1])
+
+    def test_empty_readers_are_public_everywhere(self):
+        Note.from_payload({
+            'id': 'V/paper4', 'invitation': 'V/-/Submission', 'number': 4,
+            'readers': [], 'content': {'title': 'Paper 4 on lemmas'},
+        }).save()
+        response = self.client.get('/api/notes/edits', {'domain': 'V'})
+        self.assertEqual([note['number'] for note in response.data['notes']], [1, 4])
+        response = self.client.get('/api/notes/search', {'domain': 'V', 'term': 'lemmas'})
+        self.assertEqual(sorted(note['number'] for note in response.data['notes']), [1, 4])
+
+
+@unittest.skipUnless(find_spec('numpy'), 'assign_reviewers needs NumPy')
+class ReviewerAssignmentTests(TestCase):
+    def setUp(self):
+        Group.from_payload({'id': 'V', 'content': {
+            'automatic_reviewer_assignment': {'value': True}, 'reviewer_roles': {'value': ['Reviewers']},
+        }}).save()
+        Group.from_payload({'id': 'V/Reviewers', 'members': ['~geo', '~alg', '~gal']}).save()
+        for username, affiliation in [('geo', 'MIT'), ('alg', 'CMU'), ('gal', 'ETH'), ('author', 'MIT')]:
+            Profile.objects.create(user=User.objects.create(username=username), affiliation=affiliation)
+
+        def note(note_id, invitation, title, authorids, number=None):
+            Note.from_payload({
+                'id': note_id, 'invitation': invitation, 'number': number,
+                'content': {'title': title, 'authorids': authorids},
+            }).save()
+
+        note('old1', 'W/-/Submission', 'Hyperbolic geometry of manifolds', ['~geo'])
+        note('old2', 'W/-/Submission', 'Graph algorithms for shortest paths', ['~alg'])
+        note('old3', 'W/-/Submission', 'Galois theory of field extensions', ['~gal'])
+        note('s1', 'V/-/Submission', 'Curvature of hyperbolic manifolds', ['~author'], number=1)
+        note('s2', 'V/-/Submission', 'Faster shortest paths algorithms', ['~alg'], number=2)
+
+    def test_assignment_respects_affinity_and_conflicts(self):
+        output = io.StringIO()
+        call_command(
+            'assign_reviewers', 'V', '--reviewers-per-paper', '1', '--max-papers', '1', '--save',
+            stdout=output, stderr=io.StringIO(),
+        )
+        report = json.loads(output.getvalue())
+        # ~geo shares the author's affiliation and ~alg wrote s2
+        self.assertEqual(report['conflicts'], 2)
+        self.assertNotEqual(report['assignments']['s1'][0]['reviewer'], '~geo')
+        self.assertNotEqual(report['assignments']['s2'][0]['reviewer'], '~alg')
+        self.assertEqual(report['unfilled'], [])
+        for number, note_id in [(1, 's1'), (2, 's2')]:
+            self.assertEqual(
+                Group.objects.get(id=f'V/Submission{number}/Reviewers').members,
+                [report['assignments'][note_id][0]['reviewer']],
+            )
+
+    def test_highest_affinity_wins_without_conflicts(self):
+        from .affinity import Vectorizer, assign, tokenize
+
+        submissions = [tokenize('Curvature of hyperbolic manifolds'), tokenize('Faster shortest paths algorithms')]
+        reviewers = [tokenize('Graph algorithms for shortest paths'), tokenize('Hyperbolic geometry of manifolds')]
+        vectorizer = Vectorizer().fit(submissions + reviewers)
+        assigned = assign(vectorizer.transform(submissions), vectorizer.transform(reviewers), {}, per_paper=1)
+        self.assertEqual([rows[0][0] for rows in assigned], [1, 0])
+
+
+class ImportOpenReviewTests(TestCase):
+    records = [
+        {'id': 'I', 'members': ['I/Reviewers']},
+        {'id': 'I/Reviewers', 'members': ['~imp']},
+        {'id': 'I/-/Submission', 'invitees': ['~'], 'duedate': 1},
+        'not json',
+        {'id': 'I/paper1', 'invitation': 'I/-/Submission', 'number': 1, 'content': {'title': 'Imported sheaves'}},
+        {'id': 'I/paper2', 'invitation': 'I/-/Submission', 'number': 'two'},
+    ]
+
+    def setUp(self):
+        cache.clear()
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.path = os.path.join(tmpdir.name, 'dump.jsonl')
+        with open(self.path, 'w') as f:
+            for record in self.records:
+                f.write((record if isinstance(record, str) else json.dumps(record)) + '\n')
+
+    def run_import(self, *args):
+        call_command('import_openreview', self.path, *args, stdout=io.StringIO(), stderr=io.StringIO())
+
+    def test_import_updates_tables_and_indexes(self):
+        self.run_import('--batch-size', '2')
+        self.assertEqual(Group.objects.get(id='I').members, ['I/Reviewers'])
+        self.assertEqual(Invitation.objects.get(id='I/-/Submission').domain, 'I')
+        self.assertEqual(list(Note.objects.filter(domain='I').values_list('id', flat=True)), ['I/paper1'])
+        self.assertIn('I', effective_groups(['~imp']))
+        self.assertEqual(len(self.client.get('/api/notes/search', {'term': 'sheaves'}).data['notes']), 1)
+        self.assertFalse(os.path.exists(self.path + '.checkpoint'))
+
+    def test_resumes_from_checkpoint(self):
+        from .management.commands.import_openreview import Command
+
+        write_batch = Command.write_batch
+        calls = []
+
+        def crash_on_second_batch(command, *args):
+            calls.append(args)
+            if len(calls) == 2:
+                raise RuntimeError('crash')
+            return write_batch(command, *args)
+
+        with mock.patch.object(Command, 'write_batch', crash_on_second_batch):
+            with self.assertRaises(RuntimeError):
+                self.run_import('--batch-size', '2')
+        with open(self.path + '.checkpoint') as f:
+            self.assertEqual(json.load(f)['line'], 2)
+
+        with mock.patch.object(Group.objects, 'bulk_create', wraps=Group.objects.bulk_create) as groups:
+            self.run_import('--batch-size', '2')
+        groups.assert_not_called()
+        self.assertTrue(Note.objects.filter(id='I/paper1').exists())
+
+
+class ExportTests(TestCase):
+    def setUp(self):
+        self.chair = User.objects.create(username='chair', email='chair@example.com')
+        Group.from_payload({'id': 'E/Program_Chairs', 'members': ['~chair']}).save()
+        author = User.objects.create(username='Ada1', email='ada@example.com', first_name='Ada')
+        Profile.objects.create(user=author, affiliation='Analytical Engines')
+        User.objects.create(username='other')
+        for number in (2, 1):
+            Note.from_payload({
+                'id': f'E/paper{number}', 'invitation': 'E/-/Submission', 'number': number,
+                'content': {'title': f'Paper {number}', 'authors': ['Ada', 'Bob'], 'authorids': ['~Ada1']},
+            }).save()
+
+    def test_notes_stream_as_csv_for_program_chairs(self):
+        self.assertEqual(self.client.get('/api/export/notes', {'domain': 'E'}).status_code, 403)
+        self.client.force_login(self.chair)
+        response = self.client.get('/api/export/notes', {'domain': 'E'})
+        self.assertTrue(response.streaming)
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(lines[0], 'id,number,forum,invitation,tmdate,title,authors,authorids,abstract')
+        self.assertEqual(lines[1], 'E/paper1,1,E/paper1,E/-/Submission,,Paper 1,Ada; Bob,~Ada1,')
+        self.assertEqual(len(lines), 3)
+
+        Note.from_payload({
+            'id': 'E/paper3', 'invitation': 'E/-/Submission', 'number': 3,
+            'content': {'title': '=HYPERLINK("http://evil.example")', 'abstract': '-2+3'},
+        }).save()
+        lines = b''.join(self.client.get('/api/export/notes', {'domain': 'E'}).streaming_content).decode().splitlines()
+        self.assertEqual(lines[3], 'E/paper3,3,E/paper3,E/-/Submission,,"\'=HYPERLINK(""http://evil.example"")",,,\'-2+3')
+        Note.objects.filter(id='E/paper3').delete()
+
+        response = self.client.get('/api/export/notes', {'domain': 'E', 'format': 'ndjson'})
+        notes = [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+        self.assertEqual([note['number'] for note in notes], [1, 2])
+
+    def test_profiles_export_is_scoped_to_venue_authors(self):
+        self.client.force_login(self.chair)
+        self.assertEqual(self.client.get('/api/export/profiles').status_code, 403)
+        response = self.client.get('/api/export/profiles', {'domain': 'E', 'format': 'ndjson'})
+        profiles = [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+        self.assertEqual([(p['username'], p['affiliation']) for p in profiles], [('Ada1', 'Analytical Engines')])
+
+        User.objects.create(username='Bob1')
+        Note.from_payload({
+            'id': 'E/paper3', 'invitation': 'E/-/Submission', 'number': 3,
+            'content': {'authorids': {'value': ['~Bob1', '~Ada1', 'ada@example.com', 7]}},
+        }).save()
+        response = self.client.get('/api/export/profiles', {'domain': 'E', 'format': 'ndjson'})
+        profiles = [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+        self.assertEqual([p['username'] for p in profiles], ['Ada1', 'Bob1'])
+
+        self.client.force_login(User.objects.create(username='staff', is_staff=True))
+        response = self.client.get('/api/export/profiles')
+        self.assertEqual(len(b''.join(response.streaming_content).splitlines()), 1 + User.objects.count())
+
+    def test_unverified_email_member_is_not_a_chair(self):
+        Group.from_payload({'id': 'E/Program_Chairs', 'members': ['~chair', 'listed@example.com']}).save()
+        self.client.force_login(User.objects.create(username='squatter', email='listed@example.com'))
+        self.assertEqual(self.client.get('/api/export/notes', {'domain': 'E'}).status_code, 403)
+        self.assertEqual(self.client.get('/api/export/profiles', {'domain': 'E'}).status_code, 403)
+
+    async def test_streams_under_asgi_without_buffering(self):
+        produced = []
+
+        def rows():
+            for i in range(3 * ASYNC_CHUNK_LINES):
+                produced.append(i)
+                yield {'i': i}
+
+        parts = aiter(ndjson_response(rows()))
+        first = await anext(parts)
+        self.assertEqual(len(first.splitlines()), ASYNC_CHUNK_LINES)
+        self.assertLessEqual(len(produced), ASYNC_CHUNK_LINES + 1)
+        rest = [part async for part in parts]
+        self.assertEqual(sum(len(part.splitlines()) for part in rest), 2 * ASYNC_CHUNK_LINES)
+
+        client = AsyncClient()
+        await client.aforce_login(self.chair)
+        response = await client.get('/api/notes/edits', {'domain': 'E', 'format': 'ndjson'})
+        body = b''.join([part async for part in response])
+        self.assertEqual(len(body.splitlines()), 2)
+        response = await client.get('/api/export/notes', {'domain': 'E'})
+        body = b''.join([part async for part in response])
+        self.assertEqual(len(body.splitlines()), 3)
+
+
+class ActivityFeedTests(TransactionTestCase):
+    def add_note(self, number, tmdate, readers=('everyone',)):
+        Note.from_payload({
+            'id': f'F/paper{number}', 'invitation': 'F/-/Submission', 'number': number,
+            'tmdate': tmdate, 'readers': list(readers),
+        }).save()
+
+    def setUp(self):
+        cache.clear()
+        self.add_note(1, 100)
+        self.add_note(2, 200)
+        self.add_note(3, 300, readers=['F/Program_Chairs'])
+
+    def test_since_cursor_returns_only_changes(self):
+        response = self.client.get('/api/activity', {'domain': 'F'})
+        self.assertEqual([n['number'] for n in response.data['notes']], [2, 1])
+        cursor = response.data['cursor']
+
+        response = self.client.get('/api/activity', {'domain': 'F', 'since': cursor})
+        self.assertEqual((response.data['notes'], response.data['cursor']), ([], cursor))
+        self.add_note(4, 400)
+        self.add_note(1, 500)
+        response = self.client.get('/api/activity', {'domain': 'F', 'since': cursor})
+        self.assertEqual([n['number'] for n in response.data['notes']], [4, 1])
+        self.assertEqual(self.client.get('/api/activity', {'domain': 'F', 'since': 'bad'}).status_code, 400)
+
+    async def test_stream_pushes_new_edits(self):
+        response = await AsyncClient().get('/api/activity/stream', {'domain': 'F'})
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        events = aiter(response.streaming_content)
+        self.assertTrue((await anext(events)).startswith(b'retry:'))
+
+        pending = asyncio.ensure_future(anext(events))
+        await asyncio.sleep(0.05)
+        await sync_to_async(self.add_note)(5, 600)
+        event = (await asyncio.wait_for(pending, 2)).decode()
+        self.assertIn('event: note', event)
+        self.assertEqual(json.loads(event.split('data: ', 1)[1])['number'], 5)
+        await events.aclose()
+
+
+class VenueHomepageTests(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        Group.from_payload({'id': 'V/2026', 'domain': 'V/2026', 'readers': ['everyone'], 'members': []}).save()
+        Invitation.from_payload({'id': 'V/2026/-/Submission', 'duedate': now_ms() + 86400000}).save()
+        Invitation.from_payload({'id': 'V/2026/-/Closed', 'duedate': now_ms() - 1000}).save()
+        for number in (1, 2):
+            Note.from_payload({
+                'id': f'V/2026/paper{number}', 'invitation': 'V/2026/-/Submission',
+                'number': number, 'readers': ['everyone'],
+            }).save()
+
+    def test_one_response_cached_until_a_part_changes(self):
+        with self.assertNumQueries(3):
+            data = json.loads(self.client.get('/api/venues/homepage', {'id': 'V/2026'}).content)
+        self.assertEqual(data['group']['id'], 'V/2026')
+        self.assertEqual([i['id'] for i in data['invitations']], ['V/2026/-/Submission'])
+        self.assertEqual([n['number'] for n in data['notes']], [1, 2])
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/venues/homepage', {'id': 'V/2026'})
+        self.assertEqual(
+            self.client.get('/api/venues/homepage', {'id': 'V/2026'}, HTTP_IF_NONE_MATCH=response['ETag']).status_code,
+            304,
+        )
+
+        Note.from_payload({
+            'id': 'V/2026/paper3', 'invitation': 'V/2026/-/Submission', 'number': 3,
+            'readers': ['V/2026/Program_Chairs'],
+        }).save()
+        data = self.client.get('/api/venues/homepage', {'id': 'V/2026'}).data
+        self.assertEqual([n['number'] for n in data['notes']], [1, 2])
+        self.assertEqual(self.client.get('/api/venues/homepage', {'id': 'V/9999'}).status_code, 404)
+
+    async def test_async_endpoint(self):
+        response = await AsyncClient().get('/api/venues/homepage/async', {'id': 'V/2026'})
+        data = json.loads(response.content)
+        self.assertEqual(data['group']['id'], 'V/2026')
+        self.assertEqual([n['number'] for n in data['notes']], [1, 2])
+
+
+class NoteSearchTests(TestCase):
+    def add_note(self, note_id, domain, title, abstract='', authors=()):
+        Note.from_payload({
+            'id': note_id, 'invitation': f'{domain}/-/Submission',
+            'content': {'title': title, 'abstract': abstract, 'authors': list(authors)},
+        }).save()
+
+    def search(self, **params):
+        return self.client.get('/api/notes/search', params).data
+
+    def test_ranked_and_filtered_by_domain(self):
+        self.add_note('n1', 'A', 'Graph neural networks', 'We study theorem proving.')
+        self.add_note('n2', 'A', 'Theorem proving with transformers')
+        self.add_note('n3', 'B', 'Theorem proving at scale')
+        ids = [n['id'] for n in self.search(term='theorem prov', domain='A')['notes']]
+        self.assertEqual(ids, ['n2', 'n1'])
+
+    def test_seeded_note_is_indexed_and_updates_are_incremental(self):
+        self.assertEqual([n['id'] for n in self.search(term='Amazing')['notes']], ['AI4MATH-paper1'])
+        self.add_note('AI4MATH-paper1', 'ICML.cc/2025/Workshop/AI4MATH', 'Renamed paper', authors=['Carol'])
+        self.assertEqual(self.search(term='Amazing')['notes'], [])
+        self.assertEqual(len(self.search(term='carol')['notes']), 1)
+        Note.objects.filter(id='AI4MATH-paper1').delete()
+        self.assertEqual(self.search(term='renamed')['notes'], [])
+
+    def test_pagination_and_operator_input(self):
+        for i in range(3):
+            self.add_note(f'p{i}', 'A', f'Proof search {i}')
+        first = self.search(term='proof', limit=2)
+        self.assertEqual(len(first['notes']), 2)
+        second = self.search(term='proof', limit=2, offset=first['next_offset'])
+        self.assertEqual(len(second['notes']), 1)
+        self.assertIsNone(second['next_offset'])
+        self.assertEqual(self.search(term='"proof" OR (')['notes'], [])
+
+
+class ProfileBatchTests(TestCase):
+    def setUp(self):
+        self.users = [
+            User.objects.create(username=f'u{i}', email=f'u{i}@example.com') for i in range(3)
+        ]
+        Profile.objects.create(user=self.users[0], affiliation='MIT')
+
+    def test_single_query_keyed_by_request_with_misses(self):
+        ids = [str(self.users[0].id), '999999']
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/profiles/batch/', {
+                'ids': ','.join(ids), 'emails': 'u2@example.com,nobody@example.com',
+            })
+        profiles = response.data['profiles']
+        self.assertEqual(profiles[ids[0]]['affiliation'], 'MIT')
+        self.assertEqual(profiles['u2@example.com']['username'], 'u2')
+        self.assertEqual(sorted(response.data['missing']), ['999999', 'nobody@example.com'])
+
+    def test_malformed_ids(self):
+        for ids in ('²', '1,x', '9' * 30, '-1'):
+            self.assertEqual(self.client.get('/api/profiles/batch/', {'ids': ids}).status_code, 400, ids)
+        for body in ([], [1, 2], 'x'):
+            response = self.client.post('/api/profiles/batch/', body, content_type='application/json')
+            self.assertEqual(response.status_code, 400, body)
+
+    def test_post_and_limit(self):
+        response = self.client.post(
+            '/api/profiles/batch/', {'ids': [self.users[1].id]}, content_type='application/json'
+        )
+        self.assertEqual(response.data['profiles'][str(self.users[1].id)]['email'], 'u1@example.com')
+        response = self.client.post(
+            '/api/profiles/batch/', {'ids': list(range(1, 102))}, content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 400)
+
+
+PERF_VENUE = 'Perf/2026/Conference'
+PERF_PASSWORD = 'perf-password'
+# (name, method, path, params); params may depend on the request number
+PERF_ENDPOINTS = [
+    ('profiles', 'GET', '/api/profiles/', lambda i: {'limit': 50}),
+    ('profile_batch', 'GET', '/api/profiles/batch/', lambda i: {
+        'emails': ','.join(f'perf{n}@example.com' for n in range(10)),
+    }),
+    ('signup', 'POST', '/api/signup/', lambda i: {
+        'email': f'newcomer{i}@example.com', 'password': PERF_PASSWORD, 'fullname': 'New Comer',
+    }),
+    # A first login each time, which also creates the token
+    ('login', 'POST', '/api/login/', lambda i: {'email': f'perf{i}@example.com', 'password': PERF_PASSWORD}),
+    ('group', 'GET', '/api/groups', lambda i: {'id': PERF_VENUE}),
+    ('groups_by_parent', 'GET', '/api/groups', lambda i: {'parent': PERF_VENUE}),
+    ('invitations_active', 'GET', '/api/invitations', lambda i: {'invitee': '~', 'pastdue': 'false'}),
+    ('invitations_all', 'GET', '/api/invitations', lambda i: {'invitee': '~perf1'}),
+    ('notes', 'GET', '/api/notes/edits', lambda i: {'domain': PERF_VENUE}),
+    ('notes_search', 'GET', '/api/notes/search', lambda i: {'term': 'theorem'}),
+    ('activity', 'GET', '/api/activity', lambda i: {'domain': PERF_VENUE}),
+    ('venue_homepage', 'GET', '/api/venues/homepage', lambda i: {'id': PERF_VENUE}),
+]
+# Coarse per-request budgets on PERF_ROWS rows; they catch an algorithm
+# gone quadratic, not a few percent
+DEFAULT_LATENCY_BUDGET_MS = 250
+LATENCY_BUDGETS_MS = {'notes': 500}
+PERF_ROWS = 1000
+
+
+@override_settings(PASSWORD_HASHERS=FAST_HASHERS)
+class PerformanceBudgetTests(TestCase):
+    """
+    Guards against N+1 queries and slow paths: every endpoint must run the
+    same number of queries with 10 rows as with 1,000, and stay within a
+    latency budget.
+    """
+
+    def seed(self, start, stop):
+        users = User.objects.bulk_create([
+            User(username=f'perf{i}', email=f'perf{i}@example.com', first_name='Perf', last_name=str(i))
+            for i in range(start, stop)
+        ])
+        for user in users:
+            user.set_password(PERF_PASSWORD)
+        User.objects.bulk_update(users, ['password'])
+        Profile.objects.bulk_create([Profile(user=user, affiliation=f'Org {user.id % 7}') for user in users])
+        if start == 0:
+            Group.from_payload({'id': PERF_VENUE, 'domain': PERF_VENUE, 'readers': ['everyone'], 'members': []}).save()
+        groups = Group.objects.bulk_create([
+            Group.from_payload({
+                'id': f'{PERF_VENUE}/Area{i}', 'domain': PERF_VENUE, 'parent': PERF_VENUE,
+                'members': [f'~perf{i}'],
+            })
+            for i in range(start, stop)
+        ])
+        membership.refresh([group.id for group in groups])
+        Invitation.objects.bulk_create([
+            Invitation.from_payload({
+                'id': f'{PERF_VENUE}/-/Stage{i}', 'duedate': now_ms() + 86400000 + i,
+                'invitees': ['~' if i % 2 else f'{PERF_VENUE}/Area{i}'],
+            })
+            for i in range(start, stop)
+        ])
+        notes = Note.objects.bulk_create([
+            Note.from_payload({
+                'id': f'{PERF_VENUE}/paper{i}', 'invitation': f'{PERF_VENUE}/-/Submission',
+                'number': i + 1, 'tmdate': 1000 + i,
+                'readers': ['everyone'] if i % 3 else [f'{PERF_VENUE}/Area{i}'],
+                'content': {'title': {'value': f'Paper {i} on theorem proving'}},
+            })
+            for i in range(start, stop)
+        ])
+        index_notes((note.id, note.payload) for note in notes)
+
+    def request(self, method, path, params):
+        if method == 'POST':
+            return self.client.post(path, params, content_type='application/json')
+        return self.client.get(path, params)
+
+    def queries(self, i):
+        """``{endpoint: [SQL]}`` of one cold-cache request to every endpoint."""
+        executed = {}
+        for name, method, path, params in PERF_ENDPOINTS:
+            cache.clear()
+            self.client.logout()
+            with CaptureQueriesContext(connection) as context:
+                response = self.request(method, path, params(i))
+            self.assertLess(response.status_code, 400, f'{name}: {response.content[:200]}')
+            executed[name] = [query['sql'] for query in context.captured_queries]
+        return executed
+
+    def test_query_count_independent_of_rows(self):
+        self.seed(0, 10)
+        small = self.queries(0)
+        self.seed(10, PERF_ROWS)
+        large = self.queries(1)
+        for name, _, _, _ in PERF_ENDPOINTS:
+            with self.subTest(endpoint=name):
+                if len(small[name]) != len(large[name]):
+                    diff = '\n'.join(difflib.unified_diff(
+                        small[name], large[name], 'with 10 rows', f'with {PERF_ROWS} rows', lineterm='',
+                    ))
+                    self.fail(
+                        f'{name} ran {len(small[name])} queries with 10 rows and '
+                        f'{len(large[name])} with {PERF_ROWS}:\n{diff}'
+                    )
+
+    def test_latency_budgets(self):
+        self.seed(0, PERF_ROWS)
+        for name, method, path, params in PERF_ENDPOINTS:
+            with self.subTest(endpoint=name):
+                timings = []
+                for i in range(3):
+                    cache.clear()
+                    self.client.logout()
+                    with CaptureQueriesContext(connection) as context:
+                        started = time.perf_counter()
+                        self.request(method, path, params(i))
+                        timings.append((time.perf_counter() - started) * 1000)
+                budget = LATENCY_BUDGETS_MS.get(name, DEFAULT_LATENCY_BUDGET_MS)
+                sql = '\n'.join(query['sql'] for query in context.captured_queries)
+                self.assertLess(
+                    sorted(timings)[1], budget,
+                    f'{name} took {sorted(timings)[1]:.0f} ms (budget {budget} ms); last run executed:\n{sql}',
+                )
+
+
+class PerformanceMiddlewareTests(TestCase):
+    def setUp(self):
+        route_histograms.reset()
+
+    def test_server_timing_and_route_histogram(self):
+        User.objects.create(username='x', email='x@example.com')
+        response = self.client.get('/api/profiles/')
+        self.assertRegex(response['Server-Timing'], r'db;dur=[\d.]+;desc="1 queries"')
+        self.assertIn('render;dur=', response['Server-Timing'])
+
+        stats = route_histograms.snapshot()['GET /api/profiles/']
+        self.assertEqual(stats['count'], 1)
+        self.assertEqual(stats['db_queries'], 1)
+        self.assertEqual(stats['response_bytes'], len(response.content))
+
+    async def test_unmeasured_queries_are_not_reported_under_asgi(self):
+        response = await AsyncClient().get('/api/profiles/')
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('db;', response['Server-Timing'])
+        stats = route_histograms.snapshot()['GET /api/profiles/']
+        self.assertEqual((stats['count'], stats['db_count']), (1, 0))
+
+    @override_settings(PERFORMANCE={'SLOW_REQUEST_MS': 0})
+    def test_slow_requests_are_logged_with_sql(self):
+        with self.assertLogs('accounts.performance', 'WARNING') as logs:
+            self.client.get('/api/profiles/')
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual(record['route'], '/api/profiles/')
+        self.assertIn('auth_user', record['sql'][0]['sql'])
+
+    def test_metrics_endpoint_is_staff_only(self):
+        self.assertEqual(self.client.get('/api/internal/metrics/').status_code, 403)
+        admin = User.objects.create(username='admin', is_staff=True)
+        self.client.force_login(admin)
+        self.assertIn('routes', self.client.get('/api/internal/metrics/').data)
+
+
+@override_settings(DATABASE_REPLICAS=['replica1', 'replica2'], PASSWORD_HASHERS=FAST_HASHERS)
+class ReplicaRouterTests(TestCase):
+    def setUp(self):
+        self.router = PrimaryReplicaRouter()
+
+    def test_reads_go_to_replicas_until_a_write(self):
+        tokens = db_router.begin_request(pinned=False)
+        try:
+            with mock.patch.object(connections['default'], 'in_atomic_block', False):
+                self.assertIn(self.router.db_for_read(User), ['replica1', 'replica2'])
+                self.assertEqual(self.router.db_for_write(User), 'default')
+                self.assertEqual(self.router.db_for_read(User), 'default')
+        finally:
+            self.assertTrue(db_router.end_request(tokens))
+
+    def test_pinned_client_and_open_transaction_read_primary(self):
+        tokens = db_router.begin_request(pinned=True)
+        try:
+            self.assertEqual(self.router.db_for_read(User), 'default')
+        finally:
+            db_router.end_request(tokens)
+        # TestCase wraps each test in a transaction on the primary
+        self.assertEqual(self.router.db_for_read(User), 'default')
+
+    def test_write_sets_sticky_cookie(self):
+        response = self.client.post('/api/logout/')
+        self.assertNotIn('pin_primary', response.cookies)
+        User.objects.create(username='w')
+        response = self.client.post(
+            '/api/signup/', {'email': 'w@example.com', 'password': 'x', 'fullname': 'W'}
+        )
+        self.assertEqual(response.cookies['pin_primary']['max-age'], 10)
+
+
+@override_settings(PASSWORD_HASHERS=FAST_HASHERS)
+class SessionStoreTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(write_behind.flush)
+        self.client.post('/api/signup/', {'email': 's@example.com', 'password': 'pw', 'fullname': 'Sam S'})
+        self.client.post('/api/logout/')
+        write_behind.flush()
+
+    def test_login_is_written_through_and_updates_behind(self):
+        self.client.post('/api/login/', {'email': 's@example.com', 'password': 'pw'})
+        key = self.client.session.session_key
+        # Another process with a cold cache still finds the login
+        self.assertIn('_auth_user_id', Session.objects.get(session_key=key).get_decoded())
+        self.assertEqual(self.client.get('/api/user/').status_code, 200)
+
+        session = SessionStore(key)
+        session['theme'] = 'dark'
+        session.save()
+        self.assertNotIn('theme', Session.objects.get(session_key=key).get_decoded())
+        write_behind.flush()
+        self.assertEqual(Session.objects.get(session_key=key).get_decoded()['theme'], 'dark')
+
+    def test_logout_deletes_immediately(self):
+        self.client.post('/api/login/', {'email': 's@example.com', 'password': 'pw'})
+        key = self.client.session.session_key
+        write_behind.flush()
+        self.client.post('/api/logout/')
+        self.assertFalse(Session.objects.filter(session_key=key).exists())
+        self.assertFalse(SessionStore().exists(key))
+
+    def test_logout_elsewhere_bounded_by_local_ttl(self):
+        self.client.post('/api/login/', {'email': 's@example.com', 'password': 'pw'})
+        key = self.client.session.session_key
+        self.assertEqual(self.client.get('/api/user/').status_code, 200)
+        # Deleted by another worker, whose cache this process does not share
+        Session.objects.filter(session_key=key).delete()
+        with mock.patch('time.monotonic', return_value=time.monotonic() + 6):
+            self.assertEqual(self.client.get('/api/user/').status_code, 403)
+
+    @override_settings(SESSION_WRITE_BEHIND={'EXPIRED_BATCH': 2})
+    def test_expired_sessions_are_deleted_in_batches(self):
+        past = timezone.now() - timedelta(days=1)
+        Session.objects.bulk_create(
+            [Session(session_key=f'expired{i}', session_data='', expire_date=past) for i in range(5)]
+        )
+        self.assertEqual(SessionStore.delete_expired_batch(), 2)
+        self.assertEqual(Session.objects.filter(expire_date__lt=timezone.now()).count(), 3)
+        SessionStore.clear_expired()
+        self.assertFalse(Session.objects.filter(expire_date__lt=timezone.now()).exists())
@@ -1,15 +1,29 @@
 from django.urls import path
-from .views import signup_api, login_api,user_detail_api, profile_list_api, profile_detail_api,groups_api, invitations_api, open_submissions_api,notes_edits
+from .views import signup_api, login_api, logout_api,user_detail_api, profile_list_api, profile_detail_api, profile_batch_api,groups_api, invitations_api, open_submissions_api,notes_edits, notes_search_api, venue_homepage_api, activity_api, export_profiles_api, export_notes_api, hashing_pool_metrics_api, metrics_api
+from .async_views import signup_async_api, login_async_api, activity_stream_api, venue_homepage_async_api
 
 urlpatterns = [
     path('signup/', signup_api, name='signup_api'),
     path('login/', login_api, name='login_api'),
+    path('logout/', logout_api, name='logout_api'),
+    path('signup/async/', signup_async_api, name='signup_async_api'),
+    path('login/async/', login_async_api, name='login_async_api'),
+    path('internal/hashing-pool/', hashing_pool_metrics_api),
+    path('internal/metrics/', metrics_api),
     path('user/', user_detail_api, name='user_detail_api'),
     path('profiles/', profile_list_api),
     path('profiles/<int:user_id>/', profile_detail_api),
+    path('profiles/batch/', profile_batch_api),
     path('groups', groups_api),
     path('api/open_submissions/', open_submissions_api),
     path('invitations', invitations_api),
     path('notes/edits', notes_edits),
+    path('notes/search', notes_search_api),
+    path('venues/homepage', venue_homepage_api),
+    path('venues/homepage/async', venue_homepage_async_api),
+    path('activity', activity_api),
+    path('activity/stream', activity_stream_api),
+    path('export/profiles', export_profiles_api),
+    path('export/notes', export_notes_api),
     #  path('api/group/', group_detail_api),
 ]
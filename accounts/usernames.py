@@ -0,0 +1,97 @@
+import re
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+
+from accounts.emails import normalize_email
+
+USERNAME_MAX_LENGTH = User._meta.get_field('username').max_length
+# Room left at the end of the base for the numeric suffix.
+SUFFIX_DIGITS = 8
+MAX_ATTEMPTS = 5
+
+
+def username_base(email):
+    return User.normalize_username(email.split('@')[0])[:USERNAME_MAX_LENGTH - SUFFIX_DIGITS]
+
+
+def split_full_name(full_name):
+    names = full_name.strip().split(' ', 1)
+    return names[0], names[1] if len(names) > 1 else ''
+
+
+def _prefix_range(base):
+    # Digits sort below ':', so [base, base + ':') covers base, base1, base42, ...
+    # and is answered by a range scan on the unique username index.
+    return Q(username__gte=base, username__lt=base + ':')
+
+
+def taken_suffixes(bases):
+    """
+    Return ``{base: set of numeric suffixes in use}`` for every base, using a
+    single query. The bare base counts as suffix 0.
+    """
+    bases = set(bases)
+    taken = {base: set() for base in bases}
+    if not bases:
+        return taken
+
+    condition = Q()
+    for base in bases:
+        condition |= _prefix_range(base)
+    patterns = {base: re.compile(re.escape(base) + r'(\d*)') for base in bases}
+    for name in User.objects.filter(condition).values_list('username', flat=True):
+        for base, pattern in patterns.items():
+            match = pattern.fullmatch(name)
+            if match:
+                taken[base].add(int(match.group(1) or 0))
+    return taken
+
+
+def next_username(base, suffixes):
+    if 0 not in suffixes:
+        return base
+    return f'{base}{max(suffixes) + 1}'
+
+
+def allocate_usernames(emails):
+    """Allocate distinct usernames for a batch of emails with one query."""
+    bases = [username_base(email) for email in emails]
+    taken = taken_suffixes(bases)
+    usernames = []
+    for base in bases:
+        username = next_username(base, taken[base])
+        taken[base].add(int(username[len(base):] or 0))
+        usernames.append(username)
+    return usernames
+
+
+def create_user_with_email(email, password, full_name='', encoded_password=None):
+    """
+    Create a user whose username is derived from ``email``.
+
+    The next free suffix is found with one prefix query; if a concurrent
+    signup takes the same name first, the unique constraint rejects our
+    insert and we allocate again.
+    """
+    email = normalize_email(email)
+    first_name, last_name = split_full_name(full_name)
+    if encoded_password is None:
+        encoded_password = make_password(password)
+
+    for attempt in range(MAX_ATTEMPTS):
+        username = allocate_usernames([email])[0]
+        try:
+            with transaction.atomic():
+                return User.objects.create(
+                    username=username,
+                    email=email,
+                    password=encoded_password,
+                    first_name=first_name,
+                    last_name=last_name,
+                )
+        except IntegrityError:
+            if attempt == MAX_ATTEMPTS - 1 or not User.objects.filter(username=username).exists():
+                raise
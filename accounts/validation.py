@@ -0,0 +1,124 @@
+import hashlib
+import json
+import re
+
+from accounts.lru import LRUCache
+
+# Compiled schemas by (invitation id, digest of its reply): any edit to the
+# reply, however it is saved and in whichever process, gives a new key, and
+# the old entry ages out of the LRU.
+_schemas = LRUCache(maxsize=1024)
+
+TYPES = {'string': str, 'integer': int, 'float': (int, float), 'boolean': bool}
+
+
+def _value(field):
+    # Notes carry content either as plain values or as {"value": ...}
+    return field.get('value') if isinstance(field, dict) else field
+
+
+def _is_blank(value):
+    return value is None or value == '' or value == []
+
+
+class FieldRule:
+    """The constraint on one reply field, with its regex compiled."""
+
+    def __init__(self, name, spec):
+        self.name = name
+        self.order = spec.get('order', 0)
+        self.required = bool(spec.get('required'))
+        self.many = 'values-regex' in spec or isinstance(spec.get('value'), list) or 'values' in spec
+        pattern = spec.get('value-regex') or spec.get('values-regex')
+        self.pattern = re.compile(pattern) if pattern else None
+        declared = spec.get('value')
+        if isinstance(declared, list):
+            declared = declared[0] if declared else None
+        self.type = TYPES.get(declared) if isinstance(declared, str) else None
+        self.choices = spec.get('values') or spec.get('value-dropdown') or spec.get('value-radio')
+
+    def error(self, value):
+        if _is_blank(value):
+            return f'{self.name} is required.' if self.required else None
+
+        values = value
+        if self.many:
+            if not isinstance(value, list):
+                return f'{self.name} must be a list.'
+        else:
+            if isinstance(value, list):
+                return f'{self.name} must be a single value.'
+            values = [value]
+
+        for item in values:
+            if self.type is not None and not isinstance(item, self.type):
+                return f'{self.name} has the wrong type.'
+            if self.pattern is not None and not (isinstance(item, str) and self.pattern.fullmatch(item)):
+                return f'{self.name} does not match {self.pattern.pattern!r}.'
+            if self.choices is not None and item not in self.choices:
+                return f'{self.name} must be one of {self.choices}.'
+        return None
+
+
+class ReplySchema:
+    """
+    An invitation's ``reply`` compiled once: content rules in field order,
+    the required-field set and the signature rule.
+    """
+
+    def __init__(self, reply):
+        content = reply.get('content') or {}
+        self.fields = sorted(
+            (FieldRule(name, spec or {}) for name, spec in content.items()),
+            key=lambda rule: (rule.order, rule.name),
+        )
+        self.required = frozenset(rule.name for rule in self.fields if rule.required)
+        self.signatures = FieldRule('signatures', dict(reply.get('signatures') or {}, required=True))
+        self.signatures.many = True
+        self.readers = reply.get('readers') or {}
+        self.writers = reply.get('writers') or {}
+
+    def errors(self, content, signatures):
+        """Return ``{field: message}`` for everything ``content`` gets wrong."""
+        errors = {}
+        message = self.signatures.error(signatures)
+        if message:
+            errors['signatures'] = message
+
+        known = set()
+        for rule in self.fields:
+            known.add(rule.name)
+            message = rule.error(_value(content.get(rule.name)))
+            if message:
+                errors[rule.name] = message
+        for name in content.keys() - known:
+            errors[name] = f'{name} is not allowed by the invitation.'
+        return errors
+
+    def principals(self, spec, content, signatures):
+        """Expand a ``readers``/``writers`` spec for a note."""
+        if 'values' in spec:
+            return list(spec['values'])
+        values = []
+        for value in spec.get('values-copied') or []:
+            if value == '{signatures}':
+                values += signatures
+            elif value.startswith('{content.') and value.endswith('}'):
+                copied = _value(content.get(value[len('{content.'):-1]))
+                values += copied if isinstance(copied, list) else [copied] if copied else []
+            else:
+                values.append(value)
+        # Keep the first occurrence of each
+        return list(dict.fromkeys(values))
+
+
+def reply_schema(invitation):
+    """The compiled schema of an ``Invitation``, cached by id and reply contents."""
+    reply = invitation.payload.get('reply') or {}
+    digest = hashlib.sha256(json.dumps(reply, sort_keys=True, separators=(',', ':')).encode()).digest()
+    key = (invitation.id, digest)
+    schema = _schemas.get(key)
+    if schema is None:
+        schema = ReplySchema(reply)
+        _schemas.set(key, schema)
+    return schema
@@ -0,0 +1,44 @@
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+
+# Version tokens in the shared cache let every process tell whether its own
+# in-memory copy of something is still current after a write elsewhere.
+#
+# That only works when the default cache is shared between processes (see
+# CACHES in settings). With a process-local backend a bump never reaches the
+# other workers, so tokens there expire after VERSION_TOKEN_TTL seconds and
+# every copy built under them is rebuilt: other processes see a change after
+# at most that long instead of never.
+
+PROCESS_LOCAL_BACKENDS = frozenset([
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+])
+
+
+def cache_is_shared(alias='default'):
+    return settings.CACHES[alias]['BACKEND'] not in PROCESS_LOCAL_BACKENDS
+
+
+def _timeout():
+    return None if cache_is_shared() else getattr(settings, 'VERSION_TOKEN_TTL', 10)
+
+
+def current_version(name):
+    key = f'version:{name}'
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, uuid.uuid4().hex, _timeout())
+        version = cache.get(key)
+    return version
+
+
+def peek_version(name):
+    """The current token of ``name``, or None if it has none; never adds one."""
+    return cache.get(f'version:{name}')
+
+
+def bump_version(name):
+    cache.set(f'version:{name}', uuid.uuid4().hex, _timeout())
@@ -1,15 +1,54 @@
 from django.shortcuts import render
 from django.contrib.auth.models import User
-from django.contrib.auth import authenticate,login
-from accounts.serializer import UserProfileSerializer
-from rest_framework.decorators import api_view,permission_classes
-from rest_framework.permissions import IsAuthenticated, AllowAny
+from django.db import IntegrityError, transaction
+from django.db.models import Max, Q
+from django.db.models.expressions import RawSQL
+from django.utils.crypto import get_random_string
+from django.contrib.auth import authenticate,login,logout
+from accounts import activity
+from accounts.models import Group, Invitation, Note
+from accounts.serializer import fast_profile_serializer
+from accounts.usernames import create_user_with_email
+from accounts.pagination import InvalidCursor, keyset_page, page_size_from
+from accounts.emails import email_condition, email_registered, normalize_email, users_with_email, with_email_lower
+from accounts.hashing import password_pool
+from accounts.homepage import homepage
+from accounts.middleware import route_histograms
+from accounts.invitation_index import PUBLIC_INVITEES, active_invitations, invited, invitee_principals, now_ms
+from accounts.membership import can_read, effective_groups, reader_principals, user_ids
+from accounts.notifications import queue_note_emails
+from accounts.renderers import CSVRenderer, NDJSONRenderer, csv_response, ndjson_response
+from accounts.responses import cached_json_response, encoded_json_response
+from accounts.search import search_available, search_notes
+from accounts.validation import reply_schema
+from rest_framework.decorators import api_view,permission_classes,renderer_classes
+from rest_framework.settings import api_settings
+from rest_framework.permissions import IsAuthenticated, IsAuthenticatedOrReadOnly, AllowAny, IsAdminUser
 from rest_framework.response import Response
 from django.core.validators import validate_email
 from django.core.exceptions import ValidationError
 from rest_framework import status
 from rest_framework.authtoken.models import Token
 
+EMAIL_TAKEN = 'Email is already registered.'
+
+
+def signup_validation_error(email, password, full_name):
+    if not email or not password or not full_name:
+        return 'Email, full name, and password are required.'
+
+    # Validate email format
+    try:
+        validate_email(email)
+    except ValidationError:
+        return 'Invalid email address.'
+
+    # Check if email is already in use, in any letter case
+    if email_registered(email):
+        return EMAIL_TAKEN
+    return None
+
+
 @api_view(['POST'])
 @permission_classes([AllowAny])
 def signup_api(request):
@@ -17,40 +56,33 @@ def signup_api(request):
     password = request.data.get('password')
     full_name = request.data.get('fullname')
 
-    if not email or not password or not full_name:
-        return Response({'error': 'Email, full name, and password are required.'}, status=status.HTTP_400_BAD_REQUEST)
+    error = signup_validation_error(email, password, full_name)
+    if error:
+        return Response({'error': error}, status=status.HTTP_400_BAD_REQUEST)
 
-    # Validate email format
+    # Username is derived from the email; see accounts.usernames
     try:
-        validate_email(email)
-    except ValidationError:
-        return Response({'error': 'Invalid email address.'}, status=status.HTTP_400_BAD_REQUEST)
-
-    # Check if email is already in use
-    if User.objects.filter(email=email).exists():
-        return Response({'error': 'Email is already registered.'}, status=status.HTTP_400_BAD_REQUEST)
-
-    # Generate a username from the email (you can customize this logic)
-    base_username = email.split('@')[0]
-    username = base_username
-    counter = 1
-    while User.objects.filter(username=username).exists():
-        username = f"{base_username}{counter}"
-        counter += 1
-
-    # Create user
-    user = User.objects.create_user(username=username, email=email, password=password)
-
-    # Set full name
-    names = full_name.strip().split(' ', 1)
-    user.first_name = names[0]
-    if len(names) > 1:
-        user.last_name = names[1]
-    user.save()
+        create_user_with_email(email, password, full_name)
+    except IntegrityError:
+        # A concurrent signup registered the address after our check
+        if not email_registered(email):
+            raise
+        return Response({'error': EMAIL_TAKEN}, status=status.HTTP_400_BAD_REQUEST)
 
     return Response({'message': 'User created successfully.'}, status=status.HTTP_201_CREATED)
 
 
+def login_payload(user, token):
+    user_data = {
+        'id': user.id,
+        'username': user.username,
+        'email': user.email,
+        'first_name': user.first_name,
+        'last_name': user.last_name
+    }
+    return {'message': 'Login successful', 'user': user_data, 'token': token.key}
+
+
 @api_view(['POST'])
 @permission_classes([AllowAny])
 def login_api(request):
@@ -61,7 +93,7 @@ def login_api(request):
         return Response({'error': 'Email and password are required'}, status=status.HTTP_400_BAD_REQUEST)
 
     try:
-        user_obj = User.objects.get(email=email)
+        user_obj = users_with_email(email).get()
     except User.DoesNotExist:
         return Response({'error': 'Invalid credentials'}, status=status.HTTP_401_UNAUTHORIZED)
 
@@ -70,21 +102,38 @@ def login_api(request):
     if user is not None:
         login(request, user)
         token, _ = Token.objects.get_or_create(user=user)
-        user_data = {
-            'id': user.id,
-            'username': user.username,
-            'email': user.email,
-            'first_name': user.first_name,
-            'last_name': user.last_name
-        }
-        return Response({'message': 'Login successful', 'user': user_data, 'token': token.key}, status=status.HTTP_200_OK)
+        return Response(login_payload(user, token), status=status.HTTP_200_OK)
     else:
         return Response({'error': 'Invalid credentials'}, status=status.HTTP_401_UNAUTHORIZED)
     
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def logout_api(request):
+    # Deleting the token also evicts it from the token auth cache
+    Token.objects.filter(user=request.user).delete()
+    logout(request)
+    return Response({'message': 'Logout successful'}, status=status.HTTP_200_OK)
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def hashing_pool_metrics_api(request):
+    return Response(password_pool.metrics(), status=status.HTTP_200_OK)
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def metrics_api(request):
+    return Response({
+        'routes': route_histograms.snapshot(),
+        'hashing_pool': password_pool.metrics(),
+        'activity_streams': activity.broadcaster.listeners(),
+    }, status=status.HTTP_200_OK)
+
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def user_detail_api(request):
-    print("Session ID received:", request.COOKIES.get('sessionid'))
     user = request.user
     return Response({
         "email": user.email,
@@ -100,26 +149,85 @@ def profile_list_api(request):
     email = request.GET.get('email')
     user_id = request.GET.get('id')
 
-    queryset = User.objects.all()
-    if email:
-        queryset = queryset.filter(email=email)
+    queryset = fast_profile_serializer.values(users_with_email(email) if email else User.objects.all())
     if user_id:
         queryset = queryset.filter(id=user_id)
 
-    serializer = UserProfileSerializer(queryset, many=True)
-    return Response({'profiles': serializer.data}, status=200)
+    try:
+        users, next_cursor = keyset_page(
+            queryset, ['id'], cursor=request.GET.get('cursor'), size=page_size_from(request)
+        )
+    except InvalidCursor as exc:
+        return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+    return Response({'profiles': fast_profile_serializer.many(users), 'next_cursor': next_cursor}, status=200)
+
+
+# Upper bound on ids + emails per batch request
+PROFILE_BATCH_LIMIT = 100
+# Largest id any database backend stores
+MAX_USER_ID = 2 ** 63 - 1
+
+
+def _batch_values(request, name):
+    if request.method == 'POST':
+        values = request.data.get(name) or []
+        if not isinstance(values, list):
+            values = [values]
+    else:
+        values = request.GET.get(name, '').split(',')
+    return [str(v).strip() for v in values if str(v).strip()]
+
+
+def _batch_id(value):
+    # ASCII digits only ('²'.isdigit() is true) and within a 64-bit integer
+    if not (value.isascii() and value.isdecimal()) or int(value) > MAX_USER_ID:
+        raise ValueError(value)
+    return int(value)
+
+
+@api_view(['GET', 'POST'])
+@permission_classes([AllowAny])
+def profile_batch_api(request):
+    if request.method == 'POST' and not isinstance(request.data, dict):
+        return Response({'error': 'The request body must be an object'}, status=status.HTTP_400_BAD_REQUEST)
+    ids = _batch_values(request, 'ids')
+    emails = _batch_values(request, 'emails')
+    if not ids and not emails:
+        return Response({'error': 'ids or emails are required'}, status=status.HTTP_400_BAD_REQUEST)
+    if len(ids) + len(emails) > PROFILE_BATCH_LIMIT:
+        return Response(
+            {'error': f'At most {PROFILE_BATCH_LIMIT} ids and emails per request'},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    try:
+        numbers = [_batch_id(value) for value in ids]
+    except ValueError:
+        return Response({'error': 'ids must be integers'}, status=status.HTTP_400_BAD_REQUEST)
+
+    # One IN query for the whole batch, Profile joined in
+    users = fast_profile_serializer.values(with_email_lower(User.objects.all()).filter(
+        Q(id__in=numbers) | email_condition(emails)
+    )).order_by('id')
+    by_id, by_email = {}, {}
+    for data in fast_profile_serializer.many(users):
+        by_id[str(data['id'])] = data
+        by_email.setdefault(normalize_email(data['email']), data)
+
+    profiles = {key: by_id.get(key) for key in ids}
+    profiles.update({key: by_email.get(normalize_email(key)) for key in emails})
+    missing = [key for key, value in profiles.items() if value is None]
+    return Response({'profiles': profiles, 'missing': missing}, status=200)
 
 
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def profile_detail_api(request, user_id):
-    try:
-        user = User.objects.get(id=user_id)
-    except User.DoesNotExist:
+    user = fast_profile_serializer.values(User.objects.filter(id=user_id)).first()
+    if user is None:
         return Response({'error': 'User not found'}, status=404)
 
-    serializer = UserProfileSerializer(user)
-    return Response(serializer.data, status=200)
+    return Response(fast_profile_serializer.to_representation(user), status=200)
 
 @api_view(['GET'])
 def open_submissions_api(request):
@@ -146,306 +254,357 @@ def open_submissions_api(request):
 
 
 
-ACTIVE_VENUES = {
-    "groups": [
-        {
-            "id": "active_venues",
-            "cdate": 1595932124826,
-            "ddate": None,
-            "tcdate": None,
-            "tmdate": 1750450706275,
-            "tddate": None,
-            "web": None,
-            "signatures": ["OpenReview.net/Support"],
-            "signatories": ["OpenReview.net"],
-            "readers": ["everyone"],
-            "nonreaders": [],
-            "writers": ["OpenReview.net/Support"],
-            "members": [
-                "TMLR",
-                "Computo",
-                "DMLR",
-                "YouthLACIGF.lat/2024/Edition",
-                "ISAPh/2024/Symposium",
-                "MSLD/2024/Meeting",
-                "icaps-conference.org/ICAPS/2024/Demo_Track",
-                "sfb1102.uni-saarland.de/RAILS/2025/Conference",
-                "jpmorganchase.com/2025/ML/Conference"
-            ]
-        }
-    ]
-}
-
-HOST_GROUP = {
-    "groups": [
-        {
-            "id": "host",
-            "cdate": 1495570582864,
-            "ddate": None,
-            "tcdate": None,
-            "tmdate": 1750269735058,
-            "tddate": None,
-            "tauthor": "OpenReview.net",
-            "web": None,
-            "signatures": ["~Super_User1"],
-            "signatories": ["OpenReview.net"],
-            "readers": ["everyone"],
-            "nonreaders": [],
-            "writers": ["OpenReview.net"],
-            "members": [
-                "ICLR.cc",
-                "auai.org/UAI",
-                "ICML.cc",
-                "ACM.org",
-                "AKBC.ws",
-                "learningtheory.org/COLT",
-                "eswc-conferences.org/ESWC",
-                "IEEE.org",
-                "ISMIR.net",
-                "swsa.semanticweb.org/ISWC",
-                "machineintelligence.cc/MIC",
-                "MIDL.io",
-                "roboticsfoundation.org/RSS"
-            ]
-        }
-    ]
-}
-
-INVITATIONS = {
-    "invitations": [
-        {
-            "reply": {
-                "readers": {
-                    "values-copied": [
-                        "microsoft.com/AI4Science/2022/Internal/PBS",
-                        "{content.authorids}",
-                        "{signatures}"
-                    ]
-                },
-                "writers": {
-                    "values-copied": [
-                        "microsoft.com/AI4Science/2022/Internal/PBS",
-                        "{content.authorids}",
-                        "{signatures}"
-                    ]
-                },
-                "signatures": {
-                    "values-regex": "~.*"
-                },
-                "content": {
-                    "title": {
-                        "description": "Title of paper. Add TeX formulas using the following formats: $In-line Formula$ or $$Block Formula$$",
-                        "order": 1,
-                        "value-regex": "(?!^ +$)^.{1,250}$",
-                        "required": True
-                    },
-                    "authors": {
-                        "description": "List of author names",
-                        "order": 2,
-                        "values-regex": "^.{1,5000}$",
-                        "required": True
-                    }
-                }
+def _payloads(queryset):
+    return list(queryset.values_list('payload', flat=True))
+
+
+# Rows fetched per database round trip when streaming notes
+NOTES_CHUNK_SIZE = 500
+
+
+def note_edit(request):
+    if not isinstance(request.data, dict):
+        return Response({'error': 'The request body must be an object'}, status=status.HTTP_400_BAD_REQUEST)
+    invitation_id = request.data.get('invitation')
+    signatures = request.data.get('signatures')
+    note = request.data.get('note')
+    if not invitation_id or not isinstance(invitation_id, str) or not isinstance(note, dict):
+        return Response({'error': 'invitation and note are required'}, status=status.HTTP_400_BAD_REQUEST)
+    if signatures is None:
+        signatures = []
+    if not isinstance(signatures, list) or not all(isinstance(signature, str) for signature in signatures):
+        return Response({'error': 'signatures must be a list of strings'}, status=status.HTTP_400_BAD_REQUEST)
+    if not isinstance(note.get('id') or '', str):
+        return Response({'error': 'note.id must be a string'}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        invitation = Invitation.objects.get(id=invitation_id)
+    except Invitation.DoesNotExist:
+        return Response({'error': 'Invitation not found'}, status=status.HTTP_404_NOT_FOUND)
+
+    now = now_ms()
+    if invitation.duedate is not None and invitation.duedate < now:
+        return Response({'error': 'The invitation has expired.'}, status=status.HTTP_400_BAD_REQUEST)
+
+    ids = user_ids(request.user)
+    invitees = set(invitation.invitees or ['everyone'])
+    member_of = effective_groups(ids)
+    if invitees.isdisjoint(ids | member_of | PUBLIC_INVITEES):
+        return Response({'error': 'You are not invited to post to this invitation.'}, status=status.HTTP_403_FORBIDDEN)
+    if not set(signatures) <= ids | member_of:
+        return Response({'error': 'You cannot sign with these signatures.'}, status=status.HTTP_403_FORBIDDEN)
+
+    content = note.get('content') or {}
+    if not isinstance(content, dict):
+        return Response({'error': 'note.content must be an object'}, status=status.HTTP_400_BAD_REQUEST)
+
+    existing = None
+    if note.get('id'):
+        existing = Note.objects.filter(id=note['id'], invitation=invitation.id).first()
+        if existing is None:
+            return Response({'error': 'Note not found'}, status=status.HTTP_404_NOT_FOUND)
+        writers = existing.payload.get('writers') or []
+        if set(writers).isdisjoint(ids | member_of):
+            return Response({'error': 'You cannot edit this note.'}, status=status.HTTP_403_FORBIDDEN)
+        content = {**(existing.payload.get('content') or {}), **content}
+
+    # Compiled once per invitation version; see accounts.validation
+    schema = reply_schema(invitation)
+    errors = schema.errors(content, signatures)
+    if errors:
+        return Response(
+            {'error': 'The note does not match the invitation.', 'fields': errors},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    with transaction.atomic():
+        if existing is None:
+            last = Note.objects.filter(invitation=invitation.id).aggregate(number=Max('number'))['number']
+            note_id = get_random_string(10)
+            payload = {
+                'id': note_id, 'invitation': invitation.id, 'domain': invitation.domain,
+                'forum': note_id, 'number': (last or 0) + 1, 'cdate': now,
             }
-        }
-    ]
-}
-
-WEBFIELD = """// Webfield component
-return {
-  component: 'VenueHomepage',
-  properties: {
-    header: {
-      title: '2nd AI for Math Workshop @ ICML 2025',
-      subtitle: 'AI4MATH',
-      website: 'https://sites.google.com/view/ai4mathworkshopicml2025',
-      contact: 'ai4mathicml@gmail.com',
-      location: 'Vienna, Austria',
-      instructions: 'Please see the venue website for more information.',
-      date: 'Jul 18 2025',
-      deadline: 'Submission Start: Mar 18 2025 11:59PM UTC-0, Submission Deadline: Jun 21 2025 11:59AM UTC-0'
-    },
-     submission_id: 'ICML.cc/2025/Workshop/AI4MATH/-/Submission',
-    parentGroupId: 'ICML.cc/2025/Workshop',
-    "submission_id": "ICML.cc/2025/Workshop/AI4MATH/-/Submission",
-    "tabs": [
-        {"name": "Recent Activity", "type": "activity"}
-    ],
-
-
-  }
-}"""
+        else:
+            payload = dict(existing.payload)
+        payload.update({
+            'tmdate': now,
+            'signatures': signatures,
+            'readers': schema.principals(schema.readers, content, signatures) or payload.get('readers', []),
+            'writers': schema.principals(schema.writers, content, signatures) or payload.get('writers', []),
+            'content': content,
+        })
+        Note.from_payload(payload).save()
+        # Delivered later by send_notifications; queued here so the email
+        # exists exactly when the note does
+        venue = Group.objects.filter(id=invitation.domain).values_list('payload', flat=True).first()
+        if venue:
+            queue_note_emails(venue, payload, 'updated' if existing else 'posted')
+
+    return Response(
+        {'note': payload},
+        status=status.HTTP_200_OK if existing else status.HTTP_201_CREATED,
+    )
+
+
+@api_view(['GET', 'POST'])
+@permission_classes([IsAuthenticatedOrReadOnly])
+@renderer_classes(api_settings.DEFAULT_RENDERER_CLASSES + [NDJSONRenderer])
+def notes_edits(request):
+    if request.method == 'POST':
+        return note_edit(request)
+
+    domain = request.GET.get('domain')
+    invitation = request.GET.get('invitation')
+    streaming = request.accepted_renderer.format == 'ndjson'
+    if not domain and not invitation:
+        return ndjson_response([]) if streaming else Response({"notes": []})
+
+    notes = Note.objects.all()
+    if domain:
+        notes = notes.filter(domain=domain)
+    if invitation:
+        notes = notes.filter(invitation=invitation)
+    notes = notes.order_by('number', 'id')
+
+    # Only notes whose readers include one of the user's principals
+    principals = reader_principals(request)
+    payloads = (
+        payload for payload in notes.values_list('payload', flat=True).iterator(chunk_size=NOTES_CHUNK_SIZE)
+        if can_read(payload.get('readers'), principals)
+    )
+
+    # ?format=ndjson (or Accept: application/x-ndjson) streams one note per
+    # line as rows come off the cursor instead of building one big body
+    if streaming:
+        return ndjson_response(payloads)
+    return Response({"notes": list(payloads)})
 
 
 @api_view(['GET'])
-def notes_edits(request):
+def notes_search_api(request):
+    term = request.GET.get('term', '').strip()
+    if not term:
+        return Response({'error': 'term is required'}, status=status.HTTP_400_BAD_REQUEST)
+    if not search_available():
+        return Response({'error': 'Search is not available on this database.'}, status=status.HTTP_501_NOT_IMPLEMENTED)
+
+    limit = page_size_from(request, default=25, maximum=100)
+    try:
+        offset = max(0, int(request.GET.get('offset', 0)))
+    except ValueError:
+        offset = 0
+
+    notes = search_notes(
+        term, domain=request.GET.get('domain'), readers=reader_principals(request),
+        limit=limit + 1, offset=offset,
+    )
+    next_offset = offset + limit if len(notes) > limit else None
+    return Response({"notes": notes[:limit], "next_offset": next_offset})
+
+
+@api_view(['GET'])
+def activity_api(request):
+    """
+    Recent activity of a venue. Without ``since``: the latest edits, newest
+    first. With ``since``: only edits after that cursor, oldest first. Either
+    way ``cursor`` is the value to pass as ``since`` on the next poll.
+    """
     domain = request.GET.get('domain')
-    if domain == 'ICML.cc/2025/Workshop/AI4MATH':
-        return Response({
-            "notes": [
-                {
-                    "id": "AI4MATH-paper1",
-                    "invitation": "ICML.cc/2025/Workshop/AI4MATH/-/Submission",
-                    "signatures": ["ICML.cc/2025/Workshop/AI4MATH/Authors"],
-                    "readers": ["everyone"],
-                    "writers": ["ICML.cc/2025/Workshop/AI4MATH/Authors"],
-                    "content": {
-                        "title": "An Amazing Math AI Paper",
-                        "abstract": "This paper explores mathematical reasoning in AI.",
-                        "authors": ["Alice", "Bob"],
-                        "authorids": ["~Alice1", "~Bob1"]
-                    }
-                }
-            ]
-        })
-    else:
-        return Response({"notes": []})
+    if not domain:
+        return Response({'error': 'domain is required'}, status=status.HTTP_400_BAD_REQUEST)
+    size = page_size_from(request)
+    since = request.GET.get('since')
+    try:
+        if since:
+            rows, cursor, has_more = activity.broadcaster.changes(domain, since, size)
+        else:
+            (rows, cursor), has_more = activity.latest(domain, size), False
+    except InvalidCursor as exc:
+        return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+    principals = reader_principals(request)
+    notes = [row['payload'] for row in rows if can_read(row['payload'].get('readers'), principals)]
+    return Response({'notes': notes, 'cursor': cursor, 'has_more': has_more})
+
+
+# Rows fetched per database round trip by the export endpoints
+EXPORT_CHUNK_SIZE = 2000
+PROFILE_EXPORT_FIELDS = [
+    'id', 'username', 'email', 'first_name', 'last_name', 'affiliation', 'homepage', 'scholar', 'github',
+]
+NOTE_EXPORT_FIELDS = ['id', 'number', 'forum', 'invitation', 'tmdate', 'title', 'authors', 'authorids', 'abstract']
+EXPORT_RENDERERS = [CSVRenderer, NDJSONRenderer] + api_settings.DEFAULT_RENDERER_CLASSES
+
+
+def _content_text(content, name):
+    value = content.get(name)
+    if isinstance(value, dict):
+        value = value.get('value')
+    if isinstance(value, list):
+        return '; '.join(str(item) for item in value)
+    return value
+
+
+def _can_export(user, domain):
+    if user.is_staff:
+        return True
+    if not user.is_authenticated or not domain:
+        return False
+    venue = Group.objects.filter(id=domain).values_list('payload', flat=True).first() or {}
+    chairs = _content_text(venue.get('content') or {}, 'program_chairs_id') or f'{domain}/Program_Chairs'
+    return chairs in effective_groups(user_ids(user))
+
+
+def _venue_author_usernames(domain):
+    """SQL for the distinct usernames in the ``authorids`` of ``domain``'s notes."""
+    # authorids is either a list or {"value": [...]}
+    path = (
+        "CASE json_type(n.payload, '$.content.authorids') "
+        "WHEN 'object' THEN '$.content.authorids.value' ELSE '$.content.authorids' END"
+    )
+    return RawSQL(
+        f"SELECT DISTINCT substr(a.value, 2) FROM {Note._meta.db_table} n, json_each(n.payload, {path}) a "
+        "WHERE n.domain = %s AND a.type = 'text' AND substr(a.value, 1, 1) = '~'",
+        [domain],
+    )
+
+
+def _profile_rows(domain=None):
+    users = User.objects.order_by('id').values_list(
+        'id', 'username', 'email', 'first_name', 'last_name',
+        'profile__affiliation', 'profile__homepage', 'profile__scholar', 'profile__github',
+    )
+    if domain:
+        # Authors of the venue's submissions, deduplicated by the database
+        users = users.filter(username__in=_venue_author_usernames(domain))
+    yield from users.iterator(chunk_size=EXPORT_CHUNK_SIZE)
+
+
+def _note_rows(notes):
+    for note_id, number, forum, invitation, tmdate, payload in notes:
+        content = payload.get('content') or {}
+        yield (
+            note_id, number, forum, invitation, tmdate,
+            _content_text(content, 'title'), _content_text(content, 'authors'),
+            _content_text(content, 'authorids'), _content_text(content, 'abstract'),
+        )
+
 
 @api_view(['GET'])
-def groups_api(request):
-    group_id = request.GET.get('id')
-    if group_id == 'active_venues':
-        return Response(ACTIVE_VENUES)
-    elif group_id == 'host':
-        return Response(HOST_GROUP)
-    elif group_id == 'ICML.cc/2025/Workshop/AI4MATH':
-        return Response({
-        "groups": [{
-            "id": group_id,
-            "signatures": ["~Super_User1"],
-            "signatories": [group_id],
-            "readers": ["everyone"],
-            "writers": [group_id],
-            "invitations": [
-                "OpenReview.net/-/Edit",
-                f"{group_id}/-/Edit"
-            ],
-            "domain": group_id,
-            "parent": "ICML.cc/2025/Workshop",
-            "details": {
-                "writable": True
-            },
-            "content": {
-                "title": {"value": "2nd AI for Math Workshop @ ICML 2025"},
-                "subtitle": {"value": "AI4MATH"},
-                "website": {"value": "https://sites.google.com/view/ai4mathworkshopicml2025"},
-                "contact": {"value": "ai4mathicml@gmail.com"},
-                "location": {"value": "Vienna, Austria"},
-                "instructions": {"value": "Please see the venue website for more information."},
-                "date": {"value": "Jul 18 2025"},
-                "deadline": {"value": "Submission Start: Mar 18 2025 11:59PM UTC-0, Submission Deadline: Jun 21 2025 11:59AM UTC-0"},
-                "submission_id": {"value": f"{group_id}/-/Submission"},
-                "parentGroupId": {"value": "ICML.cc/2025/Workshop"},
-                "meta_invitation_id": {"value": f"{group_id}/-/Edit"},
-                "submission_name": {"value": "Submission"},
-                "submission_venue_id": {"value": f"{group_id}/Submission"},
-                "withdrawn_venue_id": {"value": f"{group_id}/Withdrawn_Submission"},
-                "desk_rejected_venue_id": {"value": f"{group_id}/Desk_Rejected_Submission"},
-                "rejected_venue_id": {"value": f"{group_id}/Rejected_Submission"},
-                "public_submissions": {"value": False},
-                "submission_email_template": {
-                    "value": "Your submission to AI4MATH has been {{action}}.\n\nSubmission Number: {{note_number}} \n\nTitle: {{note_title}} \n\nTo view your submission, click here: https://openreview.net/forum?id={{note_forum}}"
-                },
-                "submission_email_pcs": {"value": False},
-                "program_chairs_id": {"value": f"{group_id}/Program_Chairs"},
-                "reviewers_id": {"value": f"{group_id}/Reviewers"},
-                "authors_id": {"value": f"{group_id}/Authors"},
-                "authors_name": {"value": "Authors"},
-                "withdraw_expiration_id": {"value": f"{group_id}/-/Withdraw_Expiration"},
-                "desk_reject_expiration_id": {"value": f"{group_id}/-/Desk_Reject_Expiration"},
-                "automatic_reviewer_assignment": {"value": True},
-                "review_name": {"value": "Official_Review"},
-                "review_email_pcs": {"value": False},
-                "comment_mandatory_readers": {"value": [f"{group_id}/Program_Chairs"]},
-                "comment_email_pcs": {"value": False},
-                "rebuttal_name": {"value": "Rebuttal"},
-                "reviewer_roles": {"value": ["Reviewers"]}
-            },
-            "submission_id": "ICML.cc/2025/Workshop/AI4MATH/-/Submission",
-            "tabs": [
-                {"name": "Recent Activity", "type": "activity"}
-            ],
+@renderer_classes(EXPORT_RENDERERS)
+def export_profiles_api(request):
+    """All profiles (staff), or ?domain= for the authors of a venue (its program chairs too)."""
+    domain = request.GET.get('domain')
+    if not _can_export(request.user, domain):
+        return Response({'error': 'Only program chairs and staff can export profiles.'}, status=status.HTTP_403_FORBIDDEN)
 
+    rows = _profile_rows(domain)
+    if request.accepted_renderer.format == 'ndjson':
+        return ndjson_response(dict(zip(PROFILE_EXPORT_FIELDS, row)) for row in rows)
+    return csv_response(PROFILE_EXPORT_FIELDS, rows, filename='profiles.csv')
 
-            "web": WEBFIELD
-        }]
-    }, status=status.HTTP_200_OK)
+
+@api_view(['GET'])
+@renderer_classes(EXPORT_RENDERERS)
+def export_notes_api(request):
+    domain = request.GET.get('domain')
+    if not domain:
+        return Response({'error': 'domain is required'}, status=status.HTTP_400_BAD_REQUEST)
+    if not _can_export(request.user, domain):
+        return Response({'error': 'Only program chairs and staff can export notes.'}, status=status.HTTP_403_FORBIDDEN)
+
+    notes = Note.objects.filter(domain=domain)
+    if request.GET.get('invitation'):
+        notes = notes.filter(invitation=request.GET['invitation'])
+    notes = notes.order_by('number', 'id')
+
+    # Rows stream straight off the cursor; nothing is collected first
+    if request.accepted_renderer.format == 'ndjson':
+        return ndjson_response(notes.values_list('payload', flat=True).iterator(chunk_size=EXPORT_CHUNK_SIZE))
+    rows = notes.values_list('id', 'number', 'forum', 'invitation', 'tmdate', 'payload')
+    return csv_response(NOTE_EXPORT_FIELDS, _note_rows(rows.iterator(chunk_size=EXPORT_CHUNK_SIZE)), filename='notes.csv')
 
 
+def _group_payload(group_id):
+    return {"groups": _payloads(Group.objects.filter(id=group_id))}
+
+
+@api_view(['GET'])
+def groups_api(request):
+    group_id = request.GET.get('id')
+    if group_id:
+        # Encoded once and served with an ETag; see accounts.responses
+        return cached_json_response(
+            request, f'groups:{group_id}', lambda: _group_payload(group_id),
+            cacheable=lambda: Group.objects.filter(id=group_id).exists(),
+        )
+
+    groups = Group.objects.all()
+    if request.GET.get('domain'):
+        groups = groups.filter(domain=request.GET['domain'])
+    elif request.GET.get('parent'):
+        groups = groups.filter(parent=request.GET['parent'])
+    elif request.GET.get('prefix'):
+        # A range rather than LIKE 'prefix%' so the primary key index is used
+        prefix = request.GET['prefix']
+        groups = groups.filter(id__gte=prefix, id__lt=prefix + '\U0010ffff')
     else:
         return Response({"groups": []})
 
+    try:
+        rows, next_cursor = keyset_page(
+            groups.values('id', 'payload'), ['id'],
+            cursor=request.GET.get('cursor'), size=page_size_from(request),
+        )
+    except InvalidCursor as exc:
+        return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+    return Response({"groups": [row['payload'] for row in rows], "next_cursor": next_cursor})
+
+
+@api_view(['GET'])
+def venue_homepage_api(request):
+    """The group, open invitations and first page of notes of a venue; see accounts.homepage."""
+    venue_id = request.GET.get('id')
+    if not venue_id:
+        return Response({'error': 'id is required'}, status=status.HTTP_400_BAD_REQUEST)
+    page = homepage(venue_id)
+    if page.data['group'] is None:
+        return Response({'error': 'Venue not found'}, status=status.HTTP_404_NOT_FOUND)
+    if page.public:
+        return encoded_json_response(request, page.encoded())
+    return Response(page.for_reader(reader_principals(request)))
+
+
 @api_view(['GET'])
 def invitations_api(request):
     invitee = request.GET.get('invitee')
     pastdue = request.GET.get('pastdue') == 'false'
-    invitation_type = request.GET.get('type')
     invitation_id = request.GET.get('id')
 
-    future_due = 1760000000000
-
     # 🎯 SINGLE INVITATION BY ID
-    if invitation_id == 'ICML.cc/2025/Workshop/AI4MATH/-/Submission':
-        return Response({
-            "invitations": [
-                {
-                    "id": invitation_id,
-                    "signatures": ["ICML.cc/2025/Workshop/AI4MATH"],
-                    "readers": ["everyone"],
-                    "writers": ["ICML.cc/2025/Workshop/AI4MATH"],
-                    "invitees": ["everyone"],
-                    "multiReply": False,
-                    "duedate": future_due,
-                    "details": {
-                        "writable": True
-                    },
-                    "reply": {
-                        "readers": {"values": ["everyone"]},
-                        "writers": {"values-copied": ["authors"]},
-                        "signatures": {"values-regex": "~.*"},
-                        "content": {
-                            "title": {"order": 1, "value": "string"},
-                            "abstract": {"order": 2, "value": "string"},
-                            "authors": {"order": 3, "value": ["string"]}
-                        }
-                    }
-                }
-            ]
-        })
+    if invitation_id:
+        return Response({"invitations": _payloads(Invitation.objects.filter(id=invitation_id))})
 
-    # 🎯 LIST ALL ACTIVE
-    if invitee == '~' and pastdue and invitation_type == 'all':
-        return Response({
-            "invitations": [
-                {
-                    "id": "ICML.cc/2025/Workshop/AI4MATH/-/Submission",
-                    "duedate": future_due,
-                    "details": {"writable": True},
-                    "reply": {
-                        "readers": {"values": ["everyone"]},
-                        "writers": {"values-copied": ["authors"]},
-                        "signatures": {"values-regex": "~.*"},
-                        "content": {
-                            "title": {"order": 1, "value": "string"},
-                            "abstract": {"order": 2, "value": "string"},
-                            "authors": {"order": 3, "value": ["string"]}
-                        }
-                    }
-                },
-                {
-                    "id": "GSCL.cc/2025/Workshop/CPSS/-/Submission",
-                    "duedate": 1750200000000,
-                    "details": {"writable": True}
-                },
-                {
-                    "id": "IEEE.org/ISWC/2025/-/Submission",
-                    "duedate": 1750400000000,
-                    "details": {"writable": True}
-                }
-            ]
-        })
+    if request.GET.get('domain'):
+        invitations = Invitation.objects.filter(domain=request.GET['domain'])
+        return Response({"invitations": _payloads(invitations.order_by('duedate', 'id'))})
+
+    if not invitee:
+        return Response({"invitations": []})
 
-    return Response({"invitations": []})
+    # 🎯 LIST ALL ACTIVE, e.g. invitee=~&pastdue=false&type=all
+    if pastdue:
+        return Response({"invitations": active_invitations.active(invitee)})
+
+    principals = invitee_principals(invitee, {invitee: effective_groups([invitee])})
+    try:
+        rows, next_cursor = keyset_page(
+            invited(Invitation.objects.values('id', 'payload'), principals), ['id'],
+            cursor=request.GET.get('cursor'), size=page_size_from(request),
+        )
+    except InvalidCursor as exc:
+        return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+    return Response({"invitations": [row['payload'] for row in rows], "next_cursor": next_cursor})
 
 
 
@@ -12,5 +12,16 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'openreview_backend.settings')
+# Read by the settings, e.g. to turn off persistent database connections
+os.environ['OPENREVIEW_SERVER'] = 'asgi'
 
+# Serve under ASGI (e.g. uvicorn openreview_backend.asgi:application): the
+# async views, including the /api/activity/stream event stream, then run on
+# the event loop instead of holding a worker thread per open connection.
 application = get_asgi_application()
+
+# Create the password hashing pool before the server starts handling
+# requests (see accounts.async_views).
+from accounts.hashing import password_pool  # noqa: E402
+
+password_pool.start()
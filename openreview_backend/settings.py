@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -56,6 +57,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'accounts.middleware.PerformanceMiddleware',
+    'accounts.middleware.ReplicaStickinessMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.security.SecurityMiddleware',
@@ -89,13 +92,57 @@ WSGI_APPLICATION = 'openreview_backend.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+SQLITE_OPTIONS = {
+    # Seconds a connection waits for a lock before raising "database is locked"
+    'timeout': 20,
+    # Take the write lock at BEGIN so concurrent writers queue instead of
+    # failing on lock upgrade
+    'transaction_mode': 'IMMEDIATE',
+    # Run on every new connection. WAL lets readers proceed during writes.
+    'init_command': (
+        'PRAGMA journal_mode=WAL;'
+        'PRAGMA synchronous=NORMAL;'
+        'PRAGMA temp_store=MEMORY;'
+        'PRAGMA cache_size=-20000;'
+        'PRAGMA mmap_size=134217728;'
+    ),
+}
+
+# Set by asgi.py before the settings load
+SERVED_BY_ASGI = os.environ.get('OPENREVIEW_SERVER') == 'asgi'
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Keep connections open across requests instead of reconnecting. Not
+        # under ASGI, where every sync_to_async worker thread holds its own
+        # connection that no request cycle closes (see the Django docs on
+        # persistent connections).
+        'CONN_MAX_AGE': 0 if SERVED_BY_ASGI else 600,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': SQLITE_OPTIONS,
     }
 }
 
+# Read replicas, e.g. OPENREVIEW_DB_REPLICAS=2 adds db.replica1.sqlite3 and
+# db.replica2.sqlite3. Locally they are refreshed from the primary with
+# `manage.py sync_replicas`; tests read through the primary.
+DATABASE_REPLICAS = [
+    f'replica{i}' for i in range(1, int(os.environ.get('OPENREVIEW_DB_REPLICAS', '0')) + 1)
+]
+for _alias in DATABASE_REPLICAS:
+    DATABASES[_alias] = {
+        **DATABASES['default'],
+        'NAME': BASE_DIR / f'db.{_alias}.sqlite3',
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = ['accounts.db_router.PrimaryReplicaRouter']
+
+# Seconds a client keeps reading from the primary after it writes
+REPLICA_STICKY_SECONDS = 10
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -141,7 +188,89 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
         'rest_framework.authentication.SessionAuthentication',
+        'accounts.authentication.CachedTokenAuthentication',
         'rest_framework.authentication.BasicAuthentication',
     ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'accounts.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+}
+
+# Cross-process invalidation (accounts.versions), revoked tokens and
+# sessions rely on this cache being shared by every worker. Set
+# OPENREVIEW_REDIS_URL whenever more than one process serves requests; the
+# process-local fallback is only for a single process, where other copies
+# can lag by up to VERSION_TOKEN_TTL seconds.
+if os.environ.get('OPENREVIEW_REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['OPENREVIEW_REDIS_URL'],
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'OPTIONS': {'MAX_ENTRIES': 100000},
+        }
+    }
+
+# Lifetime of version tokens in a process-local cache (seconds)
+VERSION_TOKEN_TTL = 10
+
+# Sessions: in-process LRU -> cache -> database. New and rotated sessions
+# are written through; updates are written behind in batches (see
+# accounts.session_backend)
+SESSION_ENGINE = 'accounts.session_backend'
+SESSION_WRITE_BEHIND = {
+    'INTERVAL': 2.0,
+    'BATCH_SIZE': 500,
+    'EXPIRED_BATCH': 1000,
+    'LOCAL_MAXSIZE': 10000,
+    'LOCAL_TTL': 5,
+}
+
+# Token -> user resolution cache used by CachedTokenAuthentication (seconds).
+# LOCAL_TTL bounds how long other workers accept a revoked token.
+TOKEN_AUTH_CACHE = {
+    'LOCAL_MAXSIZE': 10000,
+    'LOCAL_TTL': 30,
+    'TIMEOUT': 300,
+}
+
+
+# Process pool used by the async signup/login views for password hashing.
+# Requests beyond WORKERS + QUEUE_SIZE in-flight hashes get a 503.
+PASSWORD_HASHING_POOL = {
+    'WORKERS': 2,
+    'QUEUE_SIZE': 32,
+}
+
+# Request instrumentation (accounts.middleware.PerformanceMiddleware).
+# Requests slower than SLOW_REQUEST_MS are logged to 'accounts.performance'
+# with their SQL; per-route histograms are at /api/internal/metrics/.
+PERFORMANCE = {
+    'SLOW_REQUEST_MS': 500,
+    'SERVER_TIMING': True,
+    'SLOW_SQL_LIMIT': 20,
 }
 
+# Activity event stream (accounts.activity)
+ACTIVITY_STREAM = {
+    'POLL_SECONDS': 5,
+    'BATCH_SIZE': 200,
+    'MAX_SECONDS': 300,
+}
+
+# Notification emails are queued in accounts.OutboxEmail and delivered by
+# `manage.py send_notifications`. The console backend prints them locally.
+EMAIL_BACKEND = os.environ.get('OPENREVIEW_EMAIL_BACKEND', 'django.core.mail.backends.console.EmailBackend')
+DEFAULT_FROM_EMAIL = os.environ.get('OPENREVIEW_FROM_EMAIL', 'noreply@openreview.net')
+NOTIFICATIONS = {
+    'BATCH_SIZE': 100,
+    'MAX_ATTEMPTS': 5,
+    'BACKOFF_SECONDS': 30,
+    'LEASE_SECONDS': 300,
+}